@@ -0,0 +1,195 @@
+"""
+Benchmark harness for the log parser hot path.
+
+Generates deterministic synthetic logs (see generate_logs.py) and measures, for
+each size:
+- parse_log_file: parsing a whole file into a list of jobs
+- generate_report: streaming iter_jobs straight into generate_report
+- recursive: report_folder over a folder of several files
+
+Every case runs in a fresh process so that its peak RSS is its own. For each
+case the results hold the wall time, lines per second, peak RSS and the time
+until the first report line was written. Results are written as JSON, and a
+previous results file can be passed with --compare to print the change per case.
+
+Run with the repository root on PYTHONPATH, e.g. `make bench`.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from functools import partial
+
+from generate_logs import generate_log, generate_logs
+
+CASES = ("parse_log_file", "generate_report", "recursive")
+DEFAULT_SIZES = (100000, 1000000, 10000000)
+
+
+class FirstWriteRecorder:
+    # stands in for stdout: discards the report but remembers when it started
+
+    def __init__(self):
+        self.first_write = None
+        self.characters = 0
+
+    def write(self, text):
+        if self.first_write is None and text:
+            self.first_write = time.perf_counter()
+        self.characters += len(text)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def peak_rss_kb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes everywhere else
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_case(case, path, lines, time_format):
+    from logparser import log_parser
+    from logparser.parallel import report_folder
+
+    recorder = FirstWriteRecorder()
+    started = time.perf_counter()
+    with redirect_stdout(recorder):
+        if case == "parse_log_file":
+            log_parser.parse_log_file(path, time_format=time_format)
+        elif case == "generate_report":
+            log_parser.generate_report(
+                log_parser.iter_jobs(path, time_format=time_format)
+            )
+        elif case == "recursive":
+            report_folder(
+                path, source=partial(log_parser.iter_jobs, time_format=time_format)
+            )
+        else:
+            raise ValueError(f"Unknown benchmark case: {case}")
+    elapsed = time.perf_counter() - started
+
+    return {
+        "case": case,
+        "lines": lines,
+        "seconds": round(elapsed, 4),
+        "lines_per_second": round(lines / elapsed) if elapsed else None,
+        "peak_rss_kb": peak_rss_kb(),
+        "time_to_first_report": (
+            round(recorder.first_write - started, 4)
+            if recorder.first_write is not None
+            else None
+        ),
+    }
+
+
+def prepare_inputs(workdir, lines, files, time_format, concurrency, malformed):
+    options = dict(
+        concurrency=concurrency, malformed=malformed, time_format=time_format
+    )
+    os.makedirs(workdir, exist_ok=True)
+    name = f"{lines}_{concurrency}_{malformed}_{zlib.crc32(time_format.encode())}"
+    single = os.path.join(workdir, f"bench_{name}.log")
+    if not os.path.exists(single):
+        generate_log(single, lines, **options)
+    # the recursive case spreads the same number of lines over several files
+    folder = os.path.join(workdir, f"bench_{name}_x{files}")
+    if not os.path.isdir(folder):
+        generate_logs(folder, files=files, lines=lines // files, **options)
+    return single, folder
+
+
+def git_commit():
+    try:
+        return subprocess.run(  # nosec B603 B607 - fixed git command
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    previous = {(item["case"], item["lines"]): item for item in baseline["results"]}
+    for item in results["results"]:
+        before = previous.get((item["case"], item["lines"]))
+        if not before or not before["seconds"]:
+            continue
+        change = (item["seconds"] - before["seconds"]) / before["seconds"] * 100
+        print(
+            f"{item['case']:>16} {item['lines']:>10}: {before['seconds']:.3f}s -> "
+            f"{item['seconds']:.3f}s ({change:+.1f}%)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Log parser benchmarks")
+    parser.add_argument(
+        "--sizes", type=float, nargs="+", default=DEFAULT_SIZES, help="Line counts"
+    )
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--files", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--malformed", type=float, default=0.001)
+    parser.add_argument("-t", "--time-format", default="%H:%M:%S")
+    parser.add_argument("--workdir", default=tempfile.gettempdir())
+    parser.add_argument("-o", "--output", default="bench_results.json")
+    parser.add_argument("--compare", help="Previous results file to compare with")
+    args = parser.parse_args()
+
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": [],
+    }
+    spawn = multiprocessing.get_context("spawn")
+    for size in args.sizes:
+        lines = int(size)
+        single, folder = prepare_inputs(
+            args.workdir,
+            lines,
+            args.files,
+            args.time_format,
+            args.concurrency,
+            args.malformed,
+        )
+        for case in args.cases:
+            path = folder if case == "recursive" else single
+            # a fresh process per case, so peak RSS is not inherited
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as executor:
+                result = executor.submit(
+                    run_case, case, path, lines, args.time_format
+                ).result()
+            results["results"].append(result)
+            print(
+                f"{case:>16} {lines:>10}: {result['seconds']:.3f}s "
+                f"{result['lines_per_second']} lines/s "
+                f"{result['peak_rss_kb']} KiB peak RSS, first report after "
+                f"{result['time_to_first_report']}s"
+            )
+
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            compare(results, json.load(baseline))
+
+
+if __name__ == "__main__":
+    main()
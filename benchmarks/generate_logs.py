@@ -0,0 +1,104 @@
+"""
+Deterministic synthetic log generator for benchmarks and tests.
+
+Writes CSV logs in the format read by log_parser:
+    <timestamp>,<job description>,<START|END>,<pid>
+
+The same arguments and seed always produce the same files. Options:
+- lines: number of lines per file
+- concurrency: number of jobs kept running at the same time
+- mean_duration: mean job duration in seconds (exponentially distributed, so a
+  share of the jobs crosses the default 5 and 10 minute thresholds)
+- malformed: share of rows (0.0 - 1.0) written without their pid column
+- time_format: strftime format of the timestamps
+- files: number of files written by generate_logs
+"""
+
+import argparse
+import heapq
+import os
+import random
+from datetime import datetime, timedelta
+
+START_TIME = datetime(2024, 1, 1)
+
+
+def generate_log(
+    path,
+    lines,
+    concurrency=50,
+    malformed=0.0,
+    time_format="%H:%M:%S",
+    mean_duration=180,
+    seed=0,
+):
+    rng = random.Random(seed)
+    # running jobs ordered by the second they end at
+    running = []
+    next_pid = 1000
+    now = 0
+    formatted_second, timestamp = None, None
+    buffer = []
+
+    with open(path, "w") as logfile:
+        for _ in range(lines):
+            if running and (len(running) >= concurrency or running[0][0] <= now):
+                end, pid, description = heapq.heappop(running)
+                now = max(now, end)
+                status = "END"
+            else:
+                pid = str(next_pid)
+                description = f"scheduled task {next_pid % 997:03d}"
+                next_pid += 1
+                duration = int(rng.expovariate(1 / mean_duration))
+                heapq.heappush(running, (now + duration, pid, description))
+                status = "START"
+                if rng.random() < 0.1:
+                    now += 1
+
+            if now != formatted_second:
+                formatted_second = now
+                timestamp = (START_TIME + timedelta(seconds=now)).strftime(time_format)
+
+            if rng.random() < malformed:
+                buffer.append(f"{timestamp},{description},{status}\n")
+            else:
+                buffer.append(f"{timestamp},{description},{status},{pid}\n")
+            if len(buffer) >= 10000:
+                logfile.writelines(buffer)
+                buffer.clear()
+        logfile.writelines(buffer)
+    return path
+
+
+def generate_logs(folder, files=1, lines=100000, seed=0, **kwargs):
+    os.makedirs(folder, exist_ok=True)
+    return [
+        generate_log(
+            os.path.join(folder, f"log{index}.log"), lines, seed=seed + index, **kwargs
+        )
+        for index in range(files)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic log generator")
+    parser.add_argument("folder", help="Output folder")
+    parser.add_argument("-n", "--lines", type=int, default=100000)
+    parser.add_argument("-c", "--concurrency", type=int, default=50)
+    parser.add_argument("-m", "--malformed", type=float, default=0.0)
+    parser.add_argument("-t", "--time-format", default="%H:%M:%S")
+    parser.add_argument("-d", "--mean-duration", type=int, default=180)
+    parser.add_argument("--files", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_logs(
+        args.folder,
+        files=args.files,
+        lines=args.lines,
+        seed=args.seed,
+        concurrency=args.concurrency,
+        malformed=args.malformed,
+        time_format=args.time_format,
+        mean_duration=args.mean_duration,
+    )
@@ -0,0 +1,96 @@
+"""
+Cold-start benchmark of the log parser.
+
+Runs each case in a fresh interpreter several times and takes the median wall
+time, minus the median of an interpreter that imports nothing, so the numbers
+are what the parser itself adds to a process' start:
+- import: `import logparser`, which only loads the package's lazy names
+- api: importing the parser and classifier objects (logparser.LogParser)
+- help: `python -m logparser --help`, the whole command line up to argparse
+
+Exits with status 1 when a case takes longer than --budget milliseconds, so it
+can gate changes that pull a heavy import back onto the start-up path. Results
+are written as JSON like bench.py's.
+
+Run from the repository root, e.g. `make bench-startup`.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = ["-c", "pass"]
+CASES = {
+    "import": ["-c", "import logparser"],
+    "api": ["-c", "import logparser; logparser.LogParser, logparser.Classifier"],
+    "help": ["-m", "logparser", "--help"],
+}
+DEFAULT_BUDGET_MS = 100
+
+
+def time_command(arguments, repeat):
+    # median wall time in milliseconds of `python <arguments>`
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(  # nosec B603 - runs this interpreter with fixed arguments
+            [sys.executable, *arguments],
+            cwd=ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Log parser cold-start benchmark")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help=f"Milliseconds each case may add (default: {DEFAULT_BUDGET_MS})",
+    )
+    parser.add_argument("-o", "--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    baseline = time_command(BASELINE, args.repeat)
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "interpreter_ms": round(baseline, 1),
+        "budget_ms": args.budget,
+        "results": [],
+    }
+    over_budget = []
+    for case in args.cases:
+        added = time_command(CASES[case], args.repeat) - baseline
+        results["results"].append({"case": case, "ms": round(added, 1)})
+        print(f"{case:>8}: {added:6.1f} ms over a bare interpreter")
+        if added > args.budget:
+            over_budget.append(case)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+    if over_budget:
+        print(
+            f"Over the {args.budget:g} ms budget: {', '.join(over_budget)}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Programmatic interface of the log parser, for embedding it in other programs.
+
+The names below are the stable API; the modules behind them may change.
+They are imported on first access, so `import logparser` costs almost nothing
+and never imports argparse or reads sys.argv.
+
+Parsing and classifying (see logparser/api.py):
+- LogParser: turns log files, or lines, into jobs
+- Classifier: flags, reports and summarizes jobs against two thresholds
+
+Jobs and formats:
+- Job, JobTable: compact job records and their columnar container
+- LogFormat, parse_log_format: log layouts other than the default CSV
+- OpenJobTable: a bounded table of open jobs
+- JobSummary: per-description duration statistics
+
+Sinks and writers:
+- ReportSink, open_sink: buffered destinations for report lines
+- JsonLinesWriter, CsvWriter, ColumnarWriter: machine-readable report writers
+
+main runs the command line, like the log-parser console script.
+"""
+
+from importlib import import_module
+
+__version__ = "0.1.0"
+
+# name -> module it is imported from
+_EXPORTS = {
+    "LogParser": ".api",
+    "Classifier": ".api",
+    "Job": ".job_records",
+    "JobTable": ".job_records",
+    "LogFormat": ".log_formats",
+    "parse_log_format": ".log_formats",
+    "OpenJobTable": ".open_jobs",
+    "JobSummary": ".job_summary",
+    "ReportSink": ".report_sink",
+    "open_sink": ".report_sink",
+    "JsonLinesWriter": ".report_formats",
+    "CsvWriter": ".report_formats",
+    "ColumnarWriter": ".report_formats",
+    "main": ".cli",
+}
+
+__all__ = [
+    "Classifier",
+    "ColumnarWriter",
+    "CsvWriter",
+    "Job",
+    "JobSummary",
+    "JobTable",
+    "JsonLinesWriter",
+    "LogFormat",
+    "LogParser",
+    "OpenJobTable",
+    "ReportSink",
+    "main",
+    "open_sink",
+    "parse_log_format",
+]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    # later lookups find it without coming back here
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,146 @@
+"""
+Parser and classifier objects over the log parser's functions.
+
+LogParser: holds the options of one kind of log (time format, layout, reader,
+bounds on the open jobs) and turns any number of files, or batches of lines,
+into jobs. It keeps no state between calls: every call gets its own table of
+open jobs, unless the caller passes one in to carry jobs across batches.
+
+Classifier: holds a warning and an error threshold and flags jobs against them
+with flag_jobs, writes the report of generate_report to a sink or writer, or
+adds the jobs to a JobSummary.
+
+Malformed rows and unterminated jobs are printed unless a callback is given,
+so that a program embedding the parser decides where every message goes.
+"""
+
+from datetime import timedelta
+from functools import partial
+
+from .job_records import Job, JobTable
+from .log_formats import row_reader
+from .log_parser import (
+    classify_duration,
+    flag_jobs,
+    generate_report,
+    iter_jobs,
+    match_jobs,
+    report_malformed,
+)
+from .open_jobs import OpenJobTable, report_collision, report_unterminated
+
+
+class LogParser:
+    def __init__(
+        self,
+        time_format="%H:%M:%S",
+        log_format=None,
+        reader="csv",
+        compact=True,
+        max_open_age=None,
+        max_open_jobs=None,
+        on_malformed=report_malformed,
+        on_unterminated=report_unterminated,
+        on_collision=report_collision,
+    ):
+        # compact jobs are Job records with integer seconds, the others dicts
+        # with datetime.time and timedelta values; max_open_age is a timedelta
+        self.time_format = time_format
+        self.log_format = log_format
+        self.reader = reader
+        self.compact = compact
+        self.on_malformed = on_malformed
+        self.open_jobs = None
+        if max_open_age is not None or max_open_jobs is not None:
+            self.open_jobs = partial(
+                OpenJobTable,
+                max_age=max_open_age,
+                max_size=max_open_jobs,
+                time_format=time_format,
+                on_unterminated=on_unterminated,
+                on_collision=on_collision,
+            )
+
+    def iter_jobs(self, path):
+        # yields each job of a file as soon as its END line is read
+        return iter_jobs(
+            path,
+            time_format=self.time_format,
+            reader=self.reader,
+            compact=self.compact,
+            on_malformed=self.on_malformed,
+            log_format=self.log_format,
+            open_jobs=self.open_jobs,
+        )
+
+    def parse(self, path):
+        # all the jobs of a file, in a JobTable when compact
+        if self.compact:
+            return JobTable(self.iter_jobs(path))
+        return list(self.iter_jobs(path))
+
+    def open_job_table(self):
+        # a table to carry open jobs across parse_lines calls
+        return {} if self.open_jobs is None else self.open_jobs()
+
+    def parse_lines(self, lines, open_jobs=None):
+        # yields the jobs of an iterable of text lines; jobs still open at the
+        # end stay in open_jobs (see open_job_table) for the next batch. Without
+        # open_jobs the lines are a whole log, as for iter_jobs: they get a table
+        # of their own, whose jobs still open at the end are unterminated
+        table = self.open_job_table() if open_jobs is None else open_jobs
+        rows = row_reader(self.log_format)(lines, on_malformed=self.on_malformed)
+        yield from match_jobs(
+            rows,
+            time_format=self.time_format,
+            jobs=table,
+            compact=self.compact,
+        )
+        if open_jobs is None and isinstance(table, OpenJobTable):
+            table.close()
+
+
+class Classifier:
+    def __init__(
+        self,
+        warning_threshold=timedelta(minutes=5),
+        error_threshold=timedelta(minutes=10),
+    ):
+        self.warning_threshold = warning_threshold
+        self.error_threshold = error_threshold
+
+    def classify(self, job):
+        # "ERROR", "WARNING" or None for a job or a duration
+        if isinstance(job, Job):
+            duration = timedelta(seconds=job.duration)
+        elif isinstance(job, dict):
+            duration = job["duration"]
+        else:
+            duration = job
+        return classify_duration(duration, self.warning_threshold, self.error_threshold)
+
+    def flagged(self, jobs, on_invalid=None):
+        # (level, job) for every job over the warning threshold
+        return flag_jobs(jobs, self.warning_threshold, self.error_threshold, on_invalid)
+
+    def report(self, jobs, sink=None, writer=None):
+        generate_report(
+            jobs,
+            warning_threshold=self.warning_threshold,
+            error_threshold=self.error_threshold,
+            sink=sink,
+            writer=writer,
+        )
+
+    def summarize(self, jobs, summary=None):
+        # adds the jobs to summary, or to a new JobSummary, and returns it
+        if summary is None:
+            from .job_summary import JobSummary
+
+            summary = JobSummary()
+        summary.update(
+            jobs,
+            warning_threshold=self.warning_threshold,
+            error_threshold=self.error_threshold,
+        )
+        return summary
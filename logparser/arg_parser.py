@@ -0,0 +1,342 @@
+import argparse
+
+from .log_formats import KINDS, parse_log_format
+
+
+def get_args(argv=None):
+    parser = argparse.ArgumentParser(description="Log Parsing Utility")
+    parser.add_argument(
+        "-f",
+        "--file",
+        type=str,
+        default="logs.log",
+        help="Path to the log file (default: logs.log)",
+    )
+    parser.add_argument(
+        "-t",
+        "--time-format",
+        type=str,
+        default="%H:%M:%S",
+        help="Time format used in logs (default: %%H:%%M:%%S)",
+    )
+    parser.add_argument(
+        "-w",
+        "--warning-threshold",
+        type=int,
+        default=5,
+        help="Warning threshold in minutes (default: 5)",
+    )
+    parser.add_argument(
+        "-e",
+        "--error-threshold",
+        type=int,
+        default=10,
+        help="Error threshold in minutes (default: 10)",
+    )
+    parser.add_argument(
+        "-r",
+        "--recursive",
+        type=str,
+        help="Parse all log files in the specified folder",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of log files parsed in parallel in recursive mode (default: 1)",
+    )
+    parser.add_argument(
+        "--order",
+        choices=["filename", "completion"],
+        default="filename",
+        help="Order of the per-file reports when using --jobs: sorted by filename "
+        "or printed as each file finishes (default: filename)",
+    )
+    parser.add_argument(
+        "-c",
+        "--chunks",
+        type=int,
+        default=1,
+        help="Split a single log file into this many byte ranges parsed in "
+        "parallel (default: 1; not with --incremental or --session)",
+    )
+    parser.add_argument(
+        "--reader",
+        choices=["csv", "mmap"],
+        default="csv",
+        help="Row reader: csv.reader over the text file, or a memory-mapped byte "
+        "scanner for unquoted logs (default: csv)",
+    )
+    parser.add_argument(
+        "--log-format",
+        choices=KINDS,
+        default="csv",
+        help="Layout of the log lines: comma or tab separated columns, JSON "
+        "lines or key=value pairs (default: csv)",
+    )
+    parser.add_argument(
+        "--fields",
+        type=str,
+        help="For csv and tsv, the column layout, e.g. "
+        "host,timestamp,pid,status,description; for jsonl and kv, the keys of "
+        "the fields, e.g. timestamp=ts,description=job "
+        "(default: timestamp,description,status,pid)",
+    )
+    parser.add_argument(
+        "--start-token",
+        type=str,
+        default="START",
+        help="Status value of the line that starts a job (default: START)",
+    )
+    parser.add_argument(
+        "--end-token",
+        type=str,
+        default="END",
+        help="Status value of the line that ends a job (default: END)",
+    )
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        "--follow",
+        action="store_true",
+        help="Resume each log file from where the previous run stopped and report "
+        "only the jobs completed since then",
+    )
+    parser.add_argument(
+        "--state-dir",
+        type=str,
+        help="Folder for the --incremental state files (default: next to each log)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep tailing the log file and alert as soon as a running job crosses "
+        "a threshold",
+    )
+    parser.add_argument(
+        "--tick",
+        type=float,
+        default=1.0,
+        help="Seconds between threshold checks in --watch mode, and between "
+        "reads of the logs in --serve mode (default: 1.0)",
+    )
+    parser.add_argument(
+        "--serve",
+        type=int,
+        metavar="PORT",
+        help="Keep following the log file (or the log files of --recursive) and "
+        "answer JSON queries on this port: /alerts, /running, /jobs/<pid> and "
+        "/summary",
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Address the --serve API listens on (default: 127.0.0.1)",
+    )
+    parser.add_argument(
+        "--max-jobs",
+        type=int,
+        default=10000,
+        help="Number of recent completed jobs --serve keeps for its queries "
+        "(default: 10000)",
+    )
+    parser.add_argument(
+        "--profile",
+        "--stats",
+        action="store_true",
+        help="Print per-phase timings and parser counters to stderr",
+    )
+    parser.add_argument(
+        "--stats-format",
+        choices=["text", "json"],
+        default="text",
+        help="Format of the --profile output (default: text)",
+    )
+    parser.add_argument(
+        "--cprofile",
+        type=str,
+        help="Write cProfile statistics of the run to this file",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        help="Append the report to this file instead of printing it",
+    )
+    parser.add_argument(
+        "--rotate-bytes",
+        type=int,
+        help="Rotate the --output file once it grows past this many bytes",
+    )
+    parser.add_argument(
+        "--rotate-count",
+        type=int,
+        default=5,
+        help="Number of rotated --output files to keep (default: 5)",
+    )
+    parser.add_argument(
+        "--max-malformed",
+        type=int,
+        help="Show at most this many malformed rows, followed by a summary line "
+        "(default: show all)",
+    )
+    parser.add_argument(
+        "--output-format",
+        choices=["text", "jsonl", "csv", "columnar"],
+        default="text",
+        help="Report format: text lines, JSON Lines, CSV or the columnar binary "
+        "format (default: text)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse the log files, without reading or writing the cache "
+        "of parsed jobs",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="Folder for the cache of parsed jobs "
+        "(default: $XDG_CACHE_HOME/log_parser or ~/.cache/log_parser)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=256,
+        help="Size cap of the parsed-job cache in MiB; the least recently used "
+        "entries are removed beyond it (default: 256)",
+    )
+    parser.add_argument(
+        "--include",
+        action="append",
+        metavar="GLOB",
+        help="In recursive mode, only parse files whose name or relative path "
+        "matches this glob; may be repeated (default: *.log, *.log.[0-9]*, "
+        "*.log.gz, *.log.bz2, *.log.xz, *.log.zst)",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        metavar="GLOB",
+        default=[],
+        help="In recursive mode, skip files and folders whose name or relative "
+        "path matches this glob, besides *.state.json and *.tmp; may be repeated",
+    )
+    parser.add_argument(
+        "--max-open-age",
+        type=int,
+        metavar="MINUTES",
+        help="Report a job as unterminated once it has been open for this many "
+        "minutes without an END, and forget it; also reports PID reuse and the "
+        "jobs left open at the end of each log (not with --incremental, "
+        "--watch or --chunks; bypasses the parsed-job cache)",
+    )
+    parser.add_argument(
+        "--max-open-jobs",
+        type=int,
+        metavar="N",
+        help="Keep at most N open jobs, reporting the oldest ones as "
+        "unterminated; reports PID reuse like --max-open-age",
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="In recursive mode, merge the time-sorted log files into one report "
+        "ordered by time, with each PID prefixed by the path of its file",
+    )
+    parser.add_argument(
+        "--timeline",
+        type=str,
+        metavar="PATH",
+        help="With --merge, write the number of running jobs per second to this "
+        "CSV file",
+    )
+    parser.add_argument(
+        "--session",
+        action="store_true",
+        help="In recursive mode, parse the rotated files of each log as one "
+        "stream, so jobs that START before a rotation and END after it are "
+        "reported",
+    )
+    parser.add_argument(
+        "--session-order",
+        choices=["rotation", "timestamp"],
+        default="rotation",
+        help="Order of the files of a --session: by rotation number or by "
+        "their first timestamp (default: rotation)",
+    )
+    parser.add_argument(
+        "--summary",
+        action="store_true",
+        help="Report per-description statistics (count, mean, max, p50, p95, "
+        "p99 and jobs over the thresholds) instead of one line per flagged job",
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=0,
+        help="In serial recursive mode, read this many files ahead of the parser "
+        "in background threads, for slow or network storage (default: 0, off)",
+    )
+
+    # subcommands; their shared options default to the values given before the
+    # subcommand
+    commands = parser.add_subparsers(dest="command", metavar="{index,query}")
+    index = commands.add_parser(
+        "index", help="Ingest the jobs of log files into an SQLite job index"
+    )
+    index.add_argument(
+        "paths", nargs="+", help="Log files, or folders whose .log files to ingest"
+    )
+    query = commands.add_parser(
+        "query", help="Report the jobs of an SQLite job index above the thresholds"
+    )
+    query.add_argument(
+        "--description", type=str, help="Only jobs with this description"
+    )
+    query.add_argument("--pid", type=str, help="Only jobs with this PID")
+    query.add_argument(
+        "--since", type=str, help="Only jobs started at or after this timestamp"
+    )
+    query.add_argument(
+        "--until", type=str, help="Only jobs started before this timestamp"
+    )
+    for command in (index, query):
+        command.add_argument(
+            "--db",
+            type=str,
+            default="jobs.db",
+            help="Path to the SQLite job index (default: jobs.db)",
+        )
+        command.add_argument("-t", "--time-format", type=str, default=argparse.SUPPRESS)
+    for option, dest in (("-w", "--warning-threshold"), ("-e", "--error-threshold")):
+        query.add_argument(option, dest, type=int, default=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    try:
+        args.log_format_spec = parse_log_format(
+            args.log_format, args.fields, args.start_token, args.end_token
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    if args.summary and args.output_format == "columnar":
+        parser.error("--summary supports the text, jsonl and csv output formats")
+    if args.merge and not args.recursive:
+        parser.error("--merge needs --recursive")
+    if args.timeline and not args.merge:
+        parser.error("--timeline needs --merge")
+    if args.serve is not None and (args.watch or args.merge or args.session):
+        parser.error("--serve cannot be combined with --watch, --merge or --session")
+    if args.summary and args.watch:
+        parser.error("--summary cannot be combined with --watch")
+    if args.chunks > 1 and (args.incremental or args.session):
+        parser.error("--chunks cannot be combined with --incremental or --session")
+    if (args.max_open_age is not None or args.max_open_jobs is not None) and (
+        args.incremental or args.watch or args.chunks > 1
+    ):
+        parser.error(
+            "--max-open-age and --max-open-jobs cannot be combined with "
+            "--incremental, --watch or --chunks"
+        )
+    return args
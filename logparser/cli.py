@@ -0,0 +1,352 @@
+"""
+Command line entry point of the log parser.
+
+main: parses the command line (see arg_parser.py), or the argv list it is
+given, and runs it, under cProfile with --cprofile. It is the log-parser
+console script and what `python -m logparser` and `python log_parser.py` call.
+
+run: opens the report sink and writer chosen by the options, sends every other
+message to the sink (or to stderr for machine-readable formats) and reports
+the parse statistics of --profile.
+
+dispatch: builds the job source and report chosen by the options and runs the
+selected mode: index, query, serve, watch, merge, recursive, chunked or a
+single file.
+
+The library modules never import this one, nor argparse, so importing the
+parser (see the logparser package) does not depend on sys.argv.
+"""
+
+import os
+import sys
+from contextlib import ExitStack, redirect_stdout
+from datetime import timedelta
+from functools import partial
+
+from .log_files import DEFAULT_EXCLUDE, DEFAULT_INCLUDE, compression
+from .log_parser import generate_report, iter_jobs, parse_log_file, report_malformed
+from .open_jobs import OpenJobTable
+from .timestamp_parser import TimestampParser
+
+
+def main(argv=None):
+    from .arg_parser import get_args
+
+    args = get_args(argv)
+    if args.cprofile:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.runcall(run, args)
+        profiler.dump_stats(args.cprofile)
+    else:
+        run(args)
+
+
+def run(args):
+    from .report_formats import WRITERS
+    from .report_sink import ReportSink, open_sink
+
+    with ExitStack() as stack:
+        sink = stack.enter_context(
+            open_sink(
+                args.output,
+                rotate_bytes=args.rotate_bytes,
+                backup_count=args.rotate_count,
+                max_malformed=args.max_malformed,
+                binary=args.output_format == "columnar",
+            )
+        )
+        writer = messages = None
+        if args.output_format in WRITERS:
+            if not args.summary:
+                writer = WRITERS[args.output_format](sink)
+                stack.callback(writer.close)
+            # keep the data stream clean: every other message goes to stderr
+            messages = stack.enter_context(
+                ReportSink(sys.stderr, max_malformed=args.max_malformed)
+            )
+        stack.enter_context(redirect_stdout(messages or sink))
+        stats = dispatch(args, sink, messages, writer)
+
+    if stats:
+        print(stats.format(args.stats_format), file=sys.stderr)
+
+
+def dispatch(args, sink, messages=None, writer=None):
+    log_file = args.file
+    time_format = args.time_format
+    warning_threshold = timedelta(minutes=args.warning_threshold)
+    error_threshold = timedelta(minutes=args.error_threshold)
+    stats = None
+    if writer is None:
+        report = partial(generate_report, sink=sink)
+    else:
+        report = partial(generate_report, writer=writer)
+    on_malformed = (messages or sink).malformed
+    summary = None
+    if args.summary:
+        from .job_summary import JobSummary
+
+        # per-description statistics instead of one line per flagged job
+        summary = JobSummary()
+        report = summary.update
+    # compact jobs keep the date of their timestamps for the writers, and spare
+    # the text report a datetime per row unless the format has sub-second or
+    # time zone fields that integer seconds would drop
+    compact = writer is not None or TimestampParser(time_format).whole_seconds
+    log_format = args.log_format_spec
+    open_jobs = None
+    if args.max_open_age is not None or args.max_open_jobs is not None:
+        # a bounded table of open jobs per file, reporting the lost ones
+        open_jobs = partial(
+            OpenJobTable,
+            max_age=(
+                None
+                if args.max_open_age is None
+                else timedelta(minutes=args.max_open_age)
+            ),
+            max_size=args.max_open_jobs,
+            time_format=time_format,
+        )
+    # worker processes cannot write into this process' sink or writer
+    parallel_files = (
+        args.recursive
+        and args.jobs > 1
+        and not (args.profile or args.session or args.merge)
+    )
+    capped_malformed = None
+    if parallel_files and writer is None:
+        # the workers hand their malformed rows back to be capped here
+        capped_malformed = on_malformed
+        on_malformed = report_malformed
+
+    if args.command == "index":
+        from .job_index import index_paths
+
+        index_paths(
+            args.db,
+            args.paths,
+            time_format,
+            on_malformed=on_malformed,
+            log_format=log_format,
+        )
+        return stats
+    if args.command == "query":
+        from .job_index import query_jobs
+
+        report(
+            query_jobs(
+                args.db,
+                warning_threshold,
+                description=args.description,
+                pid=args.pid,
+                since=args.since,
+                until=args.until,
+                time_format=time_format,
+            ),
+            warning_threshold=warning_threshold,
+            error_threshold=error_threshold,
+        )
+        return stats
+
+    arrange = None
+    if args.session:
+        from .session import SessionSource, order_session
+
+        source = SessionSource(
+            time_format=time_format,
+            reader=args.reader,
+            compact=compact,
+            on_malformed=on_malformed,
+            log_format=log_format,
+            open_jobs=open_jobs,
+        )
+        arrange = partial(
+            order_session,
+            order=args.session_order,
+            time_format=time_format,
+            log_format=log_format,
+        )
+    elif args.profile:
+        from .profiling import ParseStats, profiled_jobs
+
+        stats = ParseStats()
+        source = partial(
+            profiled_jobs,
+            time_format=time_format,
+            stats=stats,
+            compact=compact,
+            on_malformed=on_malformed,
+            log_format=log_format,
+            reader=args.reader,
+            open_jobs=open_jobs,
+        )
+        report = partial(stats.run_report, report)
+    elif args.incremental:
+        from .incremental import iter_new_jobs
+
+        source = partial(
+            iter_new_jobs,
+            time_format=time_format,
+            state_dir=args.state_dir,
+            compact=compact,
+            on_malformed=on_malformed,
+            log_format=log_format,
+        )
+    elif compact and not args.no_cache and not args.watch and open_jobs is None:
+        # the cache stores compact jobs, which would drop sub-second durations
+        from .job_cache import cached_jobs
+
+        source = partial(
+            cached_jobs,
+            time_format=time_format,
+            cache_dir=args.cache_dir,
+            max_bytes=args.cache_size << 20,
+            reader=args.reader,
+            on_malformed=on_malformed,
+            log_format=log_format,
+        )
+    else:
+        source = partial(
+            iter_jobs,
+            time_format=time_format,
+            reader=args.reader,
+            compact=compact,
+            on_malformed=on_malformed,
+            log_format=log_format,
+            open_jobs=open_jobs,
+        )
+
+    if args.serve is not None:
+        from .service import JobService, serve
+
+        if args.recursive:
+            from .parallel import list_log_files
+
+            names = list_log_files(
+                args.recursive,
+                include=args.include or DEFAULT_INCLUDE,
+                exclude=DEFAULT_EXCLUDE + tuple(args.exclude),
+            )
+            # archives do not grow, only plain logs are followed
+            paths = {
+                name: os.path.join(args.recursive, name)
+                for name in names
+                if compression(name) is None
+            }
+        else:
+            paths = {log_file: log_file}
+        service = JobService(
+            paths,
+            time_format=time_format,
+            warning_threshold=warning_threshold,
+            error_threshold=error_threshold,
+            log_format=log_format,
+            max_jobs=args.max_jobs,
+            max_open_age=(
+                None
+                if args.max_open_age is None
+                else timedelta(minutes=args.max_open_age)
+            ),
+            max_open_jobs=args.max_open_jobs,
+            on_malformed=on_malformed,
+        )
+        try:
+            serve(service, host=args.host, port=args.serve, tick=args.tick)
+        except KeyboardInterrupt:
+            pass
+    elif args.watch:
+        from .watch import watch_log_file
+
+        try:
+            watch_log_file(
+                log_file,
+                time_format=time_format,
+                warning_threshold=warning_threshold,
+                error_threshold=error_threshold,
+                tick=args.tick,
+                log_format=log_format,
+                on_malformed=on_malformed,
+            )
+        except KeyboardInterrupt:
+            pass
+    elif args.recursive and args.merge:
+        from .fan_in import ConcurrencyTimeline, merged_jobs
+        from .parallel import list_log_files
+
+        filenames = list_log_files(
+            args.recursive,
+            include=args.include or DEFAULT_INCLUDE,
+            exclude=DEFAULT_EXCLUDE + tuple(args.exclude),
+        )
+        with ExitStack() as stack:
+            timeline = None
+            if args.timeline:
+                timeline_file = stack.enter_context(
+                    open(args.timeline, "w", newline="")
+                )
+                timeline = ConcurrencyTimeline(timeline_file, time_format)
+            report(
+                merged_jobs(
+                    args.recursive,
+                    filenames,
+                    time_format,
+                    on_malformed=on_malformed,
+                    log_format=log_format,
+                    timeline=timeline,
+                    open_jobs=open_jobs,
+                ),
+                warning_threshold=warning_threshold,
+                error_threshold=error_threshold,
+            )
+    elif args.recursive:
+        from .parallel import report_folder
+
+        report_folder(
+            args.recursive,
+            source=source,
+            warning_threshold=warning_threshold,
+            error_threshold=error_threshold,
+            # profiling statistics, structured output and session state are
+            # kept in this process
+            jobs=1 if stats or writer or args.session else args.jobs,
+            order=args.order,
+            report=report,
+            prefetch=args.prefetch,
+            include=args.include or DEFAULT_INCLUDE,
+            exclude=DEFAULT_EXCLUDE + tuple(args.exclude),
+            arrange=arrange,
+            summary=summary,
+            on_malformed=capped_malformed,
+        )
+        if args.session:
+            source.close()
+    elif args.chunks > 1 and not stats and open_jobs is None:
+        result_jobs = parse_log_file(
+            log_file,
+            time_format=time_format,
+            workers=args.chunks,
+            result_type="table" if compact else "dict",
+            log_format=log_format,
+        )
+        report(
+            result_jobs,
+            warning_threshold=warning_threshold,
+            error_threshold=error_threshold,
+        )
+    else:
+        report(
+            source(log_file),
+            warning_threshold=warning_threshold,
+            error_threshold=error_threshold,
+        )
+    if summary is not None:
+        from .job_summary import write_summary
+
+        write_summary(summary, sink, args.output_format)
+    return stats
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Fleet-wide view of many log files: one job stream ordered by time.
+
+merged_jobs: k-way merges the rows of log files that are each sorted by time
+(one per host, say) with heapq.merge, so the rows of all files are matched in
+one global time order while only one pending row per file is held. PIDs are
+prefixed with the relative path of their file ("host1/app.log:111"), since the
+same PID on two hosts is two different jobs. The jobs are yielded as compact
+Job records in the order their END lines are reached, with start and end in
+integer seconds. Memory is bounded by the number of files plus the number of
+jobs open at once.
+
+Timestamps without a date are put on a running day per file, as in watch.py: a
+row more than twelve hours before the latest one of its file is taken to be
+past midnight. A file that goes back in time otherwise is reported once, since
+the merge relies on each file being sorted.
+
+ConcurrencyTimeline: receives every START and END of the merged stream and
+writes, for every second in which jobs started or ended, the number of jobs
+still running at the end of that second, the peak within it and how many
+started and ended, as CSV rows. Seconds without changes are left out, since the
+running count carries over from the previous row.
+"""
+
+import csv
+import heapq
+import os
+from operator import itemgetter
+
+from .job_records import Job
+from .log_parser import iter_rows, report_malformed
+from .open_jobs import OpenJobTable
+from .timestamp_parser import TimestampParser
+
+SECONDS_PER_DAY = 86400
+HALF_DAY = SECONDS_PER_DAY // 2
+TIMELINE_FIELDS = ("second", "time", "running", "peak", "started", "ended")
+
+
+def keyed_rows(
+    path, name, time_format="%H:%M:%S", on_malformed=report_malformed, log_format=None
+):
+    # (seconds, status, description, namespaced pid) for every row of a file
+    parse_timestamp = TimestampParser(time_format)
+    seconds = parse_timestamp.seconds
+    undated = not parse_timestamp.has_date
+    day = 0
+    latest = None
+    unsorted = False
+    rows = iter_rows(path, on_malformed=on_malformed, log_format=log_format)
+    for job_timestamp_string, job_description, job_status, job_pid in rows:
+        timestamp = seconds(job_timestamp_string) + day
+        if latest is not None and timestamp < latest:
+            if undated and timestamp < latest - HALF_DAY:
+                # past midnight
+                day += SECONDS_PER_DAY
+                timestamp += SECONDS_PER_DAY
+            elif not unsorted:
+                unsorted = True
+                print(f"{name} is not sorted by time, its jobs may be merged late")
+        if latest is None or timestamp > latest:
+            latest = timestamp
+        yield timestamp, job_status, job_description, f"{name}:{job_pid}"
+
+
+class ConcurrencyTimeline:
+    def __init__(self, stream, time_format="%H:%M:%S"):
+        self.from_seconds = TimestampParser(time_format).from_seconds
+        self.time_format = time_format
+        self.writer = csv.writer(stream, lineterminator="\n")
+        self.writer.writerow(TIMELINE_FIELDS)
+        self.running = 0
+        self._second = None
+        self._peak = self._started = self._ended = 0
+
+    def _flush(self):
+        if self._second is None:
+            return
+        self.writer.writerow(
+            (
+                self._second,
+                self.from_seconds(self._second).strftime(self.time_format),
+                self.running,
+                self._peak,
+                self._started,
+                self._ended,
+            )
+        )
+
+    def _at(self, second):
+        if second != self._second:
+            self._flush()
+            self._second = second
+            self._peak = self.running
+            self._started = self._ended = 0
+
+    def start(self, second):
+        self._at(second)
+        self.running += 1
+        self._started += 1
+        if self.running > self._peak:
+            self._peak = self.running
+
+    def end(self, second):
+        self._at(second)
+        self.running -= 1
+        self._ended += 1
+
+    def close(self):
+        self._flush()
+        self._second = None
+
+
+def merged_jobs(
+    folder,
+    filenames,
+    time_format="%H:%M:%S",
+    on_malformed=report_malformed,
+    log_format=None,
+    timeline=None,
+    open_jobs=None,
+):
+    # filenames are relative to folder, e.g. from parallel.list_log_files
+    streams = [
+        keyed_rows(
+            os.path.join(folder, filename),
+            filename,
+            time_format,
+            on_malformed=on_malformed,
+            log_format=log_format,
+        )
+        for filename in filenames
+    ]
+    # namespaced pid -> start seconds of the jobs still running, optionally in a
+    # bounded table made by open_jobs (see open_jobs.py)
+    jobs = {} if open_jobs is None else open_jobs()
+    bounded = isinstance(jobs, OpenJobTable)
+    # heapq.merge is stable, so rows with equal timestamps keep the file order
+    for timestamp, job_status, job_description, job_pid in heapq.merge(
+        *streams, key=itemgetter(0)
+    ):
+        if job_status == "START":
+            if timeline is not None and job_pid not in jobs:
+                timeline.start(timestamp)
+            if bounded:
+                evicted = jobs.unterminated
+                jobs.start(job_pid, job_description, timestamp)
+                if timeline is not None:
+                    # evicted jobs no longer count as running
+                    for _ in range(jobs.unterminated - evicted):
+                        timeline.end(timestamp)
+            else:
+                jobs[job_pid] = timestamp
+        elif job_status == "END":
+            start_time = jobs.end(job_pid) if bounded else jobs.pop(job_pid, None)
+            if start_time is not None:
+                if timeline is not None:
+                    timeline.end(timestamp)
+                yield Job(
+                    job_description,
+                    job_pid,
+                    start_time,
+                    timestamp,
+                    timestamp - start_time,
+                )
+    if bounded:
+        jobs.close()
+    if timeline is not None:
+        timeline.close()
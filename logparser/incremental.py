@@ -0,0 +1,195 @@
+"""
+Incremental parsing of log files that only grow.
+
+iter_new_jobs: yields the jobs completed since the previous call for the same
+log file. A small JSON state file per log keeps:
+- the inode, size and byte offset reached by the previous run
+- the jobs that were still open (PID -> START timestamp) at that offset, as
+  integer seconds for compact jobs and ISO timestamps otherwise
+- the time format they were parsed with
+
+The next run seeks straight to the saved offset, so its cost depends on the new
+bytes only. A trailing line without a newline is left for the next run, since
+the writer may still be in the middle of it. If the inode changed (the log was
+rotated) or the file is shorter than the saved offset (it was truncated), the
+file is parsed again from the start with no open jobs. The first bytes of the
+file are kept as well, to catch a copy-truncate rotation that has already grown
+past the saved offset.
+
+iter_archive_jobs: compressed logs (see log_files.py) are rotated archives that
+no longer grow, so their jobs are yielded once and again only when the archive
+is replaced.
+"""
+
+import json
+import locale
+import os
+from datetime import datetime
+
+from .log_files import compression, open_log
+from .log_formats import row_reader
+from .log_parser import match_jobs, report_malformed
+from .timestamp_parser import TimestampParser
+
+STATE_SUFFIX = ".state.json"
+# bytes from the start of the log kept in the state to spot copy-truncate
+# rotations that already grew past the saved offset
+HEAD_SIZE = 64
+
+
+def state_path(filename, state_dir=None):
+    if state_dir is None:
+        return filename + STATE_SUFFIX
+    # keep the state of logs with the same name in different folders apart
+    name = os.path.abspath(filename).strip(os.sep).replace(os.sep, "_")
+    return os.path.join(state_dir, name + STATE_SUFFIX)
+
+
+def load_state(path):
+    try:
+        with open(path) as state_file:
+            return json.load(state_file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable state file {path}: {e}")
+        return None
+
+
+def save_state(path, state):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # write to a temporary file first so a crash never leaves a partial state
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "w") as state_file:
+        json.dump(state, state_file)
+    os.replace(temporary_path, path)
+
+
+def read_head(logfile):
+    logfile.seek(0)
+    return logfile.read(HEAD_SIZE).hex()
+
+
+def dump_jobs(jobs):
+    return {
+        pid: timestamp if isinstance(timestamp, int) else timestamp.isoformat()
+        for pid, timestamp in jobs.items()
+    }
+
+
+def load_jobs(saved_jobs, time_format, compact=False):
+    # the jobs may have been saved by a run with the other job representation
+    parse_timestamp = TimestampParser(time_format)
+    jobs = {}
+    for pid, timestamp in saved_jobs.items():
+        if isinstance(timestamp, int):
+            jobs[pid] = (
+                timestamp if compact else parse_timestamp.from_seconds(timestamp)
+            )
+        else:
+            timestamp = datetime.fromisoformat(timestamp)
+            jobs[pid] = parse_timestamp.to_seconds(timestamp) if compact else timestamp
+    return jobs
+
+
+def resume_point(state, stat, head, time_format, compact=False):
+    if (
+        state is None
+        or state.get("inode") != stat.st_ino
+        or state.get("offset", 0) > stat.st_size
+        or not head.startswith(state.get("head", ""))
+        or state.get("time_format") != time_format
+    ):
+        return 0, {}
+    return state["offset"], load_jobs(state.get("jobs", {}), time_format, compact)
+
+
+class LineTail:
+    # iterates over the complete lines of a binary log file from a byte offset,
+    # keeping track of the offset right after the last line handed out
+
+    def __init__(self, logfile, offset=0):
+        self.logfile = logfile
+        self.offset = offset
+        # decode with the same default encoding a text-mode open() would use
+        self.encoding = locale.getpreferredencoding(False)
+        logfile.seek(offset)
+
+    def __iter__(self):
+        for line in self.logfile:
+            if not line.endswith(b"\n"):
+                # not fully written yet, read it again next time
+                self.logfile.seek(self.offset)
+                break
+            self.offset += len(line)
+            yield line.decode(self.encoding)
+
+
+def iter_archive_jobs(
+    filename,
+    time_format="%H:%M:%S",
+    state_dir=None,
+    compact=False,
+    on_malformed=report_malformed,
+    log_format=None,
+):
+    # compressed archives do not grow: parse one whole once, and again only if
+    # it is replaced
+    path = state_path(filename, state_dir)
+    stat = os.stat(filename)
+    archive = {"inode": stat.st_ino, "size": stat.st_size, "time_format": time_format}
+    state = load_state(path)
+    if state is not None and all(state.get(key) == archive[key] for key in archive):
+        return
+    with open_log(filename) as logfile:
+        yield from match_jobs(
+            row_reader(log_format)(logfile, on_malformed=on_malformed),
+            time_format=time_format,
+            compact=compact,
+        )
+    save_state(path, archive)
+
+
+def iter_new_jobs(
+    filename,
+    time_format="%H:%M:%S",
+    state_dir=None,
+    compact=False,
+    on_malformed=report_malformed,
+    log_format=None,
+):
+    if compression(filename) is not None:
+        yield from iter_archive_jobs(
+            filename, time_format, state_dir, compact, on_malformed, log_format
+        )
+        return
+    path = state_path(filename, state_dir)
+
+    with open(filename, "rb") as logfile:
+        stat = os.fstat(logfile.fileno())
+        head = read_head(logfile)
+        offset, jobs = resume_point(load_state(path), stat, head, time_format, compact)
+        if offset == stat.st_size:
+            # nothing new since the previous run
+            return
+        tail = LineTail(logfile, offset)
+        yield from match_jobs(
+            row_reader(log_format)(tail, on_malformed=on_malformed),
+            time_format=time_format,
+            jobs=jobs,
+            compact=compact,
+        )
+
+    save_state(
+        path,
+        {
+            "inode": stat.st_ino,
+            "size": stat.st_size,
+            "head": head,
+            "offset": tail.offset,
+            "time_format": time_format,
+            "jobs": dump_jobs(jobs),
+        },
+    )
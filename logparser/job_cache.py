@@ -0,0 +1,357 @@
+"""
+On-disk cache of parsed jobs.
+
+cached_jobs: returns the jobs of a log file, as a JobTable on a hit. On a miss
+the jobs are parsed and yielded one by one as usual, so the report starts at
+once, while they are written into the entry batch by batch; the entry is stored
+once the file has been read to its end. An entry is found by the file's
+absolute path, size and mtime, the time format and the log format (see
+log_formats.py), and only used when a hash of the file's content still matches
+the one stored in it, so a changed or replaced file never hits a stale entry,
+while reports with other thresholds over the same files skip parsing
+completely. The content is hashed after a miss has been reported, when the file
+was just read, and before a hit is used. The malformed rows of the file are
+kept in the entry too and reported again on every hit.
+
+Jobs are stored in integer seconds, so the cache is only for time formats
+without fractions of a second or time zones (TimestampParser.whole_seconds),
+or for reports that use integer seconds anyway.
+
+Entries are binary files in the cache folder, mapped back into memory with mmap:
+the start, end and duration columns are used in place as int64 views over the
+mapping, and a description or pid is only decoded when its job is read. While a
+miss is parsed, each column of its entry is spooled to a temporary file that
+stays in memory only while it is small, so neither a miss nor a hit holds the
+jobs of a large file in memory.
+
+Each hit touches the entry's mtime. The first entry a process stores in a cache
+folder counts the size of the folder, and later ones add their own size to that
+count. When it crosses max_bytes, the least recently used entries are removed
+until the folder fits in three quarters of max_bytes, so a run over many small
+files does not scan the folder for every one of them.
+
+Entry layout (the columns are in native byte order, the cache is local):
+- magic "LPJ4", uint32 job count n, uint32 description count d, uint32 count of
+  malformed rows, the 16-byte content hash of the log
+- start, end, duration: n int64 each
+- description: n uint32 indexes into the d descriptions that follow
+- pid: n + 1 uint32 offsets and the UTF-8 strings
+- the malformed rows, one JSON array per line
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+from array import array
+from tempfile import SpooledTemporaryFile
+
+from .job_records import JobTable
+from .log_formats import DEFAULT_FORMAT
+from .log_parser import iter_jobs, report_malformed
+from .report_formats import pack_strings, unpack_strings
+
+CACHE_SUFFIX = ".jobs"
+DEFAULT_MAX_BYTES = 256 << 20
+ENTRY_MAGIC = b"LPJ4"
+_HEADER = struct.Struct("<4sIII16s")
+_HASH_BLOCK_SIZE = 1 << 20
+# jobs spooled at a time on a miss, and the size a spooled column keeps in memory
+_BATCH_SIZE = 1 << 14
+_SPOOL_SIZE = 1 << 20
+
+# bytes in each cache folder, as counted by this process, see _account
+_folder_sizes = {}
+
+
+def default_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "log_parser")
+
+
+def content_hash(filename):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filename, "rb") as logfile:
+        for block in iter(lambda: logfile.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def cache_key(filename, time_format, log_format=None, stat=None):
+    # the content hash is checked against the entry, see load_entry
+    if stat is None:
+        stat = os.stat(filename)
+    fingerprint = "\0".join(
+        (
+            os.path.abspath(filename),
+            str(stat.st_size),
+            str(stat.st_mtime_ns),
+            time_format,
+            "" if log_format in (None, DEFAULT_FORMAT) else repr(log_format),
+        )
+    )
+    return hashlib.blake2b(fingerprint.encode(), digest_size=16).hexdigest()
+
+
+class _DescriptionColumn:
+    # the descriptions of a hit, looked up by the indexes in the mapping
+
+    def __init__(self, dictionary, indexes):
+        self.dictionary = dictionary
+        self.indexes = indexes
+
+    def __len__(self):
+        return len(self.indexes)
+
+    def __getitem__(self, index):
+        return self.dictionary[self.indexes[index]]
+
+    def __iter__(self):
+        return map(self.dictionary.__getitem__, self.indexes)
+
+
+class _StringColumn:
+    # the pids of a hit, decoded from the mapping as they are read
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        index = range(len(self))[index]
+        return str(self.data[self.offsets[index] : self.offsets[index + 1]], "utf-8")
+
+    def __iter__(self):
+        data, offsets = self.data, self.offsets
+        return (
+            str(data[start:end], "utf-8") for start, end in zip(offsets, offsets[1:])
+        )
+
+
+def _malformed_rows(mapping, position, count):
+    # reads the rows one at a time, as they are reported
+    for _ in range(count):
+        end = mapping.find(b"\n", position)
+        yield json.loads(mapping[position:end])
+        position = end + 1
+
+
+class _EntryWriter:
+    # Spools the columns of an entry while its jobs are yielded, _BATCH_SIZE
+    # jobs at a time, and writes them out in the entry layout with save.
+
+    def __init__(self):
+        self.count = 0
+        self.malformed = 0
+        self.dictionary = {}
+        self._pid_size = 0
+        # start, end, duration, description indexes, pid offsets
+        self._columns = [array("q"), array("q"), array("q"), array("I"), array("I")]
+        self._columns[4].append(0)
+        self._pid_data = bytearray()
+        # the five columns, then the pid strings and the malformed rows
+        self._files = [SpooledTemporaryFile(_SPOOL_SIZE) for _ in range(7)]
+
+    def add(self, job):
+        start, end, duration, indexes, pid_ends = self._columns
+        start.append(job.start)
+        end.append(job.end)
+        duration.append(job.duration)
+        indexes.append(
+            self.dictionary.setdefault(job.description, len(self.dictionary))
+        )
+        pid = job.pid.encode()
+        self._pid_data += pid
+        self._pid_size += len(pid)
+        pid_ends.append(self._pid_size)
+        self.count += 1
+        if len(start) >= _BATCH_SIZE:
+            self._flush()
+
+    def add_malformed(self, row):
+        self._files[6].write(json.dumps(row).encode() + b"\n")
+        self.malformed += 1
+
+    def _flush(self):
+        for column, spool in zip(self._columns, self._files):
+            spool.write(column.tobytes())
+            del column[:]
+        self._files[5].write(self._pid_data)
+        self._pid_data.clear()
+
+    def save(self, path, digest=bytes(16)):
+        # returns the size of the stored entry
+        self._flush()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # parallel workers may store the same entry, each through its own file
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as entry_file:
+            entry_file.write(
+                _HEADER.pack(
+                    ENTRY_MAGIC,
+                    self.count,
+                    len(self.dictionary),
+                    self.malformed,
+                    digest,
+                )
+            )
+            for index, spool in enumerate(self._files):
+                if index == 4:
+                    # the descriptions follow their indexes
+                    entry_file.write(pack_strings(self.dictionary))
+                spool.seek(0)
+                shutil.copyfileobj(spool, entry_file)
+            size = entry_file.tell()
+        os.replace(temporary_path, path)
+        return size
+
+    def close(self):
+        for spool in self._files:
+            spool.close()
+
+
+def load_entry(path, filename=None):
+    # returns (JobTable, malformed rows), or None when there is no usable entry;
+    # with filename, also when the entry was stored for other content
+    try:
+        with open(path, "rb") as entry_file:
+            mapping = mmap.mmap(entry_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        magic, count, entries, malformed, digest = _HEADER.unpack_from(mapping)
+        if magic != ENTRY_MAGIC:
+            return None
+        if filename is not None and digest != content_hash(filename):
+            return None
+        view = memoryview(mapping)
+        position = _HEADER.size
+        columns = []
+        for _ in range(3):
+            end = position + 8 * count
+            columns.append(view[position:end].cast("q"))
+            position = end
+        indexes = view[position : position + 4 * count].cast("I")
+        dictionary, position = unpack_strings(mapping, position + 4 * count, entries)
+        end = position + 4 * (count + 1)
+        pid_ends = view[position:end].cast("I")
+        position = end + pid_ends[-1]
+        if len(indexes) != count or position > len(mapping):
+            return None
+        pids = _StringColumn(view[end:position], pid_ends)
+    except (struct.error, TypeError, ValueError, IndexError):
+        return None
+    table = JobTable.from_columns(
+        _DescriptionColumn(dictionary, indexes), pids, *columns
+    )
+    return table, _malformed_rows(mapping, position, malformed)
+
+
+def _scan(cache_dir, keep=None):
+    entries = []
+    with os.scandir(cache_dir) as scan:
+        for entry in scan:
+            if entry.name.endswith(CACHE_SUFFIX) and entry.path != keep:
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+    return entries
+
+
+def evict(cache_dir, max_bytes, keep=None):
+    # returns the size of the entries that are left
+    entries = _scan(cache_dir, keep)
+    total = sum(size for _, size, _ in entries)
+    if keep is not None and os.path.exists(keep):
+        total += os.path.getsize(keep)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # removed by another process in the meantime
+            pass
+        total -= size
+    return total
+
+
+def _account(cache_dir, max_bytes, path, size):
+    # counts the folder once, then only the entries stored since, and evicts
+    # with some headroom so that the next entries do not scan it again
+    total = _folder_sizes.get(cache_dir)
+    if total is None:
+        total = sum(size for _, size, _ in _scan(cache_dir))
+    else:
+        total += size
+    if total > max_bytes:
+        total = evict(cache_dir, max_bytes - max_bytes // 4, keep=path)
+    _folder_sizes[cache_dir] = total
+
+
+def _stored_jobs(filename, stat, jobs, path, cache_dir, max_bytes, writer):
+    # yields the jobs while spooling them, and stores them once all are read
+    try:
+        for job in jobs:
+            writer.add(job)
+            yield job
+        after = os.stat(filename)
+        if (after.st_size, after.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            # written to while it was parsed: the jobs may be of either version
+            return
+        try:
+            size = writer.save(path, content_hash(filename))
+            _account(cache_dir, max_bytes, path, size)
+        except OSError as e:
+            print(f"Could not cache the jobs of {filename}: {e}")
+    finally:
+        writer.close()
+
+
+def cached_jobs(
+    filename,
+    time_format="%H:%M:%S",
+    cache_dir=None,
+    max_bytes=DEFAULT_MAX_BYTES,
+    reader="csv",
+    on_malformed=report_malformed,
+    log_format=None,
+):
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    stat = os.stat(filename)
+    key = cache_key(filename, time_format, log_format, stat)
+    path = os.path.join(cache_dir, key + CACHE_SUFFIX)
+
+    entry = load_entry(path, filename)
+    if entry is not None:
+        table, malformed_rows = entry
+        # mark the entry as recently used
+        os.utime(path)
+        for row in malformed_rows:
+            on_malformed(row)
+        return table
+
+    writer = _EntryWriter()
+
+    def collect_malformed(row):
+        writer.add_malformed(row)
+        on_malformed(row)
+
+    jobs = iter_jobs(
+        filename,
+        time_format=time_format,
+        reader=reader,
+        compact=True,
+        on_malformed=collect_malformed,
+        log_format=log_format,
+    )
+    return _stored_jobs(filename, stat, jobs, path, cache_dir, max_bytes, writer)
@@ -0,0 +1,236 @@
+"""
+Persistent SQLite index of parsed jobs, for queries over historical logs.
+
+index_paths: ingests the jobs of log files, and of the .log files in folders,
+into an SQLite database. Ingestion is incremental per file: the database keeps
+for every file the same resume state as incremental.py (inode, first bytes,
+byte offset and the jobs still open there), so each run parses only the bytes
+appended since the previous one. A rotated or truncated file is indexed again
+from the start, replacing its previous jobs. Compressed archives are indexed
+whole by ingest_archive, and again only when the archive changes.
+
+query_jobs: yields the indexed jobs above the warning threshold as compact Job
+records, optionally only those of one description or PID or started in a time
+range, in start time order. Feeding them to generate_report classifies them
+with the same threshold logic as a report over the log files themselves.
+
+The jobs table is indexed on description, pid, start time and duration, so a
+query only reads the matching rows whatever the size of the history.
+"""
+
+import json
+import os
+import sqlite3
+from contextlib import closing
+from datetime import timedelta
+
+from .incremental import LineTail, dump_jobs, read_head, resume_point
+from .job_records import Job
+from .log_files import compression, open_log
+from .log_formats import row_reader
+from .log_parser import match_jobs, report_malformed
+from .timestamp_parser import TimestampParser
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    head TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    time_format TEXT NOT NULL,
+    jobs TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    file TEXT NOT NULL,
+    description TEXT NOT NULL,
+    pid TEXT NOT NULL,
+    start_time INTEGER NOT NULL,
+    end_time INTEGER NOT NULL,
+    duration INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_file ON jobs (file);
+CREATE INDEX IF NOT EXISTS jobs_description ON jobs (description);
+CREATE INDEX IF NOT EXISTS jobs_pid ON jobs (pid);
+CREATE INDEX IF NOT EXISTS jobs_start_time ON jobs (start_time);
+CREATE INDEX IF NOT EXISTS jobs_duration ON jobs (duration);
+"""
+STATE_FIELDS = ("inode", "size", "head", "offset", "time_format", "jobs")
+
+
+def connect(db_path):
+    connection = sqlite3.connect(db_path)
+    # readers can query while a new batch of logs is being indexed
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def load_file_state(connection, path):
+    row = connection.execute(
+        f"SELECT {', '.join(STATE_FIELDS)} FROM files WHERE path = ?",  # nosec B608
+        (path,),
+    ).fetchone()
+    if row is None:
+        return None
+    state = dict(zip(STATE_FIELDS, row))
+    state["jobs"] = json.loads(state["jobs"])
+    return state
+
+
+def _insert_jobs(connection, path, rows, time_format, jobs):
+    return connection.executemany(
+        "INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?)",
+        (
+            (path, *job)
+            for job in match_jobs(
+                rows, time_format=time_format, jobs=jobs, compact=True
+            )
+        ),
+    ).rowcount
+
+
+def _save_file_state(connection, path, stat, head, offset, time_format, jobs):
+    connection.execute(
+        "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            path,
+            stat.st_ino,
+            stat.st_size,
+            head,
+            offset,
+            time_format,
+            json.dumps(dump_jobs(jobs)),
+        ),
+    )
+    # one transaction per file, so an interrupted run loses at most one file
+    connection.commit()
+
+
+def ingest_archive(
+    connection,
+    filename,
+    time_format="%H:%M:%S",
+    on_malformed=report_malformed,
+    log_format=None,
+):
+    # offsets into a compressed file would count decompressed bytes, so an
+    # archive is always indexed whole, again whenever the archive itself changes
+    path = os.path.abspath(filename)
+    stat = os.stat(filename)
+    state = load_file_state(connection, path)
+    if state is not None and (
+        state["inode"],
+        state["size"],
+        state["time_format"],
+    ) == (stat.st_ino, stat.st_size, time_format):
+        return 0
+    connection.execute("DELETE FROM jobs WHERE file = ?", (path,))
+    with open_log(filename) as logfile:
+        count = _insert_jobs(
+            connection,
+            path,
+            row_reader(log_format)(logfile, on_malformed=on_malformed),
+            time_format,
+            {},
+        )
+    _save_file_state(connection, path, stat, "", stat.st_size, time_format, {})
+    return count
+
+
+def ingest_file(
+    connection,
+    filename,
+    time_format="%H:%M:%S",
+    on_malformed=report_malformed,
+    log_format=None,
+):
+    if compression(filename) is not None:
+        return ingest_archive(
+            connection, filename, time_format, on_malformed, log_format
+        )
+    path = os.path.abspath(filename)
+    with open(filename, "rb") as logfile:
+        stat = os.fstat(logfile.fileno())
+        head = read_head(logfile)
+        state = load_file_state(connection, path)
+        offset, jobs = resume_point(state, stat, head, time_format, compact=True)
+        if state is not None and offset == stat.st_size:
+            # nothing new since the previous run
+            return 0
+        if offset == 0:
+            # new, rotated or truncated: its previous jobs no longer apply
+            connection.execute("DELETE FROM jobs WHERE file = ?", (path,))
+        tail = LineTail(logfile, offset)
+        count = _insert_jobs(
+            connection,
+            path,
+            row_reader(log_format)(tail, on_malformed=on_malformed),
+            time_format,
+            jobs,
+        )
+    _save_file_state(connection, path, stat, head, tail.offset, time_format, jobs)
+    return count
+
+
+def index_paths(
+    db_path,
+    paths,
+    time_format="%H:%M:%S",
+    on_malformed=report_malformed,
+    log_format=None,
+):
+    # imported here since parallel builds on log_parser's functions
+    from .parallel import list_log_files
+
+    with closing(connect(db_path)) as connection:
+        for path in paths:
+            if os.path.isdir(path):
+                filenames = [os.path.join(path, name) for name in list_log_files(path)]
+            else:
+                filenames = [path]
+            for filename in filenames:
+                count = ingest_file(
+                    connection,
+                    filename,
+                    time_format,
+                    on_malformed=on_malformed,
+                    log_format=log_format,
+                )
+                print(f"Indexed {count} new jobs from {filename}")
+
+
+def query_jobs(
+    db_path,
+    warning_threshold=timedelta(minutes=5),
+    description=None,
+    pid=None,
+    since=None,
+    until=None,
+    time_format="%H:%M:%S",
+):
+    # since and until are timestamps in time_format, bounding the start time
+    parse_timestamp = TimestampParser(time_format)
+    conditions = ["duration > ?"]
+    parameters = [warning_threshold.total_seconds()]
+    for column, operator, value in (
+        ("description", "=", description),
+        ("pid", "=", pid),
+        ("start_time", ">=", since),
+        ("start_time", "<", until),
+    ):
+        if value is None:
+            continue
+        if column == "start_time":
+            value = parse_timestamp.seconds(value)
+        conditions.append(f"{column} {operator} ?")
+        parameters.append(value)
+
+    with closing(connect(db_path)) as connection:
+        cursor = connection.execute(
+            "SELECT description, pid, start_time, end_time, duration FROM jobs "
+            f"WHERE {' AND '.join(conditions)} ORDER BY start_time",  # nosec B608
+            parameters,
+        )
+        for row in cursor:
+            yield Job(*row)
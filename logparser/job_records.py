@@ -0,0 +1,149 @@
+"""
+Compact job representations for in-memory analysis of large log files.
+
+Job: a named tuple holding one completed job, with the start time, end time and
+duration stored as integer seconds instead of datetime.time and timedelta
+objects (see TimestampParser.to_seconds for what the seconds are counted from).
+
+JobTable: a columnar container of jobs. Start times, end times and durations
+are kept in array("q") columns and the description and pid strings are
+interned, so each job costs a few dozen bytes instead of a dict of objects.
+
+Both can be converted back to the dict layout returned by parse_log_file with
+as_dict, which is what generate_report does for them, and Job.from_dict converts
+such a dict into a Job.
+
+classify_durations: flags a whole column of integer durations against the
+warning and error thresholds in one pass. NumPy is used when it is installed,
+otherwise a plain comprehension over the array is used. It is imported on the
+first call, so importing this module stays cheap.
+"""
+
+from array import array
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import NamedTuple
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def seconds_to_time(seconds):
+    return (_EPOCH + timedelta(seconds=seconds)).time()
+
+
+def time_to_seconds(value):
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+@lru_cache(maxsize=None)
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def classify_durations(durations, warning_seconds, error_seconds):
+    # returns (index, is_error) for every duration above the warning threshold
+    numpy = _import_numpy() if len(durations) else None
+    if numpy is not None:
+        values = numpy.frombuffer(durations, dtype=numpy.int64)
+        flagged = numpy.flatnonzero(values > warning_seconds)
+        is_error = values[flagged] > error_seconds
+        return list(zip(flagged.tolist(), is_error.tolist()))
+    return [
+        (index, duration > error_seconds)
+        for index, duration in enumerate(durations)
+        if duration > warning_seconds
+    ]
+
+
+class Job(NamedTuple):
+    description: str
+    pid: str
+    start: int
+    end: int
+    duration: int
+
+    def as_dict(self):
+        return {
+            "description": self.description,
+            "pid": self.pid,
+            "start_time": seconds_to_time(self.start),
+            "end_time": seconds_to_time(self.end),
+            "duration": timedelta(seconds=self.duration),
+        }
+
+    @classmethod
+    def from_dict(cls, job):
+        # the dicts keep only the time of day, so start and end become seconds
+        # since midnight
+        return cls(
+            job["description"],
+            job["pid"],
+            time_to_seconds(job["start_time"]),
+            time_to_seconds(job["end_time"]),
+            int(job["duration"].total_seconds()),
+        )
+
+
+class JobTable:
+    def __init__(self, jobs=()):
+        self.descriptions = []
+        self.pids = []
+        self.start = array("q")
+        self.end = array("q")
+        self.duration = array("q")
+        self._strings = {}
+        for job in jobs:
+            self.append(job)
+
+    @classmethod
+    def from_columns(cls, descriptions, pids, start, end, duration):
+        # the columns may be any int64 buffers, e.g. memoryviews of a mapped file
+        table = cls()
+        table.descriptions = descriptions
+        table.pids = pids
+        table.start = start
+        table.end = end
+        table.duration = duration
+        return table
+
+    def _intern(self, value):
+        return self._strings.setdefault(value, value)
+
+    def append(self, job):
+        self.descriptions.append(self._intern(job.description))
+        self.pids.append(self._intern(job.pid))
+        self.start.append(job.start)
+        self.end.append(job.end)
+        self.duration.append(job.duration)
+
+    def __len__(self):
+        return len(self.duration)
+
+    def classify(self, warning_threshold, error_threshold, start=0, stop=None):
+        # with start and stop, only those rows; the indexes are of the whole table
+        flagged = classify_durations(
+            self.duration[start:stop],
+            warning_threshold.total_seconds(),
+            error_threshold.total_seconds(),
+        )
+        if start:
+            flagged = [(start + index, is_error) for index, is_error in flagged]
+        return flagged
+
+    def __getitem__(self, index):
+        return Job(
+            self.descriptions[index],
+            self.pids[index],
+            self.start[index],
+            self.end[index],
+            self.duration[index],
+        )
+
+    def __iter__(self):
+        return map(
+            Job, self.descriptions, self.pids, self.start, self.end, self.duration
+        )
@@ -0,0 +1,218 @@
+"""
+Per-description duration statistics for capacity planning.
+
+JobSummary: collects, for every job description, the job count, the mean and
+maximum duration, the p50, p95 and p99 durations and the number of jobs over
+the warning and error thresholds (classified like generate_report). It takes
+the same arguments as generate_report, so it can replace it as the report of
+any job source, and summaries of different files or workers can be merged.
+
+DDSketch: the quantile sketch behind the percentiles. Durations are counted in
+logarithmic buckets, so every quantile is within relative_accuracy (1% by
+default) of the exact value, and a sketch holds at most a few hundred counters
+whatever the number of jobs. Memory is therefore bounded by the number of
+distinct descriptions, and two sketches merge exactly by adding their counters.
+
+write_summary: writes a summary as an aligned text table, as JSON lines or as
+CSV, one row per description in description order.
+"""
+
+import csv
+import json
+import math
+from datetime import timedelta
+
+from .job_records import Job, JobTable
+
+SUMMARY_FIELDS = (
+    "description",
+    "count",
+    "mean",
+    "max",
+    "p50",
+    "p95",
+    "p99",
+    "warnings",
+    "errors",
+)
+QUANTILES = (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+# durations at or below this many seconds share the sketch's zero bucket
+MIN_DURATION = 1e-6
+
+
+class DDSketch:
+    def __init__(self, relative_accuracy=0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        # bucket index -> count; bucket i holds (gamma ** (i - 1), gamma ** i]
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value <= MIN_DURATION:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with a different accuracy")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # the value halfway (relatively) between the bucket bounds
+                return 2 * self.gamma**index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+
+class DescriptionStats:
+    def __init__(self, relative_accuracy=0.01):
+        self.count = 0
+        self.total = 0
+        self.maximum = None
+        self.warnings = 0
+        self.errors = 0
+        self.sketch = DDSketch(relative_accuracy)
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        if other.maximum is not None and (
+            self.maximum is None or other.maximum > self.maximum
+        ):
+            self.maximum = other.maximum
+        self.warnings += other.warnings
+        self.errors += other.errors
+        self.sketch.merge(other.sketch)
+
+    def as_record(self, description):
+        # durations in seconds
+        record = {
+            "description": description,
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "max": self.maximum,
+        }
+        for field, q in QUANTILES:
+            value = self.sketch.quantile(q)
+            # a bucket's midpoint may lie past the exact maximum
+            record[field] = value if value is None else min(value, self.maximum)
+        record["warnings"] = self.warnings
+        record["errors"] = self.errors
+        return record
+
+
+class JobSummary:
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.descriptions = {}
+
+    def add(self, description, duration, warning_seconds, error_seconds):
+        # duration, warning_seconds and error_seconds are seconds
+        stats = self.descriptions.get(description)
+        if stats is None:
+            stats = self.descriptions[description] = DescriptionStats(
+                self.relative_accuracy
+            )
+        stats.count += 1
+        stats.total += duration
+        if stats.maximum is None or duration > stats.maximum:
+            stats.maximum = duration
+        if duration > error_seconds:
+            stats.errors += 1
+        elif duration > warning_seconds:
+            stats.warnings += 1
+        stats.sketch.add(duration)
+
+    def update(
+        self,
+        jobs,
+        warning_threshold=timedelta(minutes=5),
+        error_threshold=timedelta(minutes=10),
+    ):
+        warning_seconds = warning_threshold.total_seconds()
+        error_seconds = error_threshold.total_seconds()
+        if isinstance(jobs, JobTable):
+            # straight from the columns, without building a Job per row
+            for description, duration in zip(jobs.descriptions, jobs.duration):
+                self.add(description, duration, warning_seconds, error_seconds)
+            return
+        for job in jobs:
+            if isinstance(job, Job):
+                self.add(job.description, job.duration, warning_seconds, error_seconds)
+                continue
+            duration = job["duration"]
+            if not isinstance(duration, timedelta):
+                print(f"Invalid duration for job {job['description']}: {duration}")
+                continue
+            self.add(
+                job["description"],
+                duration.total_seconds(),
+                warning_seconds,
+                error_seconds,
+            )
+
+    def merge(self, other):
+        for description, stats in other.descriptions.items():
+            mine = self.descriptions.get(description)
+            if mine is None:
+                mine = self.descriptions[description] = DescriptionStats(
+                    self.relative_accuracy
+                )
+            mine.merge(stats)
+
+    def records(self):
+        for description in sorted(self.descriptions):
+            yield self.descriptions[description].as_record(description)
+
+
+def format_seconds(seconds):
+    if seconds is None:
+        return "-"
+    return str(timedelta(seconds=round(seconds)))
+
+
+def write_summary(summary, stream, output_format="text"):
+    if output_format == "jsonl":
+        for record in summary.records():
+            stream.write(json.dumps(record, separators=(",", ":")) + "\n")
+    elif output_format == "csv":
+        writer = csv.DictWriter(stream, SUMMARY_FIELDS, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(summary.records())
+    elif output_format == "text":
+        rows = [[field.capitalize() for field in SUMMARY_FIELDS]]
+        for record in summary.records():
+            rows.append(
+                [record["description"], str(record["count"])]
+                + [format_seconds(record[field]) for field in SUMMARY_FIELDS[2:7]]
+                + [str(record["warnings"]), str(record["errors"])]
+            )
+        widths = [
+            max(len(row[column]) for row in rows) for column in range(len(rows[0]))
+        ]
+        for row in rows:
+            # descriptions left-aligned, numbers right-aligned
+            cells = [row[0].ljust(widths[0])]
+            cells += [cell.rjust(width) for cell, width in zip(row[1:], widths[1:])]
+            stream.write("  ".join(cells).rstrip() + "\n")
+    else:
+        raise ValueError(f"Unsupported summary format: {output_format}")
@@ -0,0 +1,122 @@
+"""
+Finding and opening log files, including rotated and compressed ones.
+
+walk_log_files: walks a folder tree with os.scandir and returns the relative
+paths of the files matching the include globs and none of the exclude globs,
+sorted. A glob matches either a file name or a whole relative path (with "/"
+separators), so "*.log" matches at every depth and "host1/*" only in one
+folder. Excluded folders are not descended into. The file types come from the
+directory entries, so the walk costs no stat call per file.
+
+open_log: opens a log file as text, the same way as open(filename, newline="").
+.gz, .bz2 and .xz files are decompressed on the fly with the standard library
+(gzip, bz2 and lzma are imported the first time such a file is opened), and
+.zst files with the optional zstandard package, imported only when such a
+file is found, so compressed archives are never expanded to disk. Without
+zstandard the walk skips .zst files with a message.
+"""
+
+import fnmatch
+import io
+import locale
+import os
+import re
+from importlib import import_module
+
+DEFAULT_INCLUDE = (
+    "*.log",
+    "*.log.[0-9]*",
+    "*.log.gz",
+    "*.log.bz2",
+    "*.log.xz",
+    "*.log.zst",
+)
+# incremental.py state files and unfinished temporary files next to the logs
+DEFAULT_EXCLUDE = ("*.state.json", "*.tmp")
+
+
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def _open_zstd(filename, mode):
+    zstandard = _import_zstandard()
+    if zstandard is None:
+        raise ValueError(
+            f"Reading {filename} needs the zstandard package (pip install zstandard)"
+        )
+    # buffered, so that it can be iterated over line by line like the others
+    return io.BufferedReader(zstandard.open(filename, mode))
+
+
+# the standard library openers are named by module, so that uncompressed logs
+# never pay for importing them
+COMPRESSED_OPENERS = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "lzma",
+    ".zst": _open_zstd,
+}
+
+
+def compression(filename):
+    # the compressed file suffix of filename, or None
+    suffix = os.path.splitext(filename)[1]
+    return suffix if suffix in COMPRESSED_OPENERS else None
+
+
+def open_log(filename, binary=False):
+    suffix = compression(filename)
+    if suffix is None:
+        return open(filename, "rb") if binary else open(filename, newline="")
+    opener = COMPRESSED_OPENERS[suffix]
+    if isinstance(opener, str):
+        opener = import_module(opener).open
+    stream = opener(filename, "rb")
+    if binary:
+        return stream
+    # decode with the same default encoding a text-mode open() would use
+    return io.TextIOWrapper(
+        stream, encoding=locale.getpreferredencoding(False), newline=""
+    )
+
+
+def _compile_globs(patterns):
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
+
+
+def walk_log_files(folder, include=DEFAULT_INCLUDE, exclude=DEFAULT_EXCLUDE):
+    included = _compile_globs(include)
+    excluded = _compile_globs(exclude)
+    found = []
+    pending = [""]
+    while pending:
+        relative_folder = pending.pop()
+        with os.scandir(os.path.join(folder, relative_folder)) as scan:
+            for entry in scan:
+                relative_path = relative_folder + entry.name
+                if excluded and (
+                    excluded.match(entry.name) or excluded.match(relative_path)
+                ):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(relative_path + "/")
+                    continue
+                if included and not (
+                    included.match(entry.name) or included.match(relative_path)
+                ):
+                    continue
+                if compression(entry.name) == ".zst" and _import_zstandard() is None:
+                    print(f"Skipping {relative_path}: .zst needs the zstandard package")
+                    continue
+                found.append(relative_path)
+    found.sort()
+    if os.sep != "/":
+        found = [path.replace("/", os.sep) for path in found]
+    return found
@@ -0,0 +1,156 @@
+"""
+Log layouts other than the default four CSV columns.
+
+LogFormat: describes where the four fields of an event are and which status
+tokens start and end a job:
+- kind: "csv", "tsv", "jsonl" (one JSON object per line) or "kv" (key=value
+  pairs, values with spaces in double quotes)
+- fields: the positions of the timestamp, description, status and PID, in that
+  order: column numbers for csv and tsv, keys for jsonl and kv
+- width: the number of columns of a csv or tsv row (other rows are malformed)
+- start, end: the status tokens of START and END events; any other status,
+  including a literal START or END when other tokens are given, is neither
+
+parse_log_format: builds a LogFormat from the --log-format, --fields,
+--start-token and --end-token options. For csv and tsv, fields is the column
+layout, e.g. "host,timestamp,pid,status,description" (columns with any other
+name are ignored); for jsonl and kv it renames keys, e.g.
+"timestamp=ts,description=job".
+
+row_reader: compiles a LogFormat into a reader with the signature of
+log_parser.read_rows. The column or key lookups are bound into an itemgetter
+and the status tokens into a dict once, and every row comes out as
+[timestamp, description, "START"/"END", pid], so the START/END matching of
+match_jobs (and everything built on it) is shared by all layouts. The default
+CSV layout gets log_parser.read_rows itself.
+"""
+
+import csv
+import re
+from functools import lru_cache
+from operator import itemgetter
+from typing import NamedTuple
+
+ROLES = ("timestamp", "description", "status", "pid")
+KINDS = ("csv", "tsv", "jsonl", "kv")
+DELIMITERS = {"csv": ",", "tsv": "\t"}
+# what other status tokens become, so they neither start nor end a job
+UNKNOWN_STATUS = ""
+
+# key=value or key="value with \"escaped\" quotes"
+_KV_PAIR = re.compile(r'([^\s=]+)=("(?:[^"\\]|\\.)*"|\S*)')
+_KV_ESCAPE = re.compile(r"\\(.)")
+
+
+class LogFormat(NamedTuple):
+    kind: str = "csv"
+    fields: tuple = (0, 1, 2, 3)
+    width: int = 4
+    start: str = "START"
+    end: str = "END"
+
+
+DEFAULT_FORMAT = LogFormat()
+
+
+def report_malformed(row):
+    # the default on_malformed of every reader (log_parser re-exports it)
+    print(f"Skipping malformed row: {row}")
+
+
+def parse_log_format(kind="csv", fields=None, start="START", end="END"):
+    if kind not in KINDS:
+        raise ValueError(f"Unknown log format {kind!r}, expected one of {KINDS}")
+    if kind in DELIMITERS:
+        layout = fields.split(",") if fields else list(ROLES)
+        layout = [name.strip() for name in layout]
+        missing = [role for role in ROLES if role not in layout]
+        if missing:
+            raise ValueError(f"The --fields layout has no {', '.join(missing)}")
+        positions = tuple(layout.index(role) for role in ROLES)
+        return LogFormat(kind, positions, len(layout), start, end)
+
+    keys = dict(zip(ROLES, ROLES))
+    for item in fields.split(",") if fields else ():
+        role, separator, key = item.partition("=")
+        role = role.strip()
+        if not separator or role not in keys or not key.strip():
+            raise ValueError(
+                f"Expected ROLE=KEY with ROLE one of {', '.join(ROLES)}, got {item!r}"
+            )
+        keys[role] = key.strip()
+    return LogFormat(kind, tuple(keys[role] for role in ROLES), 0, start, end)
+
+
+def _compile_delimited(log_format):
+    pick = itemgetter(*log_format.fields)
+    width = log_format.width
+    delimiter = DELIMITERS[log_format.kind]
+    statuses = {log_format.start: "START", log_format.end: "END"}
+
+    def read_rows(stream, on_malformed=report_malformed):
+        for row in csv.reader(stream, delimiter=delimiter):
+            if len(row) != width:
+                on_malformed(row)
+                continue
+            timestamp, description, status, pid = pick(row)
+            status = status.strip()
+            yield [
+                timestamp.strip(),
+                description.strip(),
+                statuses.get(status, UNKNOWN_STATUS),
+                pid.strip(),
+            ]
+
+    return read_rows
+
+
+def _parse_kv(line):
+    record = {}
+    for key, value in _KV_PAIR.findall(line):
+        if value.startswith('"'):
+            value = _KV_ESCAPE.sub(r"\1", value[1:-1])
+        record[key] = value
+    return record
+
+
+def _compile_keyed(log_format):
+    pick = itemgetter(*log_format.fields)
+    statuses = {log_format.start: "START", log_format.end: "END"}
+    if log_format.kind == "jsonl":
+        # imported here since only JSON-lines logs need it
+        import json
+
+        decode = json.loads
+    else:
+        decode = _parse_kv
+
+    def read_rows(stream, on_malformed=report_malformed):
+        for line in stream:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                values = pick(decode(line))
+            except (ValueError, KeyError, TypeError):
+                # not an object, or a field is missing
+                on_malformed(line)
+                continue
+            timestamp, description, status, pid = [
+                str(value).strip() for value in values
+            ]
+            yield [timestamp, description, statuses.get(status, UNKNOWN_STATUS), pid]
+
+    return read_rows
+
+
+@lru_cache(maxsize=None)
+def row_reader(log_format=None):
+    if log_format is None or log_format == DEFAULT_FORMAT:
+        # imported here since log_parser reads its rows through this module
+        from .log_parser import read_rows
+
+        return read_rows
+    if log_format.kind in DELIMITERS:
+        return _compile_delimited(log_format)
+    return _compile_keyed(log_format)
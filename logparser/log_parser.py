@@ -0,0 +1,296 @@
+"""
+Simple parser for log files.
+Contains two main functions: parse_log_file and generate_report.
+
+iter_jobs: receives a log file path and yields each job as soon as its END line
+is matched with the corresponding START line, without holding the whole file
+in memory.
+
+parse_log_file: receives a log file path and returns a list of jobs. .gz, .bz2,
+.xz and .zst files are decompressed while they are read (see log_files.py). With
+workers > 1 the file is split into byte ranges parsed in parallel (see parallel.py).
+With reader="mmap" the file is scanned through a memory map instead of csv.reader
+(see mmap_reader.py). A log_format reads tab-separated, JSON-lines or key=value
+logs, or CSV with other columns or status tokens (see log_formats.py).
+With result_type="compact" or "table" the jobs are returned as compact Job tuples
+or as a columnar JobTable (see job_records.py) instead of dicts.
+The log entries are objects containing the following attributes:
+- job description
+- job pid
+- start time
+- end time
+- duration
+
+flag_jobs: receives the same jobs and yields (level, job) for every job over the
+warning threshold, with level "WARNING" or "ERROR".
+
+generate_report: receives a list (or any iterable) of jobs, dicts or compact Job
+records, or a JobTable, and generates a report from flag_jobs. With a writer from
+report_formats.py the flagged jobs are written as JSON Lines, CSV or columnar
+records instead of text lines.
+The report will contain:
+- a warning if any job exceeds 5 minutes
+- an error if any job exceeds 10 minutes
+
+The warnings and errors will also be accompanied by the job information for troubleshooting
+purposes.
+
+The command line is in cli.py, so importing this module does not parse
+sys.argv; the log_parser.py script at the top of the repository runs it.
+"""
+
+import csv
+from datetime import timedelta
+from functools import partial
+
+from .job_records import Job, JobTable
+from .log_files import compression, open_log
+from .log_formats import DEFAULT_FORMAT, report_malformed, row_reader
+from .mmap_reader import read_rows_mmap
+from .open_jobs import OpenJobTable
+from .timestamp_parser import TimestampParser
+
+ONE_DAY = timedelta(days=1)
+SECONDS_PER_DAY = 86400
+# rows of a JobTable classified at a time, see flag_jobs
+CLASSIFY_BATCH_SIZE = 1 << 16
+
+
+def read_rows(csvfile, on_malformed=report_malformed):
+    for row in csv.reader(csvfile):
+        if len(row) != 4:
+
+            # determine action for malformed rows.
+            on_malformed(row)
+            continue
+        yield [item.strip() for item in row]
+
+
+def make_job(description, pid, start_time, end_time, rollover=False):
+    # Check if duration can be successfully calculated
+    try:
+        job_duration = end_time - start_time
+    except Exception as e:
+        print(f"Error calculating duration for {description}: {e}")
+        job_duration = None
+    # time-only timestamps: an END before its START is on the next day
+    if rollover and job_duration is not None and job_duration < timedelta(0):
+        job_duration += ONE_DAY
+    return {
+        "description": description,
+        "pid": pid,
+        "start_time": start_time.time(),
+        "end_time": end_time.time(),
+        "duration": job_duration,
+    }
+
+
+def make_compact_job(description, pid, start, end, rollover=False):
+    # start and end are integer seconds (see TimestampParser.seconds)
+    duration = end - start
+    if rollover and duration < 0:
+        duration += SECONDS_PER_DAY
+    return Job(description, pid, start, end, duration)
+
+
+def job_factory(parse_timestamp, compact=False):
+    # returns how to decode the timestamps and how to build a job from them:
+    # datetimes and dicts, or integer seconds and compact Job records
+    rollover = not parse_timestamp.has_date
+    if compact:
+        return parse_timestamp.seconds, partial(make_compact_job, rollover=rollover)
+    return parse_timestamp, partial(make_job, rollover=rollover)
+
+
+def iter_rows(
+    filename,
+    reader="csv",
+    on_malformed=report_malformed,
+    log_format=None,
+    wrap_lines=None,
+):
+    # compressed files can only be read as a stream, and the memory-mapped
+    # reader only knows the default layout; wrap_lines wraps the stream of
+    # lines of the other readers, e.g. to time the reads (see profiling.py)
+    if (
+        reader == "mmap"
+        and compression(filename) is None
+        and log_format in (None, DEFAULT_FORMAT)
+    ):
+        yield from read_rows_mmap(filename, on_malformed=on_malformed)
+        return
+    with open_log(filename) as csvfile:
+        lines = csvfile if wrap_lines is None else wrap_lines(csvfile)
+        yield from row_reader(log_format)(lines, on_malformed=on_malformed)
+
+
+def match_jobs(
+    rows, time_format="%H:%M:%S", jobs=None, compact=False, parse_timestamp=None
+):
+    # jobs maps each open PID to its START timestamp; callers may pass in (and
+    # keep) their own dict to carry open jobs across calls, or a bounded
+    # OpenJobTable (see open_jobs.py). parse_timestamp replaces the
+    # TimestampParser of time_format, e.g. with an instrumented one
+    if jobs is None:
+        jobs = {}
+    bounded = isinstance(jobs, OpenJobTable)
+    if parse_timestamp is None:
+        parse_timestamp = TimestampParser(time_format)
+    decode, make = job_factory(parse_timestamp, compact)
+
+    for row in rows:
+        job_timestamp_string, job_description, job_status, job_pid = row
+        job_timestamp = decode(job_timestamp_string)
+
+        # add dictionary entry on START log lines with the timestamp value
+        if job_status == "START":
+            if bounded:
+                jobs.start(job_pid, job_description, job_timestamp)
+            else:
+                jobs[job_pid] = job_timestamp
+
+        # on END log lines, pop the timestamp value from the job_pid key
+        elif job_status == "END":
+            start_time = jobs.end(job_pid) if bounded else jobs.pop(job_pid, None)
+            if start_time is not None:
+                # hand the job over as soon as its END line is paired
+                yield make(job_description, job_pid, start_time, job_timestamp)
+
+
+def iter_jobs(
+    filename,
+    time_format="%H:%M:%S",
+    reader="csv",
+    compact=False,
+    on_malformed=report_malformed,
+    log_format=None,
+    open_jobs=None,
+):
+    # open_jobs makes the table of open jobs, e.g. a partial of OpenJobTable;
+    # the jobs it still holds at the end of the file are unterminated
+    jobs = None if open_jobs is None else open_jobs()
+    yield from match_jobs(
+        iter_rows(
+            filename, reader=reader, on_malformed=on_malformed, log_format=log_format
+        ),
+        time_format=time_format,
+        jobs=jobs,
+        compact=compact,
+    )
+    if jobs is not None:
+        jobs.close()
+
+
+def parse_log_file(
+    filename,
+    time_format="%H:%M:%S",
+    workers=1,
+    reader="csv",
+    result_type="dict",
+    log_format=None,
+):
+    compact = result_type in ("compact", "table")
+    # compressed files cannot be split into byte ranges
+    if workers > 1 and compression(filename) is None:
+        # imported here since parallel builds on this module's functions
+        from .parallel import parse_log_file_chunked
+
+        result_jobs = parse_log_file_chunked(
+            filename,
+            time_format=time_format,
+            workers=workers,
+            compact=compact,
+            log_format=log_format,
+        )
+    else:
+        result_jobs = iter_jobs(
+            filename,
+            time_format=time_format,
+            reader=reader,
+            compact=compact,
+            log_format=log_format,
+        )
+    if result_type == "table":
+        return JobTable(result_jobs)
+    return list(result_jobs)
+
+
+def format_job(job):
+    return f"{job['description']} (PID {job['pid']}) from {job['start_time']} to {job['end_time']} - Duration: {job['duration']}"
+
+
+def _write_line(sink, line):
+    sink.write(line + "\n")
+
+
+def classify_duration(duration, warning_threshold, error_threshold):
+    if duration > error_threshold:
+        return "ERROR"
+    if duration > warning_threshold:
+        return "WARNING"
+    return None
+
+
+def flag_jobs(
+    jobs,
+    warning_threshold=timedelta(minutes=5),
+    error_threshold=timedelta(minutes=10),
+    on_invalid=None,
+):
+    # yields (level, job) for every job over the warning threshold; dict jobs
+    # without a timedelta duration go to on_invalid
+    # columnar results are classified a batch of rows at a time
+    if isinstance(jobs, JobTable):
+        for start in range(0, len(jobs), CLASSIFY_BATCH_SIZE):
+            stop = start + CLASSIFY_BATCH_SIZE
+            for index, is_error in jobs.classify(
+                warning_threshold, error_threshold, start, stop
+            ):
+                yield "ERROR" if is_error else "WARNING", jobs[index]
+        return
+
+    warning_seconds = warning_threshold.total_seconds()
+    for job in jobs:
+        if isinstance(job, Job):
+            # skip the conversion for compact jobs below the warning threshold
+            if job.duration <= warning_seconds:
+                continue
+            duration = timedelta(seconds=job.duration)
+        else:
+            duration = job["duration"]
+            # Check if duration is timedelta
+            if not isinstance(duration, timedelta):
+                if on_invalid is not None:
+                    on_invalid(job)
+                continue
+
+        level = classify_duration(duration, warning_threshold, error_threshold)
+        if level:
+            yield level, job
+
+
+def generate_report(
+    jobs,
+    warning_threshold=timedelta(minutes=5),
+    error_threshold=timedelta(minutes=10),
+    sink=None,
+    writer=None,
+):
+    # report lines go to a buffered ReportSink when one is given, and flagged
+    # jobs to a machine-readable writer (see report_formats.py) when one is given
+    write = print if sink is None else partial(_write_line, sink)
+    if writer is not None:
+        emit = writer.write
+    else:
+
+        def emit(level, job):
+            if isinstance(job, Job):
+                job = job.as_dict()
+            write(f"{level}: {format_job(job)}")
+
+    def on_invalid(job):
+        write(f"Invalid duration for job {job['description']}: {job['duration']}")
+
+    # only flagged rows are formatted
+    for level, job in flag_jobs(jobs, warning_threshold, error_threshold, on_invalid):
+        emit(level, job)
@@ -0,0 +1,150 @@
+"""
+Memory-mapped reader for log files.
+
+read_rows_mmap: yields the same rows as log_parser.read_rows, but instead of
+running csv.reader over a buffered text stream it maps the file into memory and
+works on large newline-aligned blocks:
+- a block is decoded in one call and scanned for anything that needs csv.reader
+  or str.strip (quotes, carriage returns, whitespace around a field, empty
+  lines, non-ASCII text)
+- clean blocks, which is what almost every real log consists of, are split on
+  newlines and commas directly, without per-field stripping or copying
+- any other block goes through csv.reader exactly as before, so quoting rules
+  and malformed-row reporting stay the same. Blocks are cut at any newline, also
+  one inside a quoted field, so a row that is still open at the end of a block
+  is completed from the lines after it, and the next block starts after that
+  row
+"""
+
+import csv
+import io
+import locale
+import mmap
+import os
+
+from .log_formats import report_malformed
+
+BLOCK_SIZE = 1 << 20
+
+# anything that makes a plain split differ from csv.reader plus str.strip:
+# quotes, carriage returns, empty lines and whitespace at the edge of a field
+_CSV_TOKENS = (
+    '"',
+    "\r",
+    "\n\n",
+    " ,",
+    ", ",
+    "\t,",
+    ",\t",
+    " \n",
+    "\n ",
+    "\t\n",
+    "\n\t",
+    "\x0b",
+    "\x0c",
+    "\x1c",
+    "\x1d",
+    "\x1e",
+    "\x1f",
+)
+
+
+def _needs_csv(text):
+    # substring scans are much cheaper than a regex over the whole block
+    if not text.isascii():
+        return True
+    last = text[-2:-1] if text.endswith("\n") else text[-1:]
+    if text[0] in " \t\n" or last in (" ", "\t"):
+        return True
+    return any(token in text for token in _CSV_TOKENS)
+
+
+def _block_end(data, position, block_size):
+    # the end of the block starting at position, right after a newline
+    size = len(data)
+    if position + block_size >= size:
+        return size
+    newline = data.rfind(b"\n", position, position + block_size)
+    if newline == -1:
+        # a single line longer than a block
+        newline = data.find(b"\n", position + block_size)
+    return size if newline == -1 else newline + 1
+
+
+class _CsvLines:
+    # The lines of a block for csv.reader, followed by the lines after the
+    # block, which the reader only asks for while a quoted field that started
+    # in the block is still open.
+
+    def __init__(self, data, text, end, encoding):
+        self.data = data
+        self.encoding = encoding
+        self.block = io.StringIO(text, newline="")
+        self.size = len(text)
+        self.lines = self.block
+        self.position = end
+
+    def __iter__(self):
+        # plain loops, as yield from would close the lines along with this
+        # generator, and offset still reads them
+        for line in self.block:
+            yield line
+        data = self.data
+        while self.position < len(data):
+            newline = data.find(b"\n", self.position)
+            end = len(data) if newline == -1 else newline + 1
+            self.lines = io.StringIO(
+                data[self.position : end].decode(self.encoding), newline=""
+            )
+            self.position = end
+            for line in self.lines:
+                yield line
+
+    def block_read(self):
+        return self.lines is not self.block or self.block.tell() == self.size
+
+    def offset(self):
+        # the byte offset right after the last line handed out
+        return self.position - len(self.lines.read().encode(self.encoding))
+
+
+def read_rows_mmap(filename, block_size=BLOCK_SIZE, on_malformed=report_malformed):
+    # decode with the same default encoding a text-mode open() would use
+    encoding = locale.getpreferredencoding(False)
+
+    with open(filename, "rb") as logfile:
+        if os.fstat(logfile.fileno()).st_size == 0:
+            return
+        with mmap.mmap(logfile.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            position = 0
+            while position < len(data):
+                end = _block_end(data, position, block_size)
+                text = data[position:end].decode(encoding)
+
+                if _needs_csv(text):
+                    lines = _CsvLines(data, text, end, encoding)
+                    for row in csv.reader(lines):
+                        if len(row) != 4:
+
+                            # determine action for malformed rows.
+                            on_malformed(row)
+                        else:
+                            yield [item.strip() for item in row]
+                        if lines.block_read():
+                            # every row that started in the block is complete
+                            break
+                    position = lines.offset()
+                    continue
+
+                lines = text.split("\n")
+                if text.endswith("\n"):
+                    lines.pop()
+                for line in lines:
+                    row = line.split(",")
+                    if len(row) != 4:
+
+                        # determine action for malformed rows.
+                        on_malformed(row)
+                        continue
+                    yield row
+                position = end
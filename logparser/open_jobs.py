@@ -0,0 +1,113 @@
+"""
+Bounded table of the jobs that have STARTed but not ENDed yet.
+
+OpenJobTable: a drop-in for the plain pid -> START timestamp dict of
+match_jobs, for logs whose workers crash without writing an END. The jobs are
+kept in START order, so the oldest one is always first:
+- with max_age, a job open for longer than max_age (a timedelta) at the time of
+  a later START is evicted
+- with max_size, the oldest jobs are evicted while more than max_size are open
+Evicted jobs are reported through on_unterminated instead of being dropped
+silently, and so are the jobs still open when close() is called at the end of
+a log. A START for a PID that is still open is a PID reuse: it is reported
+through on_collision and the new job replaces the old one, which never ended.
+
+For time-only formats a job's age wraps around midnight, like its duration.
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+
+from .job_records import seconds_to_time
+from .timestamp_parser import TimestampParser
+
+SECONDS_PER_DAY = 86400
+
+
+def format_start(timestamp):
+    if isinstance(timestamp, datetime):
+        return timestamp.time()
+    return seconds_to_time(timestamp)
+
+
+def report_unterminated(pid, description, start_time, reason):
+    print(
+        f"UNTERMINATED: {description} (PID {pid}) started at "
+        f"{format_start(start_time)} - {reason}"
+    )
+
+
+def report_collision(pid, description, start_time, previous):
+    previous_description, previous_start = previous
+    print(
+        f"PID REUSE: {description} (PID {pid}) started at "
+        f"{format_start(start_time)} while {previous_description} started at "
+        f"{format_start(previous_start)} had not ended"
+    )
+
+
+class OpenJobTable(OrderedDict):
+    def __init__(
+        self,
+        max_age=None,
+        max_size=None,
+        time_format="%H:%M:%S",
+        on_unterminated=report_unterminated,
+        on_collision=report_collision,
+    ):
+        super().__init__()
+        self.max_age = max_age
+        self.max_size = max_size
+        self.rollover = not TimestampParser(time_format).has_date
+        self.on_unterminated = on_unterminated
+        self.on_collision = on_collision
+        # pid -> description of the START line
+        self.descriptions = {}
+        self.unterminated = 0
+        self.collisions = 0
+
+    def age(self, start_time, now):
+        # seconds between a START and now, which are integer seconds for
+        # compact jobs and datetimes otherwise
+        age = now - start_time
+        if not isinstance(age, int):
+            age = age.total_seconds()
+        if self.rollover and age < 0:
+            age += SECONDS_PER_DAY
+        return age
+
+    def start(self, pid, description, timestamp):
+        previous = self.pop(pid, None)
+        if previous is not None:
+            self.collisions += 1
+            self.on_collision(
+                pid, description, timestamp, (self.descriptions[pid], previous)
+            )
+        self[pid] = timestamp
+        self.descriptions[pid] = description
+        self.evict(timestamp)
+
+    def end(self, pid):
+        start_time = self.pop(pid, None)
+        if start_time is not None:
+            del self.descriptions[pid]
+        return start_time
+
+    def _evict_oldest(self, reason):
+        pid, start_time = self.popitem(last=False)
+        self.unterminated += 1
+        self.on_unterminated(pid, self.descriptions.pop(pid), start_time, reason)
+
+    def evict(self, now):
+        if self.max_size is not None:
+            while len(self) > self.max_size:
+                self._evict_oldest(f"evicted, more than {self.max_size} open jobs")
+        if self.max_age is not None:
+            max_age = self.max_age.total_seconds()
+            while self and self.age(next(iter(self.values())), now) > max_age:
+                self._evict_oldest(f"evicted, open for more than {self.max_age}")
+
+    def close(self):
+        # the jobs still open at the end of the log
+        while self:
+            self._evict_oldest("no END before the end of the log")
@@ -0,0 +1,271 @@
+"""
+Parallel processing helpers for the log parser.
+
+report_folder: parses every log file in a folder tree (plain, rotated or
+compressed, see log_files.py) and prints one report per file. With jobs > 1 the
+files are parsed and classified in a process pool, one file per worker, and the
+reports are printed either in filename order or as soon as each file finishes.
+Serially, the next files can be read ahead in the background while one is
+parsed (see prefetch.py). Given a JobSummary (see job_summary.py), the jobs are
+summarized instead: each worker summarizes its file and the summaries are
+merged in this process.
+
+parse_log_file_chunked: parses a single file in parallel. The file is split into
+newline-aligned byte ranges and each range is parsed by a separate worker, which
+returns its completed jobs together with its unmatched END lines and the STARTs
+still open at the end of the range. The results are then merged in file order,
+pairing the dangling ENDs with the STARTs carried over from the previous ranges
+by PID, so the jobs are identical to the ones returned by the serial parser.
+"""
+
+import io
+import locale
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from datetime import timedelta
+from functools import partial
+
+from .log_files import DEFAULT_EXCLUDE, DEFAULT_INCLUDE, walk_log_files
+from .log_formats import row_reader
+from .log_parser import generate_report, iter_jobs, job_factory, make_job
+from .prefetch import Prefetcher
+from .timestamp_parser import TimestampParser
+
+ORDER_FILENAME = "filename"
+ORDER_COMPLETION = "completion"
+
+
+def list_log_files(folder, include=DEFAULT_INCLUDE, exclude=DEFAULT_EXCLUDE):
+    # relative paths of the log files anywhere below folder (see log_files.py)
+    return walk_log_files(folder, include=include, exclude=exclude)
+
+
+def report_log_file(
+    filename,
+    source=iter_jobs,
+    warning_threshold=timedelta(minutes=5),
+    error_threshold=timedelta(minutes=10),
+):
+    # capture everything the parser and the report print, so that the output of
+    # one file is never interleaved with another worker's
+    output = io.StringIO()
+    with redirect_stdout(output):
+        generate_report(
+            source(filename),
+            warning_threshold=warning_threshold,
+            error_threshold=error_threshold,
+        )
+    return output.getvalue()
+
+
+def summarize_log_file(
+    filename,
+    source=iter_jobs,
+    warning_threshold=timedelta(minutes=5),
+    error_threshold=timedelta(minutes=10),
+    relative_accuracy=0.01,
+):
+    from .job_summary import JobSummary
+
+    summary = JobSummary(relative_accuracy)
+    output = io.StringIO()
+    with redirect_stdout(output):
+        summary.update(
+            source(filename),
+            warning_threshold=warning_threshold,
+            error_threshold=error_threshold,
+        )
+    return summary, output.getvalue()
+
+
+def _collect_malformed(worker, filename, source, *args):
+    # runs a worker with the malformed rows of its file kept for the parent
+    # process instead of printed
+    rows = []
+    return worker(filename, partial(source, on_malformed=rows.append), *args), rows
+
+
+def report_folder(
+    folder,
+    source=iter_jobs,
+    warning_threshold=timedelta(minutes=5),
+    error_threshold=timedelta(minutes=10),
+    jobs=1,
+    order=ORDER_FILENAME,
+    report=generate_report,
+    prefetch=0,
+    include=DEFAULT_INCLUDE,
+    exclude=DEFAULT_EXCLUDE,
+    arrange=None,
+    summary=None,
+    on_malformed=None,
+):
+    # source is called with each file path and returns that file's jobs, e.g.
+    # functools.partial(iter_jobs, time_format=...); with jobs > 1 it has to be
+    # picklable. report replaces generate_report in serial mode only, where
+    # prefetch > 0 reads that many files ahead of the parser (see prefetch.py).
+    # arrange(folder, filenames) can reorder the files, e.g. session.order_session.
+    # summary, a job_summary.JobSummary, collects the jobs instead of report.
+    # With jobs > 1 and on_malformed, e.g. a ReportSink's capped malformed, the
+    # malformed rows of each file are passed to it in this process, ahead of
+    # that file's report, instead of being printed by the workers.
+    filenames = list_log_files(folder, include=include, exclude=exclude)
+    if arrange is not None:
+        filenames = arrange(folder, filenames)
+
+    if jobs <= 1:
+        if summary is not None:
+            report = summary.update
+        paths = [os.path.join(folder, filename) for filename in filenames]
+        with Prefetcher(paths, depth=prefetch) as ahead:
+            for filename, path in zip(filenames, ahead):
+                print(f"Parsing log file: {filename}")
+                report(
+                    source(path),
+                    warning_threshold=warning_threshold,
+                    error_threshold=error_threshold,
+                )
+        return
+
+    worker = report_log_file if summary is None else summarize_log_file
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        submit = executor.submit
+        if on_malformed is not None:
+            submit = partial(submit, _collect_malformed)
+        futures = {
+            submit(
+                worker,
+                os.path.join(folder, filename),
+                source,
+                warning_threshold,
+                error_threshold,
+            ): filename
+            for filename in filenames
+        }
+        if order == ORDER_COMPLETION:
+            finished = as_completed(futures)
+        else:
+            # futures is in filename order
+            finished = futures
+        for future in finished:
+            output = future.result()
+            malformed_rows = ()
+            if on_malformed is not None:
+                output, malformed_rows = output
+            if summary is not None:
+                file_summary, output = output
+                summary.merge(file_summary)
+            print(f"Parsing log file: {futures[future]}")
+            for row in malformed_rows:
+                on_malformed(row)
+            print(output, end="")
+
+
+def split_file(filename, chunks):
+    size = os.path.getsize(filename)
+    boundaries = [0]
+    with open(filename, "rb") as logfile:
+        for index in range(1, chunks):
+            position = size * index // chunks
+            if position <= boundaries[-1]:
+                continue
+            # move the boundary to the start of the next line
+            logfile.seek(position - 1)
+            logfile.readline()
+            position = logfile.tell()
+            if boundaries[-1] < position < size:
+                boundaries.append(position)
+    boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
+
+
+def _iter_chunk_lines(filename, start, end):
+    # decode with the same default encoding a text-mode open() would use
+    encoding = locale.getpreferredencoding(False)
+    with open(filename, "rb") as logfile:
+        logfile.seek(start)
+        position = start
+        while position < end:
+            line = logfile.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line.decode(encoding)
+
+
+def parse_chunk(
+    filename, start, end, time_format="%H:%M:%S", compact=False, log_format=None
+):
+    jobs = {}
+    # each event is either a completed job or, for an END line whose START is
+    # not in this chunk, a [pid, description, timestamp] list (a list, since
+    # compact jobs are tuples), kept in file order so the merge can place it
+    events = []
+    started_pids = set()
+    seen_pids = set()
+    decode, make = job_factory(TimestampParser(time_format), compact)
+
+    output = io.StringIO()
+    with redirect_stdout(output):
+        read_rows = row_reader(log_format)
+        for row in read_rows(_iter_chunk_lines(filename, start, end)):
+            job_timestamp_string, job_description, job_status, job_pid = row
+            job_timestamp = decode(job_timestamp_string)
+
+            if job_status == "START":
+                jobs[job_pid] = job_timestamp
+                started_pids.add(job_pid)
+                seen_pids.add(job_pid)
+
+            elif job_status == "END":
+                start_time = jobs.pop(job_pid, None)
+                if start_time is not None:
+                    events.append(
+                        make(job_description, job_pid, start_time, job_timestamp)
+                    )
+                elif job_pid not in seen_pids:
+                    # only the first event of a PID can pair with an earlier chunk
+                    events.append([job_pid, job_description, job_timestamp])
+                seen_pids.add(job_pid)
+
+    return events, jobs, started_pids, output.getvalue()
+
+
+def merge_chunks(chunk_results, make=make_job):
+    result_jobs = []
+    carried_jobs = {}
+
+    for events, open_jobs, started_pids, output in chunk_results:
+        print(output, end="")
+        for event in events:
+            if not isinstance(event, list):
+                result_jobs.append(event)
+                continue
+            job_pid, job_description, job_timestamp = event
+            start_time = carried_jobs.pop(job_pid, None)
+            if start_time is not None:
+                result_jobs.append(
+                    make(job_description, job_pid, start_time, job_timestamp)
+                )
+        # a START in this chunk overwrites whatever was carried for its PID
+        for job_pid in started_pids:
+            carried_jobs.pop(job_pid, None)
+        carried_jobs.update(open_jobs)
+
+    return result_jobs
+
+
+def parse_log_file_chunked(
+    filename, time_format="%H:%M:%S", workers=2, compact=False, log_format=None
+):
+    ranges = split_file(filename, workers)
+    _, make = job_factory(TimestampParser(time_format), compact)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                parse_chunk, filename, start, end, time_format, compact, log_format
+            )
+            for start, end in ranges
+        ]
+        return merge_chunks((future.result() for future in futures), make=make)
@@ -0,0 +1,64 @@
+"""
+Read-ahead of log files for slow or high-latency storage (e.g. NFS).
+
+Prefetcher: iterates over a list of file paths while background threads read
+the next `depth` files in large blocks. The blocks are discarded right away;
+the point is that the operating system's page cache holds the data by the time
+the parser opens the file, so the parser (csv or mmap reader, the parsed-job
+cache, incremental state) runs unchanged and waits on the CPU rather than on
+the storage. The window is bounded: a file is only read once the consumer is
+within `depth` files of it, so at most `depth` files are held in the page cache
+ahead of the parser and each thread only ever holds one block in memory.
+
+With depth=0 the paths are yielded as they are, without any thread.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+BLOCK_SIZE = 8 << 20
+
+
+class Prefetcher:
+    def __init__(self, paths, depth=4, block_size=BLOCK_SIZE):
+        self.paths = list(paths)
+        self.depth = depth
+        self.block_size = block_size
+        self._stop = threading.Event()
+        self._next = 0
+        self._executor = None
+        if depth > 0:
+            self._executor = ThreadPoolExecutor(
+                max_workers=depth, thread_name_prefix="prefetch"
+            )
+
+    def _read_file(self, path):
+        buffer = bytearray(self.block_size)
+        try:
+            with open(path, "rb", buffering=0) as logfile:
+                while not self._stop.is_set() and logfile.readinto(buffer):
+                    pass
+        except OSError:
+            # the parser reports unreadable files itself
+            pass
+
+    def __iter__(self):
+        for position, path in enumerate(self.paths):
+            if self._executor is not None:
+                # queue the files up to depth past the one being parsed
+                last = min(position + 1 + self.depth, len(self.paths))
+                while self._next < last:
+                    self._executor.submit(self._read_file, self.paths[self._next])
+                    self._next += 1
+            yield path
+
+    def close(self):
+        self._stop.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
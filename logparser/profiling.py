@@ -0,0 +1,197 @@
+"""
+Instrumented parsing for --profile / --stats.
+
+profiled_jobs: yields the same jobs as iter_jobs, while recording into a
+ParseStats object how long each phase takes:
+- read: reading lines from the file
+- split: splitting the lines into fields (see log_formats.py)
+- decode: timestamp decoding
+- match: START/END matching and building the job records
+- report: everything the consumer does with the jobs (classification and
+  printing in generate_report), measured as the time spent outside the parser
+
+and counting rows, malformed rows, orphan ENDs (END without a START), unmatched
+STARTs left at the end of the file, the peak number of open jobs and the bytes
+read. The jobs come from the same iter_rows and match_jobs as iter_jobs, with
+the same reader and table of open jobs, so the profile measures the real run;
+the timings are taken around them (timed lines, a timed TimestampParser and the
+rows fed to match_jobs), so the regular parser pays nothing for them when
+profiling is off. The memory-mapped reader reads while it splits, so with
+reader="mmap" the read time is counted as split time.
+"""
+
+import json
+import os
+import time
+from functools import partial
+
+from .log_parser import iter_rows, match_jobs, report_malformed
+from .timestamp_parser import TimestampParser
+
+PHASES = ("read", "split", "decode", "match", "report")
+
+
+class ParseStats:
+    def __init__(self):
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.files = 0
+        self.bytes = 0
+        self.rows = 0
+        self.malformed_rows = 0
+        self.orphan_ends = 0
+        self.unmatched_starts = 0
+        self.peak_open_jobs = 0
+        self.jobs = 0
+        self.total = 0.0
+        self._parser_time = 0.0
+
+    def run_report(self, report, jobs, **kwargs):
+        # time a report over profiled jobs; whatever is not parser time is report
+        started = time.perf_counter()
+        report(jobs, **kwargs)
+        self.total += time.perf_counter() - started
+        self.phases["report"] = max(self.total - self._parser_time, 0.0)
+
+    def as_dict(self):
+        return {
+            "files": self.files,
+            "seconds": round(self.total, 6),
+            "phases": {phase: round(value, 6) for phase, value in self.phases.items()},
+            "rows": self.rows,
+            "malformed_rows": self.malformed_rows,
+            "orphan_ends": self.orphan_ends,
+            "unmatched_starts": self.unmatched_starts,
+            "peak_open_jobs": self.peak_open_jobs,
+            "jobs": self.jobs,
+            "bytes": self.bytes,
+            "bytes_per_second": round(self.bytes / self.total) if self.total else None,
+        }
+
+    def format(self, output_format="text"):
+        if output_format == "json":
+            return json.dumps(self.as_dict(), indent=2)
+        lines = [f"Parse statistics ({self.files} file(s), {self.total:.3f}s):"]
+        for phase, value in self.phases.items():
+            share = value / self.total * 100 if self.total else 0.0
+            lines.append(f"  {phase:<8}{value:>10.3f}s {share:>6.1f}%")
+        lines.append(
+            f"  rows {self.rows}, malformed rows {self.malformed_rows}, "
+            f"orphan ENDs {self.orphan_ends}, unmatched STARTs "
+            f"{self.unmatched_starts}, peak open jobs {self.peak_open_jobs}, "
+            f"jobs {self.jobs}"
+        )
+        if self.total:
+            lines.append(f"  {self.bytes / self.total / 1e6:.2f} MB/s")
+        return "\n".join(lines)
+
+
+def _timed_lines(csvfile, phases, clock):
+    while True:
+        started = clock()
+        line = csvfile.readline()
+        phases["read"] += clock() - started
+        if not line:
+            return
+        yield line
+
+
+class TimedTimestampParser(TimestampParser):
+    # adds the time spent decoding timestamps to phases["decode"]
+
+    def __init__(self, time_format, phases, clock=time.perf_counter):
+        super().__init__(time_format)
+        self.phases = phases
+        self.clock = clock
+        self._timing = False
+
+    def _timed(self, decode, value):
+        # seconds() may fall back on __call__, which is then already timed
+        if self._timing:
+            return decode(value)
+        self._timing = True
+        started = self.clock()
+        try:
+            return decode(value)
+        finally:
+            self._timing = False
+            self.phases["decode"] += self.clock() - started
+
+    def __call__(self, value):
+        return self._timed(super().__call__, value)
+
+    def seconds(self, value):
+        return self._timed(super().seconds, value)
+
+
+def profiled_jobs(
+    filename,
+    time_format="%H:%M:%S",
+    stats=None,
+    compact=False,
+    on_malformed=report_malformed,
+    log_format=None,
+    reader="csv",
+    open_jobs=None,
+):
+    if stats is None:
+        stats = ParseStats()
+    clock = time.perf_counter
+    phases = stats.phases
+    # the same table of open jobs as iter_jobs, watched from outside
+    jobs = {} if open_jobs is None else open_jobs()
+
+    stats.files += 1
+    stats.bytes += os.path.getsize(filename)
+
+    def count_malformed(row):
+        stats.rows += 1
+        stats.malformed_rows += 1
+        on_malformed(row)
+
+    def timed_rows(rows):
+        # match_jobs is done with a row by the time it asks for the next one
+        while True:
+            if len(jobs) > stats.peak_open_jobs:
+                stats.peak_open_jobs = len(jobs)
+            read_before = phases["read"]
+            started = clock()
+            # malformed rows are skipped (and counted) inside the reader
+            row = next(rows, None)
+            phases["split"] += clock() - started - (phases["read"] - read_before)
+            if row is None:
+                return
+            stats.rows += 1
+            if row[2] == "END" and row[3] not in jobs:
+                stats.orphan_ends += 1
+            yield row
+
+    rows = iter_rows(
+        filename,
+        reader=reader,
+        on_malformed=count_malformed,
+        log_format=log_format,
+        wrap_lines=partial(_timed_lines, phases=phases, clock=clock),
+    )
+    matched = match_jobs(
+        timed_rows(rows),
+        time_format=time_format,
+        jobs=jobs,
+        compact=compact,
+        parse_timestamp=TimedTimestampParser(time_format, phases, clock),
+    )
+    while True:
+        before = phases["read"] + phases["split"] + phases["decode"]
+        started = clock()
+        job = next(matched, None)
+        elapsed = clock() - started
+        inner = phases["read"] + phases["split"] + phases["decode"] - before
+        phases["match"] += elapsed - inner
+        stats._parser_time += elapsed
+        if job is None:
+            break
+        stats.jobs += 1
+        yield job
+
+    stats.unmatched_starts += len(jobs)
+    if open_jobs is not None:
+        jobs.close()
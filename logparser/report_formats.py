@@ -0,0 +1,213 @@
+"""
+Machine-readable report formats.
+
+Each writer receives the flagged jobs one at a time from generate_report and
+streams them out, so the job list is never held in memory. Every record has the
+same fields:
+- classification: WARNING or ERROR
+- description
+- pid
+- start, end: integer seconds, Unix epoch seconds for time formats with a date
+  and seconds since midnight otherwise (see TimestampParser.to_seconds)
+- duration: integer seconds
+
+Writers:
+- JsonLinesWriter: one JSON object per line
+- CsvWriter: a header line followed by one row per job
+- ColumnarWriter: a compact binary format of row groups, each holding up to
+  row_group_size jobs column by column (see read_columnar for the layout)
+
+read_columnar: reads a columnar report back, one record dict per job.
+
+pack_strings / unpack_strings: the string column encoding of the columnar
+format.
+"""
+
+import csv
+import json
+import struct
+import sys
+from array import array
+
+from .job_records import Job
+
+FIELDS = ("classification", "description", "pid", "start", "end", "duration")
+
+# row group header: magic and number of rows
+COLUMNAR_MAGIC = b"LPRC"
+_HEADER = struct.Struct("<4sI")
+_COUNT = struct.Struct("<I")
+LEVEL_CODES = {"WARNING": 1, "ERROR": 2}
+LEVEL_NAMES = {code: level for level, code in LEVEL_CODES.items()}
+ROW_GROUP_SIZE = 65536
+
+
+def as_record(job):
+    if isinstance(job, Job):
+        return job
+    return Job.from_dict(job)
+
+
+class JsonLinesWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, level, job):
+        job = as_record(job)
+        self.stream.write(
+            json.dumps(
+                dict(zip(FIELDS, (level, *job))),
+                separators=(",", ":"),
+            )
+            + "\n"
+        )
+
+    def close(self):
+        pass
+
+
+class CsvWriter:
+    def __init__(self, stream):
+        self.writer = csv.writer(stream, lineterminator="\n")
+        self.writer.writerow(FIELDS)
+
+    def write(self, level, job):
+        self.writer.writerow((level, *as_record(job)))
+
+    def close(self):
+        pass
+
+
+def _int64_bytes(values):
+    # the file is little-endian whatever the platform
+    if sys.byteorder == "big":
+        values = array("q", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def pack_strings(values):
+    # uint32 offsets followed by the UTF-8 strings, also used by job_cache.py
+    data = [value.encode() for value in values]
+    offsets = array("I", [0])
+    for item in data:
+        offsets.append(offsets[-1] + len(item))
+    if sys.byteorder == "big":
+        offsets.byteswap()
+    return offsets.tobytes() + b"".join(data)
+
+
+class ColumnarWriter:
+    # Row group layout, all integers little-endian:
+    #   magic "LPRC", uint32 row count n
+    #   classification: n uint8 codes (1 WARNING, 2 ERROR)
+    #   description: uint32 dictionary size d, d + 1 uint32 offsets and the
+    #     UTF-8 dictionary entries, then n uint32 dictionary indexes
+    #   pid: n + 1 uint32 offsets and the UTF-8 values
+    #   start, end, duration: n int64 each
+
+    def __init__(self, stream, row_group_size=ROW_GROUP_SIZE):
+        self.stream = stream
+        self.row_group_size = row_group_size
+        self._reset()
+
+    def _reset(self):
+        self.levels = array("B")
+        self.descriptions = {}
+        self.description_indexes = array("I")
+        self.pids = []
+        self.start = array("q")
+        self.end = array("q")
+        self.duration = array("q")
+
+    def write(self, level, job):
+        job = as_record(job)
+        self.levels.append(LEVEL_CODES[level])
+        self.description_indexes.append(
+            self.descriptions.setdefault(job.description, len(self.descriptions))
+        )
+        self.pids.append(job.pid)
+        self.start.append(job.start)
+        self.end.append(job.end)
+        self.duration.append(job.duration)
+        if len(self.levels) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if not self.levels:
+            return
+        indexes = self.description_indexes
+        if sys.byteorder == "big":
+            indexes.byteswap()
+        self.stream.write(
+            b"".join(
+                (
+                    _HEADER.pack(COLUMNAR_MAGIC, len(self.levels)),
+                    self.levels.tobytes(),
+                    _COUNT.pack(len(self.descriptions)),
+                    pack_strings(self.descriptions),
+                    indexes.tobytes(),
+                    pack_strings(self.pids),
+                    _int64_bytes(self.start),
+                    _int64_bytes(self.end),
+                    _int64_bytes(self.duration),
+                )
+            )
+        )
+        self._reset()
+
+    def close(self):
+        self.flush()
+
+
+WRITERS = {"jsonl": JsonLinesWriter, "csv": CsvWriter, "columnar": ColumnarWriter}
+
+
+def _read_array(typecode, data, position, count):
+    values = array(typecode)
+    end = position + values.itemsize * count
+    values.frombytes(data[position:end])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values, end
+
+
+def unpack_strings(data, position, count):
+    offsets, position = _read_array("I", data, position, count + 1)
+    blob = data[position : position + offsets[-1]]
+    strings = [
+        blob[offsets[index] : offsets[index + 1]].decode() for index in range(count)
+    ]
+    return strings, position + offsets[-1]
+
+
+def read_columnar(stream):
+    data = stream.read()
+    position = 0
+    while position < len(data):
+        magic, rows = _HEADER.unpack_from(data, position)
+        if magic != COLUMNAR_MAGIC:
+            raise ValueError(f"Not a columnar report row group at byte {position}")
+        position += _HEADER.size
+        levels, position = _read_array("B", data, position, rows)
+        (entries,) = _COUNT.unpack_from(data, position)
+        dictionary, position = unpack_strings(data, position + _COUNT.size, entries)
+        indexes, position = _read_array("I", data, position, rows)
+        pids, position = unpack_strings(data, position, rows)
+        start, position = _read_array("q", data, position, rows)
+        end, position = _read_array("q", data, position, rows)
+        duration, position = _read_array("q", data, position, rows)
+        for row in range(rows):
+            yield dict(
+                zip(
+                    FIELDS,
+                    (
+                        LEVEL_NAMES[levels[row]],
+                        dictionary[indexes[row]],
+                        pids[row],
+                        start[row],
+                        end[row],
+                        duration[row],
+                    ),
+                )
+            )
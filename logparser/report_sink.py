@@ -0,0 +1,140 @@
+"""
+Buffered destinations for report output.
+
+ReportSink collects report lines in memory and writes them to its stream in
+large batches, instead of one print() per flagged job. On a terminal every
+complete line is written at once instead, so the first WARNING or ERROR shows
+up as soon as it is found. It behaves like a text
+file (write/flush), so it can also stand in for sys.stdout with
+contextlib.redirect_stdout and keep every other message in order with the
+report.
+
+Malformed rows go through ReportSink.malformed, which can cap them: with
+max_malformed=N only the first N rows are shown and a summary line such as
+"1500 malformed rows, first 10 shown" is written when the sink is closed.
+
+Destinations:
+- StdoutSink: the process' standard output
+- FileSink: a file, appended to
+- RotatingFileSink: a file that is rotated to <path>.1, <path>.2, ... once it
+  grows past max_bytes, keeping backup_count old files
+
+With binary=True they take bytes instead of text (for the columnar report).
+
+open_sink picks one of them from the command line options.
+"""
+
+import os
+import sys
+
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+
+def _is_terminal(stream):
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):
+        # not a file, or already closed
+        return False
+
+
+class ReportSink:
+    def __init__(self, stream, buffer_size=DEFAULT_BUFFER_SIZE, max_malformed=None):
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.max_malformed = max_malformed
+        # someone is watching a terminal: show every line as it is written
+        self.interactive = _is_terminal(stream)
+        self.malformed_rows = 0
+        self._parts = []
+        self._size = 0
+
+    def write(self, text):
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.buffer_size or (
+            self.interactive and text[-1:] in ("\n", b"\n")
+        ):
+            self.flush()
+        return len(text)
+
+    def malformed(self, row):
+        self.malformed_rows += 1
+        if self.max_malformed is None or self.malformed_rows <= self.max_malformed:
+            self.write(f"Skipping malformed row: {row}\n")
+
+    def _write_out(self, text):
+        self.stream.write(text)
+
+    def flush(self):
+        if self._parts:
+            # join str or bytes parts alike, binary sinks carry bytes
+            self._write_out(self._parts[0][:0].join(self._parts))
+            self._parts.clear()
+            self._size = 0
+        self.stream.flush()
+
+    def close(self):
+        if self.max_malformed is not None and self.malformed_rows > self.max_malformed:
+            self.write(
+                f"{self.malformed_rows} malformed rows, "
+                f"first {self.max_malformed} shown\n"
+            )
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class StdoutSink(ReportSink):
+    def __init__(self, binary=False, **kwargs):
+        # bind the current stdout, so the sink can itself replace sys.stdout
+        super().__init__(sys.stdout.buffer if binary else sys.stdout, **kwargs)
+
+
+class FileSink(ReportSink):
+    def __init__(self, path, binary=False, **kwargs):
+        self.path = path
+        self.mode = "ab" if binary else "a"
+        super().__init__(open(path, self.mode), **kwargs)
+
+    def close(self):
+        super().close()
+        self.stream.close()
+
+
+class RotatingFileSink(FileSink):
+    def __init__(self, path, max_bytes, backup_count=5, **kwargs):
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        super().__init__(path, **kwargs)
+
+    def _rotate(self):
+        self.stream.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.stream = open(self.path, self.mode)
+
+    def _write_out(self, text):
+        if self.stream.tell() and self.stream.tell() + len(text) > self.max_bytes:
+            self._rotate()
+        self.stream.write(text)
+
+
+def open_sink(path=None, rotate_bytes=None, backup_count=5, binary=False, **kwargs):
+    if path is None:
+        return StdoutSink(binary=binary, **kwargs)
+    if rotate_bytes:
+        return RotatingFileSink(
+            path, rotate_bytes, backup_count, binary=binary, **kwargs
+        )
+    return FileSink(path, binary=binary, **kwargs)
@@ -0,0 +1,287 @@
+"""
+Long-running service mode with a local HTTP/JSON API, for dashboards that poll.
+
+JobService: follows one or more growing log files and keeps their parse state
+in memory, so a query never re-reads a log:
+- the open jobs of every file, in an OpenJobTable (see open_jobs.py), bounded
+  with max_open_age / max_open_jobs if given
+- the max_jobs most recent completed jobs, indexed by PID
+- the most recent jobs over the warning threshold, classified with the same
+  classify_duration as generate_report
+- per-description aggregates in a JobSummary (see job_summary.py)
+poll() reads only the complete lines appended since the previous poll (see
+incremental.LineTail) and reopens a file from its start when it is rotated or
+truncated, keeping its open jobs, like a session. Jobs are compact, with start
+and end in integer seconds (see TimestampParser.seconds). A row whose timestamp
+does not decode is passed to on_malformed like any other malformed row, so one
+bad line never stops the service. Running jobs are aged against the wall clock,
+as in watch.py, so a job that hangs in a log that has gone quiet still crosses
+the thresholds; the log timestamps are taken to be in this host's local time.
+
+serve: polls the logs every `tick` seconds in the calling thread while a
+ThreadingHTTPServer answers these GET requests from memory:
+- /alerts: the recent completed jobs and the running jobs over a threshold
+- /running: every running job with its age
+- /jobs/<pid>: the completed and running jobs with that PID
+- /summary: the per-description aggregates
+The state is shared under one lock, which a poll only holds while it matches
+the lines it has already read. The lines are read and matched READ_BATCH_LINES
+at a time, taking the lock once per batch, so the first poll of a large log
+neither holds the whole file in memory nor blocks the queries until it is done.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import islice
+from urllib.parse import unquote, urlsplit
+
+from .incremental import LineTail
+from .job_summary import JobSummary
+from .log_formats import row_reader
+from .log_parser import classify_duration, match_jobs, report_malformed
+from .open_jobs import OpenJobTable
+from .timestamp_parser import TimestampParser
+
+DEFAULT_MAX_JOBS = 10000
+READ_BATCH_LINES = 10000
+
+
+class FollowedLog:
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.logfile = None
+        self.tail = None
+
+    def read_batches(self):
+        # the complete lines appended since the previous call, in lists of up to
+        # READ_BATCH_LINES lines
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            # between a rotation and the creation of the new file
+            return []
+        if self.logfile is not None and (
+            stat.st_ino != os.fstat(self.logfile.fileno()).st_ino
+            or stat.st_size < self.tail.offset
+        ):
+            # rotated or truncated: follow the new file from its start
+            self.close()
+        if self.logfile is None:
+            self.logfile = open(self.path, "rb")
+            self.tail = LineTail(self.logfile)
+        lines = iter(self.tail)
+        return iter(lambda: list(islice(lines, READ_BATCH_LINES)), [])
+
+    def close(self):
+        if self.logfile is not None:
+            self.logfile.close()
+            self.logfile = None
+
+
+class JobService:
+    def __init__(
+        self,
+        paths,
+        time_format="%H:%M:%S",
+        warning_threshold=timedelta(minutes=5),
+        error_threshold=timedelta(minutes=10),
+        log_format=None,
+        max_jobs=DEFAULT_MAX_JOBS,
+        max_open_age=None,
+        max_open_jobs=None,
+        on_malformed=report_malformed,
+        now=datetime.now,
+    ):
+        # paths maps the name used in the answers to the path of each log
+        self.logs = [FollowedLog(name, path) for name, path in paths.items()]
+        self.time_format = time_format
+        self.warning_threshold = warning_threshold
+        self.error_threshold = error_threshold
+        self.read_rows = row_reader(log_format)
+        self.on_malformed = on_malformed
+        self.now = now
+        self.parse_timestamp = TimestampParser(time_format)
+        self.open_jobs = {
+            log.name: OpenJobTable(max_open_age, max_open_jobs, time_format)
+            for log in self.logs
+        }
+        self.jobs = deque()
+        self.max_jobs = max_jobs
+        # pid -> the completed jobs with that PID still in self.jobs
+        self.by_pid = {}
+        self.flagged = deque(maxlen=max_jobs)
+        self.summary = JobSummary()
+        self.lock = threading.Lock()
+
+    def _record(self, name, job):
+        level = classify_duration(
+            timedelta(seconds=job.duration),
+            self.warning_threshold,
+            self.error_threshold,
+        )
+        record = as_record(name, job, level)
+        self.jobs.append(record)
+        self.by_pid.setdefault(job.pid, []).append(record)
+        if len(self.jobs) > self.max_jobs:
+            oldest = self.jobs.popleft()
+            same_pid = self.by_pid[oldest["pid"]]
+            same_pid.remove(oldest)
+            if not same_pid:
+                del self.by_pid[oldest["pid"]]
+        if level:
+            self.flagged.append(record)
+        self.summary.update(
+            [job],
+            warning_threshold=self.warning_threshold,
+            error_threshold=self.error_threshold,
+        )
+
+    def _decodable(self, rows):
+        # rows with a timestamp that does not decode are malformed
+        for row in rows:
+            try:
+                self.parse_timestamp.seconds(row[0])
+            except ValueError:
+                self.on_malformed(row)
+                continue
+            yield row
+
+    def poll(self):
+        count = 0
+        for log in self.logs:
+            for lines in log.read_batches():
+                with self.lock:
+                    rows = self.read_rows(lines, on_malformed=self.on_malformed)
+                    for job in match_jobs(
+                        self._decodable(rows),
+                        time_format=self.time_format,
+                        jobs=self.open_jobs[log.name],
+                        compact=True,
+                        parse_timestamp=self.parse_timestamp,
+                    ):
+                        self._record(log.name, job)
+                        count += 1
+        return count
+
+    def log_now(self):
+        # the wall clock in the integer seconds of the log's timestamps
+        return self.parse_timestamp.seconds(self.now().strftime(self.time_format))
+
+    def _running(self, pid=None):
+        now = self.log_now()
+        for name, jobs in self.open_jobs.items():
+            # a PID query is a lookup, not a scan
+            pids = jobs if pid is None else [pid] if pid in jobs else []
+            for job_pid in pids:
+                start = jobs[job_pid]
+                age = jobs.age(start, now)
+                level = classify_duration(
+                    timedelta(seconds=age),
+                    self.warning_threshold,
+                    self.error_threshold,
+                )
+                yield {
+                    "file": name,
+                    "description": jobs.descriptions[job_pid],
+                    "pid": job_pid,
+                    "start": start,
+                    "age": age,
+                    "classification": level,
+                }
+
+    def alerts(self):
+        with self.lock:
+            return {
+                "completed": list(self.flagged),
+                "running": [job for job in self._running() if job["classification"]],
+            }
+
+    def running(self):
+        with self.lock:
+            return {"running": list(self._running())}
+
+    def job(self, pid):
+        with self.lock:
+            return {
+                "completed": list(self.by_pid.get(pid, ())),
+                "running": list(self._running(pid)),
+            }
+
+    def summary_records(self):
+        with self.lock:
+            return {"summary": list(self.summary.records())}
+
+    def close(self):
+        for log in self.logs:
+            log.close()
+
+
+def as_record(name, job, level):
+    return {
+        "file": name,
+        "description": job.description,
+        "pid": job.pid,
+        "start": job.start,
+        "end": job.end,
+        "duration": job.duration,
+        "classification": level,
+    }
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    # set on the subclass made by make_server
+    service = None
+
+    def do_GET(self):
+        path = urlsplit(self.path).path.rstrip("/")
+        if path == "/alerts":
+            answer = self.service.alerts()
+        elif path == "/running":
+            answer = self.service.running()
+        elif path == "/summary":
+            answer = self.service.summary_records()
+        elif path.startswith("/jobs/") and len(path) > len("/jobs/"):
+            answer = self.service.job(unquote(path[len("/jobs/") :]))
+        else:
+            self.send_answer(404, {"error": f"Unknown path {path or '/'}"})
+            return
+        self.send_answer(200, answer)
+
+    def send_answer(self, status, answer):
+        body = json.dumps(answer, separators=(",", ":")).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # requests are not logged, the report output is for the logs' jobs
+        pass
+
+
+def make_server(service, host="127.0.0.1", port=8080):
+    handler = type("Handler", (ServiceRequestHandler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(service, host="127.0.0.1", port=8080, tick=1.0):
+    server = make_server(service, host, port)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"Serving on http://{host}:{server.server_address[1]}", flush=True)
+    try:
+        while True:
+            service.poll()
+            print(end="", flush=True)
+            time.sleep(tick)
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
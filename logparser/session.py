@@ -0,0 +1,121 @@
+"""
+Multi-file sessions: jobs that START in one rotated log file and END in the next.
+
+A session treats the rotated files of one log (app.log.3.gz, app.log.2,
+app.log.1, app.log in the same folder) as a single stream. The files are parsed
+oldest first and the table of open jobs is carried from one file to the next,
+so a job that spans a rotation is reported with the file its END line is in.
+Memory is bounded by the number of jobs open at the same time, since only the
+open-job table is kept across files.
+
+rotation_stream: the stream a log file belongs to, and its rotation number.
+
+order_session: orders log file paths stream by stream, either by rotation
+number (higher numbers are older, the live file comes last) or by the first
+timestamp in each file, for rotation schemes without numbers.
+
+SessionSource: a job source for report_folder that parses each file with the
+open-job table of its stream. The tables can be bounded OpenJobTables (see
+open_jobs.py), whose jobs still open after the last file are reported by close.
+"""
+
+import os
+import re
+from functools import partial
+
+from .log_parser import iter_rows, match_jobs, report_malformed
+from .timestamp_parser import TimestampParser
+
+ORDER_ROTATION = "rotation"
+ORDER_TIMESTAMP = "timestamp"
+
+# app.log, app.log.1, app.log-2, app.log.3.gz, ...
+_ROTATED_NAME = re.compile(
+    r"^(?P<base>.*?\.log)(?:[.-](?P<rotation>\d+))?(?:\.(?:gz|bz2|xz|zst))?$"
+)
+
+
+def rotation_stream(path):
+    folder, name = os.path.split(path)
+    match = _ROTATED_NAME.match(name)
+    if match is None:
+        return (folder, name), None
+    rotation = match.group("rotation")
+    return (folder, match.group("base")), int(rotation) if rotation else None
+
+
+def _rotation_key(path):
+    stream, rotation = rotation_stream(path)
+    # older rotations first, the live file (no number) last
+    return stream, rotation is None, -(rotation or 0)
+
+
+def first_timestamp(path, time_format="%H:%M:%S", log_format=None):
+    parse_timestamp = TimestampParser(time_format)
+    for row in iter_rows(path, on_malformed=lambda row: None, log_format=log_format):
+        try:
+            return parse_timestamp.seconds(row[0])
+        except ValueError:
+            continue
+    return None
+
+
+def _timestamp_key(folder, time_format, log_format, path):
+    timestamp = first_timestamp(os.path.join(folder, path), time_format, log_format)
+    # files without any timestamp first
+    return rotation_stream(path)[0], timestamp is not None, timestamp or 0
+
+
+def order_session(
+    folder, paths, order=ORDER_ROTATION, time_format="%H:%M:%S", log_format=None
+):
+    if order == ORDER_TIMESTAMP:
+        return sorted(
+            paths, key=partial(_timestamp_key, folder, time_format, log_format)
+        )
+    return sorted(paths, key=_rotation_key)
+
+
+class SessionSource:
+    def __init__(
+        self,
+        time_format="%H:%M:%S",
+        reader="csv",
+        compact=False,
+        on_malformed=report_malformed,
+        log_format=None,
+        open_jobs=None,
+    ):
+        self.time_format = time_format
+        self.log_format = log_format
+        # makes the table of open jobs of a stream, e.g. a partial of
+        # open_jobs.OpenJobTable
+        self.make_open_jobs = dict if open_jobs is None else open_jobs
+        self.reader = reader
+        self.compact = compact
+        self.on_malformed = on_malformed
+        # stream -> pid -> start time of the jobs still open
+        self.open_jobs = {}
+
+    def __call__(self, path):
+        stream, _ = rotation_stream(path)
+        if stream not in self.open_jobs:
+            self.open_jobs[stream] = self.make_open_jobs()
+        return match_jobs(
+            iter_rows(
+                path,
+                reader=self.reader,
+                on_malformed=self.on_malformed,
+                log_format=self.log_format,
+            ),
+            time_format=self.time_format,
+            jobs=self.open_jobs[stream],
+            compact=self.compact,
+        )
+
+    def close(self):
+        # report the jobs still open at the end of every stream, when the
+        # tables can
+        for jobs in self.open_jobs.values():
+            if hasattr(jobs, "close"):
+                jobs.close()
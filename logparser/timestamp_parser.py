@@ -0,0 +1,199 @@
+"""
+Fast timestamp decoding for log files.
+
+TimestampParser compiles a --time-format pattern once and decodes the timestamp
+column of every row without going through datetime.strptime each time:
+- common formats (%H:%M:%S and ISO-8601 date-times) are decoded by reading the
+  digits at fixed character offsets
+- decoded values are cached on the raw timestamp string, since consecutive log
+  lines very often share the same second
+- any other format, or a value the fast path does not recognise, falls back to
+  datetime.strptime, so the results and errors are identical to strptime
+
+to_seconds converts a decoded timestamp into integer seconds: seconds since the
+Unix epoch when the format carries a date, and seconds since midnight for
+time-only formats such as the default %H:%M:%S. seconds decodes a timestamp
+string straight into those integer seconds; for the fast-path formats no
+datetime object is built at all. from_seconds converts them back.
+"""
+
+import calendar
+import re
+from datetime import datetime, timedelta
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+def _parse_hms(value):
+    # HH:MM:SS
+    if len(value) != 8 or value[2] != ":" or value[5] != ":":
+        return None
+    hour, minute, second = value[0:2], value[3:5], value[6:8]
+    if not (hour.isdecimal() and minute.isdecimal() and second.isdecimal()):
+        return None
+    hour, minute, second = int(hour), int(minute), int(second)
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+    return datetime(1900, 1, 1, hour, minute, second)
+
+
+def _hms_seconds(value):
+    # HH:MM:SS as seconds since midnight
+    if len(value) != 8 or value[2] != ":" or value[5] != ":":
+        return None
+    hour, minute, second = value[0:2], value[3:5], value[6:8]
+    if not (hour.isdecimal() and minute.isdecimal() and second.isdecimal()):
+        return None
+    hour, minute, second = int(hour), int(minute), int(second)
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+    return hour * 3600 + minute * 60 + second
+
+
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _days_since_epoch(year, month, day):
+    # days from 1970-01-01 to a proleptic Gregorian date, without a date object
+    year -= month <= 2
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+def _make_iso_seconds(separator):
+    def _iso_seconds(value):
+        # YYYY-MM-DD<separator>HH:MM:SS as seconds since the Unix epoch
+        if (
+            len(value) != 19
+            or value[4] != "-"
+            or value[7] != "-"
+            or value[10] != separator
+            or value[13] != ":"
+            or value[16] != ":"
+        ):
+            return None
+        digits = value[0:4] + value[5:7] + value[8:10]
+        digits += value[11:13] + value[14:16] + value[17:19]
+        if not digits.isdecimal():
+            return None
+        year, month, day = int(digits[0:4]), int(digits[4:6]), int(digits[6:8])
+        hour, minute, second = int(digits[8:10]), int(digits[10:12]), int(digits[12:])
+        if not 1 <= month <= 12 or year < 1 or hour > 23 or minute > 59 or second > 59:
+            return None
+        if (
+            not 1
+            <= day
+            <= _DAYS_IN_MONTH[month - 1] + (month == 2 and calendar.isleap(year))
+        ):
+            return None
+        return (
+            _days_since_epoch(year, month, day) * 86400
+            + hour * 3600
+            + minute * 60
+            + second
+        )
+
+    return _iso_seconds
+
+
+def _make_iso_parser(separator):
+    def _parse_iso(value):
+        # YYYY-MM-DD<separator>HH:MM:SS
+        if (
+            len(value) != 19
+            or value[4] != "-"
+            or value[7] != "-"
+            or value[10] != separator
+        ):
+            return None
+        date_part = value[0:4], value[5:7], value[8:10]
+        if not all(part.isdecimal() for part in date_part):
+            return None
+        time_of_day = _parse_hms(value[11:])
+        if time_of_day is None:
+            return None
+        try:
+            return time_of_day.replace(*map(int, date_part))
+        except ValueError:
+            # let strptime produce its own error for impossible dates
+            return None
+
+    return _parse_iso
+
+
+# strptime directives that set the date part of the parsed value
+_DATE_DIRECTIVES = re.compile(r"%[-#]?[bBcdjmUWxyYGV]")
+# directives whose value integer seconds cannot keep (fractions, time zones)
+_INEXACT_DIRECTIVES = re.compile(r"%[-#]?[fzZ]")
+_EPOCH = datetime(1970, 1, 1)
+_TIME_ONLY_DATE = datetime(1900, 1, 1)
+
+_FAST_PATHS = {
+    "%H:%M:%S": _parse_hms,
+    "%Y-%m-%d %H:%M:%S": _make_iso_parser(" "),
+    "%Y-%m-%dT%H:%M:%S": _make_iso_parser("T"),
+}
+
+_SECONDS_FAST_PATHS = {
+    "%H:%M:%S": _hms_seconds,
+    "%Y-%m-%d %H:%M:%S": _make_iso_seconds(" "),
+    "%Y-%m-%dT%H:%M:%S": _make_iso_seconds("T"),
+}
+
+
+class TimestampParser:
+    def __init__(self, time_format="%H:%M:%S", cache_size=DEFAULT_CACHE_SIZE):
+        self.time_format = time_format
+        self.cache_size = cache_size
+        self._fast_path = _FAST_PATHS.get(time_format)
+        self._seconds_fast_path = _SECONDS_FAST_PATHS.get(time_format)
+        self._cache = {}
+        self._seconds_cache = {}
+        self.has_date = bool(_DATE_DIRECTIVES.search(time_format))
+        # whether integer seconds represent these timestamps without loss
+        self.whole_seconds = not _INEXACT_DIRECTIVES.search(time_format)
+
+    def __call__(self, value):
+        timestamp = self._cache.get(value)
+        if timestamp is not None:
+            return timestamp
+
+        timestamp = None
+        if self._fast_path is not None:
+            timestamp = self._fast_path(value)
+        if timestamp is None:
+            timestamp = datetime.strptime(value, self.time_format)
+
+        # the cache only has to cover a window of neighbouring lines
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[value] = timestamp
+        return timestamp
+
+    def to_seconds(self, timestamp):
+        if self.has_date:
+            return calendar.timegm(timestamp.utctimetuple())
+        return timestamp.hour * 3600 + timestamp.minute * 60 + timestamp.second
+
+    def seconds(self, value):
+        seconds = self._seconds_cache.get(value)
+        if seconds is not None:
+            return seconds
+
+        seconds = None
+        if self._seconds_fast_path is not None:
+            seconds = self._seconds_fast_path(value)
+        if seconds is None:
+            seconds = self.to_seconds(self(value))
+
+        if len(self._seconds_cache) >= self.cache_size:
+            self._seconds_cache.clear()
+        self._seconds_cache[value] = seconds
+        return seconds
+
+    def from_seconds(self, seconds):
+        base = _EPOCH if self.has_date else _TIME_ONLY_DATE
+        return base + timedelta(seconds=seconds)
@@ -0,0 +1,179 @@
+"""
+Live watch mode for a growing log file.
+
+JobWatcher keeps the jobs that are still running and raises a WARNING or ERROR
+as soon as one of them crosses a threshold, instead of waiting for its END line.
+Every START pushes the job's warning and error deadlines onto a min-heap, so a
+tick only pops the deadlines that have passed (O(log n) each) rather than
+rescanning every open job. Deadlines of jobs that ended, or whose PID was
+reused by a newer START, are dropped when they reach the top of the heap.
+
+When a job finally ends it is reported like in generate_report, unless it was
+already reported as running at the same level.
+
+Timestamps without a date are put on a running day: one more than twelve hours
+before the latest timestamp seen is taken to be past midnight, so jobs running
+across midnight are still timed and alerted on.
+
+Rows whose timestamp does not decode go to on_malformed like the rows with the
+wrong number of fields, so one bad line does not end a long-running watch.
+
+watch_log_file: tails a log file, feeding new lines to a JobWatcher and ticking
+it every `tick` seconds, so alert latency is bounded by the tick. The file is
+reopened from the start when it is rotated or truncated.
+"""
+
+import heapq
+import itertools
+import os
+import time
+from datetime import datetime, timedelta
+from functools import partial
+
+from .incremental import LineTail
+from .log_formats import report_malformed, row_reader
+from .log_parser import classify_duration, format_job, make_job
+from .timestamp_parser import TimestampParser
+
+_LEVELS = {None: 0, "WARNING": 1, "ERROR": 2}
+_ONE_DAY = timedelta(days=1)
+_HALF_DAY = timedelta(hours=12)
+
+
+class JobWatcher:
+    def __init__(
+        self,
+        time_format="%H:%M:%S",
+        warning_threshold=timedelta(minutes=5),
+        error_threshold=timedelta(minutes=10),
+        now=datetime.now,
+        on_malformed=report_malformed,
+    ):
+        self.time_format = time_format
+        self.warning_threshold = warning_threshold
+        self.error_threshold = error_threshold
+        self.now = now
+        self.on_malformed = on_malformed
+        self.parse_timestamp = TimestampParser(time_format)
+        # pid -> [start time, description, level already reported]
+        self.open_jobs = {}
+        self._deadlines = []
+        self._sequence = itertools.count()
+        # days added to timestamps without a date, and the latest one seen
+        self._days = timedelta(0)
+        self._latest = None
+
+    def unwrap(self, timestamp):
+        if self.parse_timestamp.has_date:
+            return timestamp
+        timestamp += self._days
+        if self._latest is not None:
+            if timestamp < self._latest - _HALF_DAY:
+                # past midnight
+                self._days += _ONE_DAY
+                timestamp += _ONE_DAY
+            elif timestamp > self._latest + _HALF_DAY:
+                # a late line from before midnight
+                timestamp -= _ONE_DAY
+        if self._latest is None or timestamp > self._latest:
+            self._latest = timestamp
+        return timestamp
+
+    def log_now(self):
+        # the current time as it would be written in the log, so that it can be
+        # compared with timestamps that have no date
+        return self.unwrap(self.parse_timestamp(self.now().strftime(self.time_format)))
+
+    def process_rows(self, rows):
+        for row in rows:
+            job_timestamp_string, job_description, job_status, job_pid = row
+            try:
+                job_timestamp = self.parse_timestamp(job_timestamp_string)
+            except ValueError:
+                self.on_malformed(row)
+                continue
+            job_timestamp = self.unwrap(job_timestamp)
+
+            if job_status == "START":
+                job = [job_timestamp, job_description, None]
+                self.open_jobs[job_pid] = job
+                for level, threshold in (
+                    ("WARNING", self.warning_threshold),
+                    ("ERROR", self.error_threshold),
+                ):
+                    heapq.heappush(
+                        self._deadlines,
+                        (
+                            job_timestamp + threshold,
+                            next(self._sequence),
+                            level,
+                            job_pid,
+                            job,
+                        ),
+                    )
+
+            elif job_status == "END":
+                job = self.open_jobs.pop(job_pid, None)
+                if job is None:
+                    continue
+                start_time, _, reported_level = job
+                result = make_job(job_description, job_pid, start_time, job_timestamp)
+                level = classify_duration(
+                    result["duration"], self.warning_threshold, self.error_threshold
+                )
+                if _LEVELS[level] > _LEVELS[reported_level]:
+                    print(f"{level}: {format_job(result)}")
+
+    def tick(self):
+        now = self.log_now()
+        while self._deadlines and self._deadlines[0][0] < now:
+            _, _, _, job_pid, job = heapq.heappop(self._deadlines)
+            # the job ended or its PID was reused since the deadline was pushed
+            if self.open_jobs.get(job_pid) is not job:
+                continue
+            start_time, job_description, reported_level = job
+            # both deadlines may have passed since the previous tick
+            level = classify_duration(
+                now - start_time, self.warning_threshold, self.error_threshold
+            )
+            if _LEVELS[level] <= _LEVELS[reported_level]:
+                continue
+            job[2] = level
+            print(
+                f"{level}: {job_description} (PID {job_pid}) started at "
+                f"{start_time.time()} - still running after {now - start_time}"
+            )
+
+
+def watch_log_file(
+    filename,
+    time_format="%H:%M:%S",
+    warning_threshold=timedelta(minutes=5),
+    error_threshold=timedelta(minutes=10),
+    tick=1.0,
+    log_format=None,
+    on_malformed=report_malformed,
+):
+    watcher = JobWatcher(
+        time_format, warning_threshold, error_threshold, on_malformed=on_malformed
+    )
+    read_rows = partial(row_reader(log_format), on_malformed=on_malformed)
+    logfile = open(filename, "rb")
+    tail = LineTail(logfile)
+    try:
+        while True:
+            watcher.process_rows(read_rows(tail))
+            watcher.tick()
+            print(end="", flush=True)
+            time.sleep(tick)
+
+            stat = os.stat(filename)
+            if stat.st_ino != os.fstat(logfile.fileno()).st_ino or (
+                stat.st_size < tail.offset
+            ):
+                # rotated or truncated: follow the new file from its start
+                logfile.close()
+                logfile = open(filename, "rb")
+                tail = LineTail(logfile)
+    finally:
+        logfile.close()
@@ -0,0 +1,27 @@
+import pytest
+from logparser.arg_parser import get_args
+
+
+def test_defaults():
+    args = get_args([])
+    assert args.file == "logs.log"
+    assert args.chunks == 1
+
+
+@pytest.mark.parametrize("option", ["--incremental", "--session"])
+def test_chunks_rejects_unsupported_modes(option, capsys):
+    with pytest.raises(SystemExit):
+        get_args(["-c", "4", option])
+    assert "--chunks cannot be combined" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("option", [["--incremental"], ["--watch"], ["-c", "2"]])
+@pytest.mark.parametrize("bound", [["--max-open-age", "30"], ["--max-open-jobs", "9"]])
+def test_open_job_bounds_reject_unsupported_modes(option, bound, capsys):
+    with pytest.raises(SystemExit):
+        get_args(bound + option)
+    assert "cannot be combined with --incremental" in capsys.readouterr().err
+
+
+def test_open_job_bounds_with_profile():
+    assert get_args(["--max-open-jobs", "9", "--profile"]).max_open_jobs == 9
@@ -0,0 +1,15 @@
+from logparser.arg_parser import get_args
+from logparser.cli import run
+
+
+def test_sub_second_format_bypasses_the_cache(tmp_path, capsys):
+    log_file = tmp_path / "jobs.log"
+    log_file.write_text("12:00:00.000,Job A,START,1\n12:05:00.600,Job A,END,1\n")
+    cache_dir = tmp_path / "cache"
+    args = ["-f", str(log_file), "-t", "%H:%M:%S.%f", "--cache-dir", str(cache_dir)]
+    run(get_args(args))
+    assert capsys.readouterr().out == (
+        "WARNING: Job A (PID 1) from 12:00:00 to 12:05:00.600000 "
+        "- Duration: 0:05:00.600000\n"
+    )
+    assert not cache_dir.exists()
@@ -0,0 +1,88 @@
+import io
+import pytest
+from logparser.fan_in import ConcurrencyTimeline, merged_jobs
+
+
+@pytest.fixture
+def fleet(tmp_path):
+    (tmp_path / "h1").mkdir()
+    (tmp_path / "h2").mkdir()
+    (tmp_path / "h1" / "app.log").write_text(
+        "01:58:00,Backup,START,1\n"
+        "02:00:00,Scan,START,2\n"
+        "02:09:00,Scan,END,2\n"
+        "02:15:00,Backup,END,1\n"
+    )
+    (tmp_path / "h2" / "app.log").write_text(
+        "01:59:00,Backup,START,1\n"
+        "02:00:00,Sync,START,7\n"
+        "02:07:00,Backup,END,1\n"
+        "02:30:00,Sync,END,7\n"
+    )
+    return tmp_path
+
+
+FILES = ["h1/app.log", "h2/app.log"]
+
+
+def test_merged_jobs_are_globally_ordered_with_namespaced_pids(fleet):
+    jobs = list(merged_jobs(str(fleet), FILES))
+    assert [(job.pid, job.end) for job in jobs] == [
+        ("h2/app.log:1", 7620),
+        ("h1/app.log:2", 7740),
+        ("h1/app.log:1", 8100),
+        ("h2/app.log:7", 9000),
+    ]
+    # the same PID on two hosts is two jobs
+    assert [job.duration for job in jobs if job.description == "Backup"] == [
+        480,
+        1020,
+    ]
+
+
+def test_concurrency_timeline(fleet):
+    output = io.StringIO()
+    list(merged_jobs(str(fleet), FILES, timeline=ConcurrencyTimeline(output)))
+    lines = output.getvalue().splitlines()
+    assert lines[0] == "second,time,running,peak,started,ended"
+    assert lines[1:4] == [
+        "7080,01:58:00,1,1,1,0",
+        "7140,01:59:00,2,2,1,0",
+        "7200,02:00:00,4,4,2,0",
+    ]
+    assert lines[-1] == "9000,02:30:00,0,1,0,1"
+
+
+def test_timeline_peak_within_a_second():
+    output = io.StringIO()
+    timeline = ConcurrencyTimeline(output)
+    timeline.start(10)
+    timeline.start(10)
+    timeline.end(10)
+    timeline.close()
+    assert output.getvalue().splitlines()[1] == "10,00:00:10,1,2,2,1"
+
+
+def test_merge_rolls_over_midnight_per_file(tmp_path, capsys):
+    (tmp_path / "a.log").write_text(
+        "23:50:00,Night,START,1\n00:05:00,Night,END,1\n00:06:00,Late,START,2\n"
+    )
+    (tmp_path / "b.log").write_text(
+        "23:59:00,Other,START,3\n00:01:00,Other,END,3\n00:10:00,Late,END,2\n"
+    )
+    jobs = list(merged_jobs(str(tmp_path), ["a.log", "b.log"]))
+    assert [(job.description, job.duration) for job in jobs] == [
+        ("Other", 120),
+        ("Night", 900),
+    ]
+    assert capsys.readouterr().out == ""
+
+
+def test_merge_reports_unsorted_file_once(tmp_path, capsys):
+    (tmp_path / "a.log").write_text(
+        "12:00:00,A,START,1\n11:00:00,B,START,2\n10:00:00,C,START,3\n"
+    )
+    list(merged_jobs(str(tmp_path), ["a.log"], time_format="%H:%M:%S"))
+    assert capsys.readouterr().out == (
+        "a.log is not sorted by time, its jobs may be merged late\n"
+    )
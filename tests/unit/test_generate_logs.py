@@ -0,0 +1,40 @@
+from logparser import log_parser
+from benchmarks.generate_logs import generate_log, generate_logs
+
+
+def test_generate_log_is_deterministic(tmp_path):
+    first = generate_log(tmp_path / "a.log", 2000, seed=7)
+    second = generate_log(tmp_path / "b.log", 2000, seed=7)
+    assert first.read_text() == second.read_text()
+    assert len(first.read_text().splitlines()) == 2000
+
+
+def test_generate_log_malformed_share(tmp_path, capsys):
+    path = generate_log(tmp_path / "a.log", 5000, malformed=0.1)
+    log_parser.parse_log_file(str(path))
+    malformed = capsys.readouterr().out.count("Skipping malformed row")
+    assert 350 < malformed < 650
+
+
+def test_generate_log_respects_time_format_and_concurrency(tmp_path):
+    path = generate_log(
+        tmp_path / "a.log", 3000, concurrency=5, time_format="%Y-%m-%d %H:%M:%S"
+    )
+    jobs = log_parser.parse_log_file(str(path), time_format="%Y-%m-%d %H:%M:%S")
+    assert len(jobs) > 1000
+    running = 0
+    peak = 0
+    for line in path.read_text().splitlines():
+        running += 1 if ",START," in line else -1
+        peak = max(peak, running)
+    assert peak <= 5
+
+
+def test_generate_logs_writes_files(tmp_path):
+    paths = generate_logs(tmp_path / "logs", files=3, lines=10)
+    assert sorted(p.name for p in (tmp_path / "logs").iterdir()) == [
+        "log0.log",
+        "log1.log",
+        "log2.log",
+    ]
+    assert len(paths) == 3
@@ -0,0 +1,91 @@
+import gzip
+import json
+import os
+import pytest
+from logparser import incremental
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "jobs.log"
+    path.write_text(
+        "12:00:00,Job A,START,111\n"
+        "12:01:00,Job B,START,222\n"
+        "12:11:00,Job A,END,111\n"
+    )
+    return path
+
+
+def append(path, text):
+    with open(path, "a") as logfile:
+        logfile.write(text)
+
+
+def descriptions(filename, **kwargs):
+    return [job["description"] for job in incremental.iter_new_jobs(filename, **kwargs)]
+
+
+def test_iter_new_jobs_resumes_from_saved_offset(log_file):
+    assert descriptions(str(log_file)) == ["Job A"]
+    # nothing new, nothing reported again
+    assert descriptions(str(log_file)) == []
+
+    append(log_file, "12:20:00,Job B,END,222\n")
+    jobs = list(incremental.iter_new_jobs(str(log_file)))
+    assert [job["description"] for job in jobs] == ["Job B"]
+    assert str(jobs[0]["duration"]) == "0:19:00"
+
+
+def test_iter_new_jobs_leaves_partial_line_for_next_run(log_file):
+    descriptions(str(log_file))
+    append(log_file, "12:20:00,Job B,E")
+    assert descriptions(str(log_file)) == []
+    append(log_file, "ND,222\n")
+    assert descriptions(str(log_file)) == ["Job B"]
+
+
+def test_iter_new_jobs_restarts_after_truncation(log_file):
+    descriptions(str(log_file))
+    log_file.write_text("13:00:00,Job C,START,333\n13:02:00,Job C,END,333\n")
+    assert descriptions(str(log_file)) == ["Job C"]
+
+
+def test_iter_new_jobs_restarts_after_rotation(log_file, tmp_path):
+    descriptions(str(log_file))
+    os.rename(log_file, tmp_path / "jobs.log.1")
+    log_file.write_text(
+        "13:00:00,Job C,START,333\n13:02:00,Job C,END,333\n" + "x" * 200 + "\n"
+    )
+    assert descriptions(str(log_file)) == ["Job C"]
+
+
+def test_iter_new_jobs_state_dir(log_file, tmp_path):
+    state_dir = tmp_path / "state"
+    descriptions(str(log_file), state_dir=str(state_dir))
+    assert not os.path.exists(str(log_file) + incremental.STATE_SUFFIX)
+    (state_file,) = state_dir.iterdir()
+    state = json.loads(state_file.read_text())
+    assert state["offset"] == log_file.stat().st_size
+    assert state["jobs"] == {"222": "1900-01-01T12:01:00"}
+
+
+def test_compressed_archive_is_reported_once(tmp_path):
+    archive = tmp_path / "jobs.log.1.gz"
+    archive.write_bytes(
+        gzip.compress(b"12:00:00,Job A,START,111\n12:11:00,Job A,END,111\n")
+    )
+    assert [job["pid"] for job in incremental.iter_new_jobs(str(archive))] == ["111"]
+    assert list(incremental.iter_new_jobs(str(archive))) == []
+
+
+def test_open_jobs_resume_across_job_representations(log_file):
+    compact = list(incremental.iter_new_jobs(str(log_file), compact=True))
+    assert [job.description for job in compact] == ["Job A"]
+    with open(incremental.state_path(str(log_file))) as state_file:
+        state = json.load(state_file)
+    assert state["jobs"] == {"222": 12 * 3600 + 60}
+
+    # a later run without compact jobs picks the saved seconds up as datetimes
+    append(log_file, "00:01:00,Job B,END,222\n")
+    (job,) = incremental.iter_new_jobs(str(log_file))
+    assert str(job["duration"]) == "12:00:00"
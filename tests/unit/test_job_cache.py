@@ -0,0 +1,162 @@
+import os
+
+from logparser import job_cache, log_parser
+from logparser.job_cache import CACHE_SUFFIX, cached_jobs, evict, load_entry
+from logparser.job_records import JobTable
+
+LOG = (
+    "12:00:00,Job A,START,111\n"
+    "12:01:00,Job B,START,222\n"
+    "broken row\n"
+    "12:11:00,Job A,END,111\n"
+    "12:07:00,Job B,END,222\n"
+)
+
+
+def write_log(tmp_path, text=LOG):
+    path = tmp_path / "jobs.log"
+    path.write_text(text)
+    return str(path)
+
+
+def test_cached_jobs_match_iter_jobs(tmp_path):
+    log_file = write_log(tmp_path)
+    cache_dir = str(tmp_path / "cache")
+    expected = list(log_parser.iter_jobs(log_file, compact=True))
+    assert list(cached_jobs(log_file, cache_dir=cache_dir)) == expected
+    assert list(cached_jobs(log_file, cache_dir=cache_dir)) == expected
+
+
+def test_cache_hit_skips_parsing(tmp_path, monkeypatch):
+    log_file = write_log(tmp_path)
+    cache_dir = str(tmp_path / "cache")
+    malformed = []
+    list(cached_jobs(log_file, cache_dir=cache_dir, on_malformed=malformed.append))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("parsed again")
+
+    monkeypatch.setattr("logparser.job_cache.iter_jobs", fail)
+    table = cached_jobs(log_file, cache_dir=cache_dir, on_malformed=malformed.append)
+    assert len(table) == 2
+    # malformed rows are reported again on a hit
+    assert malformed == [["broken row"], ["broken row"]]
+
+
+def test_entry_columns_are_mapped(tmp_path):
+    log_file = write_log(tmp_path)
+    cache_dir = tmp_path / "cache"
+    list(cached_jobs(log_file, cache_dir=str(cache_dir)))
+    (entry,) = cache_dir.iterdir()
+    table, malformed_rows = load_entry(str(entry))
+    assert isinstance(table.duration, memoryview)
+    assert list(table.duration) == [660, 360]
+    assert list(table.pids) == ["111", "222"]
+    assert table.descriptions[-1] == "Job B"
+    assert list(malformed_rows) == [["broken row"]]
+
+
+def test_entry_spooled_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr("logparser.job_cache._BATCH_SIZE", 3)
+    lines = []
+    for pid in range(10):
+        lines.append(f"12:00:{pid:02},Job {pid % 3},START,{pid}\n")
+        lines.append(f"12:05:{pid:02},Job {pid % 3},END,{pid}\n")
+        lines.append(f"broken {pid}\n")
+    log_file = write_log(tmp_path, "".join(lines))
+    cache_dir = str(tmp_path / "cache")
+    expected = list(cached_jobs(log_file, cache_dir=cache_dir))
+    malformed = []
+    table = cached_jobs(log_file, cache_dir=cache_dir, on_malformed=malformed.append)
+    assert isinstance(table, JobTable)
+    assert list(table) == expected
+    assert malformed == [[f"broken {pid}"] for pid in range(10)]
+
+
+def test_changed_file_or_format_misses(tmp_path):
+    log_file = write_log(tmp_path)
+    cache_dir = tmp_path / "cache"
+    list(cached_jobs(log_file, cache_dir=str(cache_dir)))
+    write_log(tmp_path, LOG.replace("12:07:00", "12:08:00"))
+    jobs = list(cached_jobs(log_file, cache_dir=str(cache_dir)))
+    assert [job.duration for job in jobs] == [660, 420]
+    list(cached_jobs(log_file, time_format="%X", cache_dir=str(cache_dir)))
+    assert len(list(cache_dir.iterdir())) == 3
+
+
+def test_same_size_and_mtime_with_other_content_misses(tmp_path):
+    log_file = write_log(tmp_path)
+    cache_dir = str(tmp_path / "cache")
+    list(cached_jobs(log_file, cache_dir=cache_dir))
+    stat = os.stat(log_file)
+    write_log(tmp_path, LOG.replace("12:07:00", "12:08:00"))
+    os.utime(log_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    jobs = cached_jobs(log_file, cache_dir=cache_dir)
+    assert not isinstance(jobs, JobTable)
+    assert [job.duration for job in jobs] == [660, 420]
+    assert list(cached_jobs(log_file, cache_dir=cache_dir).duration) == [660, 420]
+
+
+def test_miss_streams_and_stores_at_the_end(tmp_path):
+    log_file = write_log(tmp_path)
+    cache_dir = tmp_path / "cache"
+    jobs = cached_jobs(log_file, cache_dir=str(cache_dir))
+    assert next(jobs).description == "Job A"
+    assert not cache_dir.exists()
+    assert [job.description for job in jobs] == ["Job B"]
+    assert len(list(cache_dir.iterdir())) == 1
+    assert isinstance(cached_jobs(log_file, cache_dir=str(cache_dir)), JobTable)
+
+
+def test_corrupt_entry_is_ignored(tmp_path):
+    path = tmp_path / ("bad" + CACHE_SUFFIX)
+    path.write_bytes(b"LPJ1garbage")
+    assert load_entry(str(path)) is None
+    path.write_bytes(b"")
+    assert load_entry(str(path)) is None
+
+
+def test_evict_removes_least_recently_used(tmp_path):
+    for index, name in enumerate(("old", "mid", "new")):
+        path = tmp_path / (name + CACHE_SUFFIX)
+        path.write_bytes(b"x" * 100)
+        os.utime(path, ns=(index * 10**9, index * 10**9))
+    evict(str(tmp_path), 250, keep=str(tmp_path / ("new" + CACHE_SUFFIX)))
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "mid" + CACHE_SUFFIX,
+        "new" + CACHE_SUFFIX,
+    ]
+
+
+def test_folder_is_scanned_once_per_process(tmp_path, monkeypatch):
+    scans = []
+    scan = job_cache._scan
+
+    def counted_scan(*args):
+        scans.append(args)
+        return scan(*args)
+
+    monkeypatch.setattr(job_cache, "_folder_sizes", {})
+    monkeypatch.setattr("logparser.job_cache._scan", counted_scan)
+    cache_dir = tmp_path / "cache"
+    for index in range(5):
+        log_file = tmp_path / f"{index}.log"
+        log_file.write_text(LOG)
+        list(cached_jobs(str(log_file), cache_dir=str(cache_dir)))
+    assert len(scans) == 1
+    assert len(list(cache_dir.iterdir())) == 5
+    # crossing max_bytes evicts down to three quarters of it
+    size = os.path.getsize(next(cache_dir.iterdir()))
+    log_file = tmp_path / "5.log"
+    log_file.write_text(LOG)
+    list(cached_jobs(str(log_file), cache_dir=str(cache_dir), max_bytes=4 * size))
+    assert len(scans) == 2
+    assert len(list(cache_dir.iterdir())) == 3
+
+
+def test_cached_table_report_matches_dict_report(tmp_path, capsys):
+    log_file = write_log(tmp_path)
+    log_parser.generate_report(log_parser.parse_log_file(log_file))
+    expected = capsys.readouterr().out
+    log_parser.generate_report(cached_jobs(log_file, cache_dir=str(tmp_path / "c")))
+    assert capsys.readouterr().out == expected
@@ -0,0 +1,87 @@
+import gzip
+from contextlib import closing
+from datetime import timedelta
+
+from logparser import log_parser
+from logparser.job_index import connect, index_paths, ingest_file, query_jobs
+from logparser.job_records import Job
+
+LOG = (
+    "12:00:00,Job A,START,111\n"
+    "12:01:00,Job B,START,222\n"
+    "12:11:00,Job A,END,111\n"
+    "12:02:00,Job C,START,333\n"
+    "12:03:00,Job C,END,333\n"
+)
+
+
+def test_ingest_is_incremental(tmp_path):
+    log_file = tmp_path / "jobs.log"
+    log_file.write_text(LOG)
+    db = str(tmp_path / "jobs.db")
+    with closing(connect(db)) as connection:
+        assert ingest_file(connection, str(log_file)) == 2
+        assert ingest_file(connection, str(log_file)) == 0
+        # Job B was still open at the saved offset
+        with open(log_file, "a") as logfile:
+            logfile.write("12:08:00,Job B,END,222\n")
+        assert ingest_file(connection, str(log_file)) == 1
+        count = connection.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+    assert count == 3
+
+
+def test_truncated_file_replaces_its_jobs(tmp_path):
+    log_file = tmp_path / "jobs.log"
+    log_file.write_text(LOG)
+    db = str(tmp_path / "jobs.db")
+    with closing(connect(db)) as connection:
+        ingest_file(connection, str(log_file))
+        log_file.write_text("13:00:00,Job D,START,444\n13:30:00,Job D,END,444\n")
+        assert ingest_file(connection, str(log_file)) == 1
+        rows = connection.execute("SELECT description FROM jobs").fetchall()
+    assert rows == [("Job D",)]
+
+
+def test_query_matches_report(tmp_path, capsys):
+    (tmp_path / "a.log").write_text(LOG)
+    (tmp_path / "b.log").write_text("12:00:00,Job A,START,1\n12:06:00,Job A,END,1\n")
+    db = str(tmp_path / "jobs.db")
+    index_paths(db, [str(tmp_path)])
+    capsys.readouterr()
+
+    log_parser.generate_report(query_jobs(db))
+    assert capsys.readouterr().out.splitlines() == [
+        "ERROR: Job A (PID 111) from 12:00:00 to 12:11:00 - Duration: 0:11:00",
+        "WARNING: Job A (PID 1) from 12:00:00 to 12:06:00 - Duration: 0:06:00",
+    ]
+
+
+def test_query_filters(tmp_path):
+    (tmp_path / "a.log").write_text(
+        LOG + "12:20:00,Job A,START,444\n12:27:00,Job A,END,444\n"
+    )
+    db = str(tmp_path / "jobs.db")
+    index_paths(db, [str(tmp_path / "a.log")])
+    seven_minutes = timedelta(minutes=7)
+
+    assert list(query_jobs(db, seven_minutes, description="Job A")) == [
+        Job("Job A", "111", 43200, 43860, 660)
+    ]
+    assert list(query_jobs(db, timedelta(0), pid="444")) == [
+        Job("Job A", "444", 44400, 44820, 420)
+    ]
+    assert [job.pid for job in query_jobs(db, timedelta(0), since="12:01:00")] == [
+        "333",
+        "444",
+    ]
+    assert [job.pid for job in query_jobs(db, timedelta(0), until="12:01:00")] == [
+        "111"
+    ]
+
+
+def test_compressed_archive_is_indexed_once(tmp_path):
+    archive = tmp_path / "jobs.log.1.gz"
+    archive.write_bytes(gzip.compress(LOG.encode()))
+    with closing(connect(str(tmp_path / "jobs.db"))) as connection:
+        assert ingest_file(connection, str(archive)) == 2
+        assert ingest_file(connection, str(archive)) == 0
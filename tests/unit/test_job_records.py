@@ -0,0 +1,65 @@
+import pytest
+from array import array
+from datetime import time, timedelta
+from logparser.job_records import Job, JobTable, classify_durations, seconds_to_time
+
+
+def test_seconds_to_time():
+    assert seconds_to_time(0) == time(0, 0, 0)
+    assert seconds_to_time(13 * 3600 + 61) == time(13, 1, 1)
+    # epoch seconds keep only the time of day
+    assert seconds_to_time(1_700_000_000) == time(22, 13, 20)
+
+
+def test_job_as_dict():
+    job = Job("Job A", "111", 3600, 3780, 180)
+    assert job.as_dict() == {
+        "description": "Job A",
+        "pid": "111",
+        "start_time": time(1, 0, 0),
+        "end_time": time(1, 3, 0),
+        "duration": timedelta(minutes=3),
+    }
+
+
+def test_job_table_columns_and_interning():
+    jobs = [Job("Job " + "A", str(111), i, i + 10, 10) for i in range(5)]
+    table = JobTable(jobs)
+    assert len(table) == 5
+    assert table[3] == jobs[3]
+    assert list(table) == jobs
+    assert list(table.duration) == [10] * 5
+    assert all(
+        description is table.descriptions[0] for description in table.descriptions
+    )
+
+
+def test_classify_durations_without_numpy(monkeypatch):
+    monkeypatch.setattr("logparser.job_records._import_numpy", lambda: None)
+    durations = array("q", [10, 300, 301, 600, 601, -5])
+    assert classify_durations(durations, 300, 600) == [
+        (2, False),
+        (3, False),
+        (4, True),
+    ]
+
+
+def test_classify_durations_with_numpy():
+    pytest.importorskip("numpy")
+    durations = array("q", [10, 300, 301, 600, 601, -5])
+    assert classify_durations(durations, 300, 600) == [
+        (2, False),
+        (3, False),
+        (4, True),
+    ]
+
+
+def test_job_table_classify_uses_timedelta_thresholds():
+    table = JobTable(Job("Job", str(i), 0, i * 60, i * 60) for i in range(12))
+    flagged = table.classify(timedelta(minutes=5), timedelta(minutes=10))
+    assert [index for index, _ in flagged] == [6, 7, 8, 9, 10, 11]
+    assert [index for index, is_error in flagged if is_error] == [11]
+    assert table.classify(timedelta(minutes=5), timedelta(minutes=10), 8, 10) == [
+        (8, False),
+        (9, False),
+    ]
@@ -0,0 +1,112 @@
+import io
+import json
+import random
+import pytest
+from datetime import timedelta
+from logparser.job_records import Job, JobTable
+from logparser.job_summary import DDSketch, JobSummary, write_summary
+
+
+def exact_quantile(values, q):
+    return sorted(values)[int(q * (len(values) - 1))]
+
+
+def test_ddsketch_quantiles_within_relative_accuracy():
+    random.seed(7)
+    values = [random.lognormvariate(5, 1.5) for _ in range(10000)]
+    sketch = DDSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+    for q in (0.5, 0.95, 0.99):
+        exact = exact_quantile(values, q)
+        assert abs(sketch.quantile(q) - exact) <= 0.01 * exact
+    assert len(sketch.buckets) < 2000
+
+
+def test_ddsketch_merge_equals_single_sketch():
+    first, second, whole = DDSketch(), DDSketch(), DDSketch()
+    for value in range(1000):
+        (first if value % 3 else second).add(value)
+        whole.add(value)
+    first.merge(second)
+    assert first.count == whole.count
+    assert first.zero_count == whole.zero_count == 1
+    assert first.buckets == whole.buckets
+    with pytest.raises(ValueError):
+        first.merge(DDSketch(relative_accuracy=0.05))
+
+
+def test_summary_counts_and_thresholds():
+    jobs = [
+        Job("Job A", str(minutes), 0, minutes * 60, minutes * 60)
+        for minutes in (1, 5, 6, 10, 11)
+    ]
+    summary = JobSummary()
+    summary.update(jobs)
+    (record,) = summary.records()
+    assert record["description"] == "Job A"
+    assert record["count"] == 5
+    assert record["mean"] == 396
+    assert record["max"] == 660
+    # like generate_report: above 5 minutes warns, above 10 minutes is an error
+    assert (record["warnings"], record["errors"]) == (2, 1)
+    assert record["p99"] <= record["max"]
+
+
+def test_summary_accepts_every_job_representation():
+    jobs = [
+        Job("Job A", "1", 0, 400, 400),
+        Job("Job B", "2", 0, 30, 30),
+        Job("Job A", "3", 0, 700, 700),
+    ]
+    expected = JobSummary()
+    expected.update(jobs)
+    for representation in (JobTable(jobs), [job.as_dict() for job in jobs]):
+        summary = JobSummary()
+        summary.update(representation)
+        assert list(summary.records()) == list(expected.records())
+
+
+def test_summaries_merge_like_one_pass():
+    jobs = [
+        Job(f"Job {index % 3}", str(index), 0, index, index) for index in range(300)
+    ]
+    whole = JobSummary()
+    whole.update(jobs, warning_threshold=timedelta(seconds=100))
+    merged = JobSummary()
+    for part in (jobs[:100], jobs[100:]):
+        summary = JobSummary()
+        summary.update(part, warning_threshold=timedelta(seconds=100))
+        merged.merge(summary)
+    assert list(merged.records()) == list(whole.records())
+
+
+def test_write_summary_formats():
+    summary = JobSummary()
+    summary.update([Job("Job A", "1", 0, 400, 400), Job("Job B", "2", 0, 30, 30)])
+
+    text = io.StringIO()
+    write_summary(summary, text)
+    lines = text.getvalue().splitlines()
+    assert lines[0].split() == [
+        "Description",
+        "Count",
+        "Mean",
+        "Max",
+        "P50",
+        "P95",
+        "P99",
+        "Warnings",
+        "Errors",
+    ]
+    assert lines[1].split()[:4] == ["Job", "A", "1", "0:06:40"]
+
+    jsonl = io.StringIO()
+    write_summary(summary, jsonl, "jsonl")
+    records = [json.loads(line) for line in jsonl.getvalue().splitlines()]
+    assert [record["description"] for record in records] == ["Job A", "Job B"]
+    assert records[0]["warnings"] == 1
+
+    csv_output = io.StringIO()
+    write_summary(summary, csv_output, "csv")
+    assert csv_output.getvalue().splitlines()[0].startswith("description,count,mean")
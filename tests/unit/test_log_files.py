@@ -0,0 +1,94 @@
+import bz2
+import gzip
+import lzma
+import os
+
+import pytest
+
+from logparser import log_files, log_parser
+from logparser.log_files import open_log, walk_log_files
+
+LOG = "12:00:00,Job A,START,111\r\n12:11:00,Job A,END,111\nbroken\n"
+
+
+@pytest.fixture
+def log_tree(tmp_path):
+    for relative_path in (
+        "a.log",
+        "host1/app.log",
+        "host1/app.log.1",
+        "host1/old/app.log.2.gz",
+        "host2/app.log.bz2",
+        "host2/app.log.state.json",
+        "host2/notes.txt",
+        "archive/app.log",
+    ):
+        path = tmp_path / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("")
+    return tmp_path
+
+
+def native(*paths):
+    return [path.replace("/", os.sep) for path in paths]
+
+
+def test_walk_default_globs(log_tree):
+    assert walk_log_files(str(log_tree)) == native(
+        "a.log",
+        "archive/app.log",
+        "host1/app.log",
+        "host1/app.log.1",
+        "host1/old/app.log.2.gz",
+        "host2/app.log.bz2",
+    )
+
+
+def test_walk_include_and_exclude(log_tree):
+    assert walk_log_files(str(log_tree), include=["*.log"], exclude=["archive"]) == (
+        native("a.log", "host1/app.log")
+    )
+    assert walk_log_files(str(log_tree), include=["host1/*"], exclude=["*.gz"]) == (
+        native("host1/app.log", "host1/app.log.1")
+    )
+
+
+def test_walk_skips_zst_without_zstandard(tmp_path, monkeypatch, capsys):
+    (tmp_path / "app.log.zst").write_bytes(b"")
+    monkeypatch.setattr(log_files, "_import_zstandard", lambda: None)
+    assert walk_log_files(str(tmp_path)) == []
+    assert "zstandard" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize(
+    "suffix, compress",
+    [(".gz", gzip.compress), (".bz2", bz2.compress), (".xz", lzma.compress)],
+)
+def test_open_log_decompresses_like_open(tmp_path, suffix, compress):
+    plain = tmp_path / "app.log"
+    plain.write_bytes(LOG.encode())
+    packed = tmp_path / ("app.log" + suffix)
+    packed.write_bytes(compress(LOG.encode()))
+    with open(plain, newline="") as expected, open_log(str(packed)) as logfile:
+        assert list(logfile) == list(expected)
+    assert list(log_parser.iter_jobs(str(packed))) == list(
+        log_parser.iter_jobs(str(plain))
+    )
+
+
+def test_open_log_zstandard(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    packed = tmp_path / "app.log.zst"
+    packed.write_bytes(zstandard.compress(LOG.encode()))
+    with open_log(str(packed)) as logfile:
+        assert logfile.read() == LOG
+
+
+def test_compressed_files_fall_back_to_streaming(tmp_path):
+    plain = tmp_path / "app.log"
+    plain.write_text(LOG)
+    packed = tmp_path / "app.log.gz"
+    packed.write_bytes(gzip.compress(LOG.encode()))
+    expected = log_parser.parse_log_file(str(plain))
+    assert log_parser.parse_log_file(str(packed), reader="mmap") == expected
+    assert log_parser.parse_log_file(str(packed), workers=2) == expected
@@ -0,0 +1,132 @@
+import io
+import pytest
+from logparser import log_parser
+from logparser.log_formats import (
+    DEFAULT_FORMAT,
+    LogFormat,
+    parse_log_format,
+    row_reader,
+)
+
+EXPECTED = [
+    ["12:00:00", "Job A", "START", "111"],
+    ["12:11:00", "Job A", "END", "111"],
+]
+
+
+def rows(log_format, text):
+    malformed = []
+    read_rows = row_reader(log_format)
+    result = list(read_rows(io.StringIO(text), on_malformed=malformed.append))
+    return result, malformed
+
+
+def test_default_format_uses_the_plain_reader():
+    assert parse_log_format() == DEFAULT_FORMAT
+    assert row_reader(DEFAULT_FORMAT) is log_parser.read_rows
+    assert row_reader(None) is log_parser.read_rows
+
+
+def test_csv_with_other_columns_and_tokens():
+    log_format = parse_log_format(
+        "csv", "host, pid,status,timestamp,description", "begin", "done"
+    )
+    assert log_format == LogFormat("csv", (3, 4, 2, 1), 5, "begin", "done")
+    result, malformed = rows(
+        log_format,
+        "web1,111,begin,12:00:00,Job A\n"
+        "web1,111,done\n"
+        "web1, 111 ,done,12:11:00, Job A\n",
+    )
+    assert result == EXPECTED
+    assert malformed == [["web1", "111", "done"]]
+
+
+def test_other_tokens_neither_start_nor_end():
+    # with begin/done as the tokens, a literal START or END is no event
+    log_format = parse_log_format("csv", None, "begin", "done")
+    result, _ = rows(
+        log_format,
+        "12:00:00,Job A,START,111\n12:01:00,Job A,running,111\n"
+        "12:11:00,Job A,END,111\n",
+    )
+    assert [row[2] for row in result] == ["", "", ""]
+    assert list(log_parser.match_jobs(result)) == []
+
+
+def test_tsv():
+    result, malformed = rows(
+        parse_log_format("tsv"),
+        "12:00:00\tJob A\tSTART\t111\n12:11:00\tJob A\tEND\t111\n",
+    )
+    assert result == EXPECTED
+    assert malformed == []
+
+
+def test_jsonl_with_renamed_keys():
+    log_format = parse_log_format("jsonl", "timestamp=ts,description=job")
+    result, malformed = rows(
+        log_format,
+        '{"ts": "12:00:00", "job": "Job A", "status": "START", "pid": 111}\n'
+        "\n"
+        "[1, 2]\n"
+        '{"ts": "12:05:00", "job": "Job B"}\n'
+        '{"ts": "12:11:00", "job": "Job A", "status": "END", "pid": "111"}\n',
+    )
+    assert result == EXPECTED
+    assert malformed == ["[1, 2]", '{"ts": "12:05:00", "job": "Job B"}']
+
+
+def test_key_value_pairs():
+    result, malformed = rows(
+        parse_log_format("kv", "status=event"),
+        'timestamp=12:00:00 description="Job A" event=START pid=111 host=web1\n'
+        "timestamp=12:05:00 pid=222\n"
+        'pid=111 event=END description="Job A" timestamp=12:11:00\n',
+    )
+    assert result == EXPECTED
+    assert malformed == ["timestamp=12:05:00 pid=222"]
+
+
+def test_key_value_escaped_quotes():
+    result, _ = rows(
+        parse_log_format("kv"),
+        r'timestamp=12:00:00 description="say \"hi\"" status=START pid=1' + "\n",
+    )
+    assert result == [["12:00:00", 'say "hi"', "START", "1"]]
+
+
+@pytest.mark.parametrize(
+    "kind, fields",
+    [
+        ("xml", None),
+        ("csv", "timestamp,description,status"),
+        ("jsonl", "timestamp"),
+        ("kv", "duration=took"),
+    ],
+)
+def test_invalid_specs(kind, fields):
+    with pytest.raises(ValueError):
+        parse_log_format(kind, fields)
+
+
+def test_iter_jobs_matches_across_formats(tmp_path):
+    csv_log = tmp_path / "jobs.log"
+    csv_log.write_text("12:00:00,Job A,START,111\n12:11:00,Job A,END,111\n")
+    jsonl_log = tmp_path / "jobs.jsonl"
+    jsonl_log.write_text(
+        '{"timestamp": "12:00:00", "description": "Job A", "status": "START", '
+        '"pid": "111"}\n'
+        '{"timestamp": "12:11:00", "description": "Job A", "status": "END", '
+        '"pid": "111"}\n'
+    )
+    expected = list(log_parser.iter_jobs(str(csv_log), compact=True))
+    assert expected[0].duration == 660
+    assert (
+        list(
+            log_parser.iter_jobs(
+                str(jsonl_log), compact=True, log_format=parse_log_format("jsonl")
+            )
+        )
+        == expected
+    )
@@ -2,8 +2,7 @@ import io
 import csv
 import pytest
 from datetime import datetime, timedelta
-import log_parser
-import sys
+from logparser import log_parser
 
 
 # Helper to create in-memory CSV log content
@@ -28,18 +27,6 @@ def simple_log():
     return make_log_content(rows)
 
 
-# Patch sys.argv before importing log_parser to control arg_parser.get_args()
-@pytest.fixture(autouse=True)
-def patch_sys_argv(monkeypatch):
-    # Set default arguments for arg_parser
-    monkeypatch.setattr(
-        sys,
-        "argv",
-        ["prog", "-f", "dummy.csv", "-t", "%H:%M:%S", "-w", "5", "-e", "10"],
-    )
-    yield
-
-
 # Helper to create in-memory CSV log content
 def make_log_content(rows):
     output = io.StringIO()
@@ -548,3 +535,110 @@ def test_parse_log_file_handles_whitespace(monkeypatch):
     assert jobs[0]["description"] == "Job D"
     assert jobs[0]["pid"] == "888"
     assert jobs[0]["duration"] == timedelta(minutes=7)
+
+
+def test_iter_jobs_yields_lazily(monkeypatch):
+    rows = [
+        ["12:00:00", "Job A", "START", "111"],
+        ["12:03:00", "Job A", "END", "111"],
+        ["notatime", "Job B", "START", "222"],  # only reached on the next job
+    ]
+    log = make_log_content(rows)
+    monkeypatch.setattr("builtins.open", lambda *a, **k: log)
+    jobs = log_parser.iter_jobs("dummy.csv")
+    first = next(jobs)
+    assert first["description"] == "Job A"
+    assert first["duration"] == timedelta(minutes=3)
+    with pytest.raises(ValueError):
+        next(jobs)
+
+
+def test_generate_report_consumes_iter_jobs(monkeypatch, capsys, simple_log):
+    monkeypatch.setattr("builtins.open", lambda *a, **k: simple_log)
+    log_parser.generate_report(log_parser.iter_jobs("dummy.csv"))
+    out = capsys.readouterr().out
+    assert "ERROR: Job B (PID 222)" in out
+    assert "Job A" not in out
+
+
+def test_parse_log_file_compact_and_table(monkeypatch, simple_log):
+    rows = simple_log.getvalue()
+    monkeypatch.setattr("builtins.open", lambda *a, **k: io.StringIO(rows))
+    jobs = log_parser.parse_log_file("dummy.csv")
+    compact = log_parser.parse_log_file("dummy.csv", result_type="compact")
+    table = log_parser.parse_log_file("dummy.csv", result_type="table")
+
+    assert compact[1] == log_parser.Job("Job B", "222", 13 * 3600, 13 * 3600 + 660, 660)
+    assert len(table) == 2
+    assert list(table) == compact
+    assert [job.as_dict() for job in compact] == jobs
+
+
+def test_generate_report_accepts_compact_jobs(monkeypatch, capsys, simple_log):
+    rows = simple_log.getvalue()
+    monkeypatch.setattr("builtins.open", lambda *a, **k: io.StringIO(rows))
+    log_parser.generate_report(log_parser.parse_log_file("dummy.csv"))
+    expected = capsys.readouterr().out
+    for result_type in ("compact", "table"):
+        log_parser.generate_report(
+            log_parser.parse_log_file("dummy.csv", result_type=result_type)
+        )
+        assert capsys.readouterr().out == expected
+
+
+def test_generate_report_job_table_matches_dicts(capsys, monkeypatch):
+    # classified in several batches of rows
+    monkeypatch.setattr("logparser.log_parser.CLASSIFY_BATCH_SIZE", 3)
+    jobs = [
+        log_parser.Job(f"Job {minutes}", str(minutes), 0, minutes * 60, minutes * 60)
+        for minutes in (1, 5, 6, 10, 11, 3, 7)
+    ]
+    log_parser.generate_report([job.as_dict() for job in jobs])
+    expected = capsys.readouterr().out
+    log_parser.generate_report(log_parser.JobTable(jobs))
+    assert capsys.readouterr().out == expected
+    assert expected.count("WARNING") == 3
+    assert expected.count("ERROR") == 1
+
+
+def test_parse_log_file_rolls_over_midnight(monkeypatch):
+    rows = make_log_content(
+        [
+            ["23:55:00", "Job A", "START", "111"],
+            ["00:00:00", "Job B", "START", "222"],
+            ["00:10:00", "Job A", "END", "111"],
+            ["00:02:00", "Job B", "END", "222"],
+        ]
+    ).getvalue()
+    monkeypatch.setattr("builtins.open", lambda *a, **k: io.StringIO(rows))
+    jobs = log_parser.parse_log_file("dummy.csv")
+    compact = log_parser.parse_log_file("dummy.csv", result_type="compact")
+
+    assert [job["duration"] for job in jobs] == [
+        timedelta(minutes=15),
+        timedelta(minutes=2),
+    ]
+    # a START at 00:00:00 is 0 seconds and must not be taken for a missing one
+    assert compact == [
+        log_parser.Job("Job A", "111", 86100, 600, 900),
+        log_parser.Job("Job B", "222", 0, 120, 120),
+    ]
+    assert [job.as_dict() for job in compact] == jobs
+
+
+def test_dated_timestamps_do_not_roll_over():
+    rows = [
+        ["2024-01-02 00:10:00", "Job A", "START", "111"],
+        ["2024-01-01 23:55:00", "Job A", "END", "111"],
+    ]
+    (job,) = log_parser.match_jobs(rows, "%Y-%m-%d %H:%M:%S", compact=True)
+    assert job.duration == -900
+
+
+def test_root_script_keeps_the_library_functions():
+    # the log_parser.py at the top of the repository, run as a script by CI
+    import log_parser as script
+
+    assert script.parse_log_file is log_parser.parse_log_file
+    assert script.iter_jobs is log_parser.iter_jobs
+    assert script.generate_report is log_parser.generate_report
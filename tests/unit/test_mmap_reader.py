@@ -0,0 +1,76 @@
+import pytest
+from logparser import log_parser
+from logparser.mmap_reader import read_rows_mmap
+
+LOG_CONTENT = (
+    "12:00:00,Job A,START,111\n"
+    " 12:01:00 , Job B , START , 222 \r\n"
+    "\n"
+    "12:03:00,Job A,END\n"
+    '12:04:00,"Job, quoted",START,333\n'
+    "12:05:00,Job A,END,111\n"
+    '12:06:00,"Job, quoted",END,333\n'
+    "12:13:00,Job B,END,222"
+)
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "jobs.log"
+    path.write_bytes(LOG_CONTENT.encode())
+    return str(path)
+
+
+def test_read_rows_mmap_matches_csv_reader(log_file, capsys):
+    with open(log_file, newline="") as csvfile:
+        expected = list(log_parser.read_rows(csvfile))
+    expected_out = capsys.readouterr().out
+
+    assert list(read_rows_mmap(log_file)) == expected
+    assert capsys.readouterr().out == expected_out
+
+
+def test_parse_log_file_mmap_matches_csv(log_file, capsys):
+    jobs = log_parser.parse_log_file(log_file, reader="mmap")
+    assert jobs == log_parser.parse_log_file(log_file)
+    assert [job["description"] for job in jobs] == ["Job A", "Job, quoted", "Job B"]
+
+
+def test_read_rows_mmap_empty_file(tmp_path):
+    path = tmp_path / "empty.log"
+    path.write_bytes(b"")
+    assert list(read_rows_mmap(str(path))) == []
+
+
+@pytest.mark.parametrize("block_size", [1, 16, 64])
+def test_read_rows_mmap_small_blocks(tmp_path, capsys, block_size):
+    path = tmp_path / "clean.log"
+    path.write_text(
+        "12:00:00,Job A,START,111\n12:03:00,Job A,END\n"
+        "12:05:00,Job A,END,111\n" + LOG_CONTENT
+    )
+    with open(path, newline="") as csvfile:
+        expected = list(log_parser.read_rows(csvfile))
+    expected_out = capsys.readouterr().out
+
+    assert list(read_rows_mmap(str(path), block_size=block_size)) == expected
+    assert capsys.readouterr().out == expected_out
+
+
+@pytest.mark.parametrize("block_size", [1, 8, 16, 24, 40, 64, 1 << 20])
+def test_read_rows_mmap_quoted_newline_across_blocks(tmp_path, capsys, block_size):
+    path = tmp_path / "quoted.log"
+    path.write_bytes(
+        b'12:00:00,"Job\nwith, a newline",START,111\n'
+        b"12:01:00,Job B,START,222\n"
+        b'12:05:00,"Job\r\n""two""\nlines",END,111\r\n'
+        b"12:06:00,Job B,END,222\n"
+        b'12:07:00,"never closed,END,333\n'
+        b"12:08:00,Job C,START,444\n"
+    )
+    with open(path, newline="") as csvfile:
+        expected = list(log_parser.read_rows(csvfile))
+    expected_out = capsys.readouterr().out
+
+    assert list(read_rows_mmap(str(path), block_size=block_size)) == expected
+    assert capsys.readouterr().out == expected_out
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+from functools import partial
+from logparser import log_parser
+from logparser.open_jobs import OpenJobTable
+
+
+class Recorder:
+    def __init__(self):
+        self.unterminated = []
+        self.collisions = []
+
+    def table(self, **kwargs):
+        return OpenJobTable(
+            on_unterminated=lambda pid, description, start, reason: (
+                self.unterminated.append((pid, start, reason.split(",")[0]))
+            ),
+            on_collision=lambda pid, description, start, previous: (
+                self.collisions.append((pid, description, start, previous))
+            ),
+            **kwargs,
+        )
+
+
+def test_max_size_evicts_oldest_first():
+    recorder = Recorder()
+    jobs = recorder.table(max_size=2)
+    for pid, start in (("1", 10), ("2", 20), ("3", 30)):
+        jobs.start(pid, f"Job {pid}", start)
+    assert list(jobs) == ["2", "3"]
+    assert recorder.unterminated == [("1", 10, "evicted")]
+    assert jobs.end("2") == 20
+    assert jobs.end("2") is None
+    assert jobs.descriptions == {"3": "Job 3"}
+
+
+def test_max_age_evicts_stale_jobs():
+    recorder = Recorder()
+    jobs = recorder.table(max_age=timedelta(minutes=10))
+    jobs.start("1", "Job 1", datetime(2024, 1, 1, 12, 0))
+    jobs.start("2", "Job 2", datetime(2024, 1, 1, 12, 5))
+    jobs.start("3", "Job 3", datetime(2024, 1, 1, 12, 11))
+    assert list(jobs) == ["2", "3"]
+    assert [pid for pid, _, _ in recorder.unterminated] == ["1"]
+
+
+def test_max_age_wraps_around_midnight_for_time_only_formats():
+    recorder = Recorder()
+    jobs = recorder.table(max_age=timedelta(minutes=30))
+    jobs.start("1", "Job 1", 23 * 3600 + 50 * 60)
+    # 20 minutes later, past midnight: not stale yet
+    jobs.start("2", "Job 2", 10 * 60)
+    assert list(jobs) == ["1", "2"]
+    jobs.start("3", "Job 3", 30 * 60)
+    assert list(jobs) == ["2", "3"]
+
+
+def test_pid_reuse_is_reported_and_replaces_the_job():
+    recorder = Recorder()
+    jobs = recorder.table()
+    jobs.start("1", "Job A", 10)
+    jobs.start("1", "Job B", 20)
+    assert recorder.collisions == [("1", "Job B", 20, ("Job A", 10))]
+    assert dict(jobs) == {"1": 20}
+    assert jobs.collisions == 1
+
+
+def test_iter_jobs_reports_unterminated_jobs(tmp_path, capsys):
+    log = tmp_path / "jobs.log"
+    log.write_text(
+        "00:00:00,Job A,START,111\n"
+        "00:01:00,Job B,START,222\n"
+        "00:05:00,Job C,START,111\n"
+        "00:22:00,Job D,START,333\n"
+        "00:40:00,Job C,END,111\n"
+    )
+    table = partial(OpenJobTable, max_age=timedelta(minutes=20))
+    jobs = list(log_parser.iter_jobs(str(log), compact=True, open_jobs=table))
+    assert jobs == [log_parser.Job("Job C", "111", 300, 2400, 2100)]
+    assert capsys.readouterr().out.splitlines() == [
+        "PID REUSE: Job C (PID 111) started at 00:05:00 while Job A started at "
+        "00:00:00 had not ended",
+        "UNTERMINATED: Job B (PID 222) started at 00:01:00 - evicted, open for "
+        "more than 0:20:00",
+        "UNTERMINATED: Job D (PID 333) started at 00:22:00 - no END before the end "
+        "of the log",
+    ]
@@ -0,0 +1,133 @@
+import io
+import random
+from contextlib import redirect_stdout
+import pytest
+from logparser import log_parser, parallel
+from logparser.report_sink import ReportSink
+
+
+@pytest.fixture
+def log_folder(tmp_path):
+    (tmp_path / "b.log").write_text(
+        "13:00:00,Job B,START,222\n13:06:00,Job B,END,222\n"
+    )
+    (tmp_path / "a.log").write_text(
+        "12:00:00,Job A,START,111\nmalformed\n12:11:00,Job A,END,111\n"
+    )
+    (tmp_path / "notes.txt").write_text("12:00:00,Ignored,START,1\n")
+    return tmp_path
+
+
+def test_list_log_files_sorted_and_filtered(log_folder):
+    assert parallel.list_log_files(log_folder) == ["a.log", "b.log"]
+
+
+def test_report_log_file_captures_output(log_folder):
+    report = parallel.report_log_file(str(log_folder / "a.log"))
+    assert report.splitlines() == [
+        "Skipping malformed row: ['malformed']",
+        "ERROR: Job A (PID 111) from 12:00:00 to 12:11:00 - Duration: 0:11:00",
+    ]
+
+
+def test_report_folder_parallel_matches_serial(log_folder, capsys):
+    parallel.report_folder(str(log_folder))
+    serial = capsys.readouterr().out
+    parallel.report_folder(str(log_folder), jobs=2)
+    assert capsys.readouterr().out == serial
+    assert serial.index("a.log") < serial.index("b.log")
+
+
+def test_report_folder_parallel_caps_malformed_rows(log_folder):
+    (log_folder / "c.log").write_text("bad\nworse\n")
+    stream = io.StringIO()
+    with ReportSink(stream, max_malformed=1) as sink, redirect_stdout(sink):
+        parallel.report_folder(str(log_folder), jobs=2, on_malformed=sink.malformed)
+    assert stream.getvalue().splitlines() == [
+        "Parsing log file: a.log",
+        "Skipping malformed row: ['malformed']",
+        "ERROR: Job A (PID 111) from 12:00:00 to 12:11:00 - Duration: 0:11:00",
+        "Parsing log file: b.log",
+        "WARNING: Job B (PID 222) from 13:00:00 to 13:06:00 - Duration: 0:06:00",
+        "Parsing log file: c.log",
+        "3 malformed rows, first 1 shown",
+    ]
+
+
+def test_report_folder_completion_order_reports_every_file(log_folder, capsys):
+    parallel.report_folder(str(log_folder), jobs=2, order="completion")
+    out = capsys.readouterr().out
+    assert "Parsing log file: a.log" in out
+    assert "Parsing log file: b.log" in out
+    assert "notes.txt" not in out
+
+
+def test_report_folder_summary_parallel_matches_serial(log_folder, capsys):
+    from logparser.job_summary import JobSummary
+
+    serial, merged = JobSummary(), JobSummary()
+    parallel.report_folder(str(log_folder), summary=serial)
+    serial_out = capsys.readouterr().out
+    parallel.report_folder(str(log_folder), jobs=2, summary=merged)
+    assert capsys.readouterr().out == serial_out
+    assert "ERROR" not in serial_out
+    assert list(merged.records()) == list(serial.records())
+    assert [record["count"] for record in serial.records()] == [1, 1]
+
+
+def write_random_log(path, lines, seed=0):
+    rng = random.Random(seed)
+    with open(path, "w") as logfile:
+        for second in range(lines):
+            pid = rng.randint(1, 20)
+            status = rng.choice(["START", "END", "END"])
+            timestamp = (
+                f"{second // 3600 % 24:02d}:{second // 60 % 60:02d}:{second % 60:02d}"
+            )
+            if rng.random() < 0.02:
+                logfile.write(f"{timestamp},broken\n")
+            else:
+                logfile.write(f"{timestamp},Job {pid},{status},{pid}\n")
+
+
+@pytest.mark.parametrize("chunks", [1, 2, 3, 7, 50])
+def test_chunked_parse_matches_serial(tmp_path, capsys, chunks):
+    log_file = tmp_path / "big.log"
+    write_random_log(log_file, 2000)
+    serial = log_parser.parse_log_file(str(log_file))
+    serial_out = capsys.readouterr().out
+
+    ranges = parallel.split_file(str(log_file), chunks)
+    merged = parallel.merge_chunks(
+        parallel.parse_chunk(str(log_file), start, end) for start, end in ranges
+    )
+    assert merged == serial
+    assert capsys.readouterr().out == serial_out
+
+
+def test_split_file_ranges_are_line_aligned(tmp_path):
+    log_file = tmp_path / "big.log"
+    write_random_log(log_file, 500)
+    data = log_file.read_bytes()
+    ranges = parallel.split_file(str(log_file), 8)
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert data[start - 1 : start] == b"\n"
+
+
+def test_parse_log_file_with_workers(tmp_path):
+    log_file = tmp_path / "big.log"
+    write_random_log(log_file, 1000, seed=3)
+    assert log_parser.parse_log_file(
+        str(log_file), workers=3
+    ) == log_parser.parse_log_file(str(log_file))
+
+
+def test_parse_log_file_with_workers_compact(tmp_path):
+    log_file = tmp_path / "big.log"
+    write_random_log(log_file, 1000, seed=4)
+    assert log_parser.parse_log_file(
+        str(log_file), workers=3, result_type="compact"
+    ) == log_parser.parse_log_file(str(log_file), result_type="compact")
@@ -0,0 +1,61 @@
+import threading
+
+from logparser import parallel
+from logparser.prefetch import Prefetcher
+
+
+class RecordingPrefetcher(Prefetcher):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.read = []
+        self.lock = threading.Lock()
+
+    def _read_file(self, path):
+        with self.lock:
+            self.read.append(path)
+        super()._read_file(path)
+
+
+def test_prefetcher_yields_paths_in_order(tmp_path):
+    paths = []
+    for index in range(6):
+        path = tmp_path / f"{index}.log"
+        path.write_bytes(b"x" * 1000)
+        paths.append(str(path))
+    with Prefetcher(paths, depth=2, block_size=64) as ahead:
+        assert list(ahead) == paths
+
+
+def test_prefetcher_stays_within_depth(tmp_path):
+    paths = [str(tmp_path / f"{index}.log") for index in range(8)]
+    for path in paths:
+        open(path, "w").close()
+    with RecordingPrefetcher(paths, depth=3) as ahead:
+        for position, path in enumerate(ahead):
+            # the threads may lag behind, but never read past the window
+            with ahead.lock:
+                assert len(ahead.read) <= position + 4
+    # reads that had not started yet are cancelled on close
+    assert set(ahead.read) <= set(paths)
+
+
+def test_prefetcher_without_depth_uses_no_threads(tmp_path):
+    ahead = Prefetcher(["a.log", "b.log"], depth=0)
+    assert ahead._executor is None
+    assert list(ahead) == ["a.log", "b.log"]
+
+
+def test_prefetcher_ignores_missing_files(tmp_path):
+    with Prefetcher([str(tmp_path / "missing.log")], depth=1) as ahead:
+        assert len(list(ahead)) == 1
+
+
+def test_report_folder_with_prefetch_matches_serial(tmp_path, capsys):
+    for name in ("a.log", "b.log", "c.log"):
+        (tmp_path / name).write_text(
+            "12:00:00,Job A,START,111\n12:11:00,Job A,END,111\n"
+        )
+    parallel.report_folder(str(tmp_path))
+    serial = capsys.readouterr().out
+    parallel.report_folder(str(tmp_path), prefetch=2)
+    assert capsys.readouterr().out == serial
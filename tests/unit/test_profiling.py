@@ -0,0 +1,79 @@
+import json
+from functools import partial
+import pytest
+from logparser import log_parser
+from logparser.open_jobs import OpenJobTable
+from logparser.profiling import PHASES, ParseStats, profiled_jobs
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "jobs.log"
+    path.write_text(
+        "12:00:00,Job A,START,111\n"
+        "12:01:00,Job B,START,222\n"
+        "12:02:00,Job C,START,333\n"
+        "broken row\n"
+        "12:11:00,Job A,END,111\n"
+        "12:12:00,Job D,END,444\n"
+        "12:13:00,Job B,END,222\n"
+    )
+    return str(path)
+
+
+def test_profiled_jobs_match_iter_jobs(log_file, capsys):
+    expected = list(log_parser.iter_jobs(log_file))
+    expected_out = capsys.readouterr().out
+    assert list(profiled_jobs(log_file)) == expected
+    assert capsys.readouterr().out == expected_out
+
+
+def test_profiled_jobs_counters(log_file):
+    stats = ParseStats()
+    stats.run_report(log_parser.generate_report, profiled_jobs(log_file, stats=stats))
+    assert stats.files == 1
+    assert stats.rows == 7
+    assert stats.malformed_rows == 1
+    assert stats.orphan_ends == 1
+    assert stats.unmatched_starts == 1
+    assert stats.peak_open_jobs == 3
+    assert stats.jobs == 2
+    assert stats.bytes > 0
+    assert all(stats.phases[phase] >= 0 for phase in PHASES)
+    assert sum(stats.phases.values()) <= stats.total * 1.01
+
+
+def test_parse_stats_formats(log_file):
+    stats = ParseStats()
+    stats.run_report(log_parser.generate_report, profiled_jobs(log_file, stats=stats))
+    assert json.loads(stats.format("json"))["orphan_ends"] == 1
+    text = stats.format()
+    assert text.startswith("Parse statistics (1 file(s)")
+    assert "unmatched STARTs 1" in text
+
+
+def test_profiled_jobs_mmap_reader(log_file, capsys):
+    expected = list(log_parser.iter_jobs(log_file, reader="mmap"))
+    expected_out = capsys.readouterr().out
+    stats = ParseStats()
+    assert list(profiled_jobs(log_file, stats=stats, reader="mmap")) == expected
+    assert capsys.readouterr().out == expected_out
+    assert stats.rows == 7
+    assert stats.orphan_ends == 1
+
+
+def test_profiled_jobs_bounded_open_jobs(log_file):
+    unterminated = []
+    open_jobs = partial(
+        OpenJobTable,
+        max_size=1,
+        on_unterminated=lambda pid, *_: unterminated.append(pid),
+    )
+    expected = list(log_parser.iter_jobs(log_file, open_jobs=open_jobs))
+    expected_unterminated = unterminated[:]
+    del unterminated[:]
+    stats = ParseStats()
+    jobs = list(profiled_jobs(log_file, stats=stats, open_jobs=open_jobs))
+    assert jobs == expected
+    assert unterminated == expected_unterminated == ["111", "222", "333"]
+    assert stats.peak_open_jobs == 1
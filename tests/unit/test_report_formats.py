@@ -0,0 +1,87 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+from logparser import log_parser
+from logparser.job_records import Job, JobTable
+from logparser.report_formats import (
+    FIELDS,
+    ColumnarWriter,
+    CsvWriter,
+    JsonLinesWriter,
+    read_columnar,
+)
+
+JOBS = [
+    Job("Job A", "111", 1000, 1400, 400),
+    Job("Job B", "222", 1000, 1100, 100),
+    Job("Job A", "333", 2000, 2700, 700),
+    Job("Jöb C", "444", 1_700_000_000, 1_700_000_660, 660),
+]
+EXPECTED = [
+    dict(zip(FIELDS, ("WARNING", "Job A", "111", 1000, 1400, 400))),
+    dict(zip(FIELDS, ("ERROR", "Job A", "333", 2000, 2700, 700))),
+    dict(zip(FIELDS, ("ERROR", "Jöb C", "444", 1_700_000_000, 1_700_000_660, 660))),
+]
+
+
+def report(jobs, writer):
+    log_parser.generate_report(jobs, writer=writer)
+    writer.close()
+
+
+def test_json_lines_writer():
+    stream = io.StringIO()
+    report(JOBS, JsonLinesWriter(stream))
+    assert [json.loads(line) for line in stream.getvalue().splitlines()] == EXPECTED
+
+
+def test_csv_writer():
+    stream = io.StringIO()
+    report(JOBS, CsvWriter(stream))
+    rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+    assert [
+        {**row, **{key: int(row[key]) for key in ("start", "end", "duration")}}
+        for row in rows
+    ] == EXPECTED
+
+
+def test_columnar_round_trip_over_row_groups():
+    stream = io.BytesIO()
+    report(JobTable(JOBS), ColumnarWriter(stream, row_group_size=2))
+    assert stream.getvalue().count(b"LPRC") == 2
+    stream.seek(0)
+    assert list(read_columnar(stream)) == EXPECTED
+
+
+def test_columnar_rejects_other_data():
+    stream = io.BytesIO(b"not a report")
+    try:
+        list(read_columnar(stream))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_dict_jobs_use_seconds_since_midnight():
+    job = log_parser.make_job(
+        "Job A", "111", datetime(2024, 1, 1, 1, 0), datetime(2024, 1, 1, 1, 6)
+    )
+    stream = io.StringIO()
+    report([job], JsonLinesWriter(stream))
+    assert json.loads(stream.getvalue()) == dict(
+        zip(FIELDS, ("WARNING", "Job A", "111", 3600, 3960, 360))
+    )
+
+
+def test_writer_output_matches_text_report(capsys):
+    log_parser.generate_report(JOBS, warning_threshold=timedelta(minutes=5))
+    printed = capsys.readouterr().out.splitlines()
+    stream = io.StringIO()
+    report(JOBS, JsonLinesWriter(stream))
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line.split(":")[0] for line in printed] == [
+        record["classification"] for record in records
+    ]
@@ -0,0 +1,100 @@
+import io
+from datetime import datetime
+
+from logparser import log_parser
+from logparser.report_sink import FileSink, ReportSink, RotatingFileSink, open_sink
+
+
+def test_sink_buffers_until_flush():
+    stream = io.StringIO()
+    sink = ReportSink(stream, buffer_size=100)
+    sink.write("first line\n")
+    assert stream.getvalue() == ""
+    sink.flush()
+    assert stream.getvalue() == "first line\n"
+
+
+def test_sink_flushes_when_buffer_is_full():
+    stream = io.StringIO()
+    sink = ReportSink(stream, buffer_size=10)
+    sink.write("12345")
+    assert stream.getvalue() == ""
+    sink.write("67890")
+    assert stream.getvalue() == "1234567890"
+
+
+class Terminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+def test_sink_writes_each_line_to_a_terminal():
+    stream = Terminal()
+    sink = ReportSink(stream, buffer_size=100)
+    sink.write("WARNING: first")
+    assert stream.getvalue() == ""
+    sink.write("\n")
+    assert stream.getvalue() == "WARNING: first\n"
+
+
+def test_malformed_rows_are_capped():
+    stream = io.StringIO()
+    with ReportSink(stream, max_malformed=2) as sink:
+        for index in range(5):
+            sink.malformed(["row", str(index)])
+    assert stream.getvalue() == (
+        "Skipping malformed row: ['row', '0']\n"
+        "Skipping malformed row: ['row', '1']\n"
+        "5 malformed rows, first 2 shown\n"
+    )
+
+
+def test_malformed_rows_without_cap_have_no_summary():
+    stream = io.StringIO()
+    with ReportSink(stream) as sink:
+        sink.malformed(["row"])
+    assert stream.getvalue() == "Skipping malformed row: ['row']\n"
+
+
+def test_file_sink_appends(tmp_path):
+    path = tmp_path / "report.txt"
+    path.write_text("old\n")
+    with FileSink(str(path)) as sink:
+        sink.write("new\n")
+    assert path.read_text() == "old\nnew\n"
+
+
+def test_rotating_file_sink(tmp_path):
+    path = str(tmp_path / "report.txt")
+    with RotatingFileSink(path, max_bytes=10, backup_count=2, buffer_size=1) as sink:
+        for line in ("aaaaaaa\n", "bbbbbbb\n", "ccccccc\n", "ddddddd\n"):
+            sink.write(line)
+    assert open(path).read() == "ddddddd\n"
+    assert open(path + ".1").read() == "ccccccc\n"
+    assert open(path + ".2").read() == "bbbbbbb\n"
+    assert not (tmp_path / "report.txt.3").exists()
+
+
+def test_open_sink(tmp_path):
+    path = str(tmp_path / "report.txt")
+    assert type(open_sink(path, rotate_bytes=100)) is RotatingFileSink
+    assert type(open_sink(path)) is FileSink
+
+
+def test_generate_report_into_sink_matches_print(capsys):
+    jobs = [
+        log_parser.make_job(
+            "Job A", "1", datetime(2024, 1, 1, 12), datetime(2024, 1, 1, 12, 6)
+        ),
+        log_parser.make_job(
+            "Job B", "2", datetime(2024, 1, 1, 12), datetime(2024, 1, 1, 12, 11)
+        ),
+    ]
+    log_parser.generate_report(jobs)
+    printed = capsys.readouterr().out
+
+    stream = io.StringIO()
+    with ReportSink(stream) as sink:
+        log_parser.generate_report(jobs, sink=sink)
+    assert stream.getvalue() == printed
+    assert "WARNING" in printed and "ERROR" in printed
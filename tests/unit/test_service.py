@@ -0,0 +1,160 @@
+import json
+import threading
+import urllib.request
+from datetime import datetime
+from urllib.error import HTTPError
+import pytest
+from logparser.service import JobService, make_server
+
+
+@pytest.fixture
+def log_file(tmp_path):
+    path = tmp_path / "jobs.log"
+    path.write_text(
+        "12:00:00,Job A,START,111\n"
+        "12:01:00,Job B,START,222\n"
+        "12:11:00,Job A,END,111\n"
+        "12:12:00,Job C,START,333\n"
+    )
+    return path
+
+
+def append(path, text):
+    with open(path, "a") as logfile:
+        logfile.write(text)
+
+
+def clock(*args):
+    # a wall clock stopped at the given time of day
+    return lambda: datetime(2024, 6, 3, *args)
+
+
+class CountingLock:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.acquired = 0
+
+    def __enter__(self):
+        self.lock.acquire()
+        self.acquired += 1
+
+    def __exit__(self, *exc_info):
+        self.lock.release()
+
+
+def test_poll_reads_and_locks_in_batches(log_file, monkeypatch):
+    monkeypatch.setattr("logparser.service.READ_BATCH_LINES", 3)
+    service = JobService({"jobs.log": str(log_file)}, now=clock(12, 12))
+    service.lock = CountingLock()
+    # 4 lines: a batch of 3 and a batch of 1, the open jobs carried across
+    assert service.poll() == 1
+    assert service.lock.acquired == 2
+    assert sorted(job["pid"] for job in service.running()["running"]) == [
+        "222",
+        "333",
+    ]
+    append(log_file, "12:14:00,Job C,END,333\n")
+    acquired = service.lock.acquired
+    assert service.poll() == 1
+    assert service.lock.acquired == acquired + 1
+    service.close()
+
+
+def test_poll_keeps_state_between_reads(log_file):
+    service = JobService({"jobs.log": str(log_file)}, now=clock(12, 12))
+    assert service.poll() == 1
+    assert service.poll() == 0
+
+    alerts = service.alerts()
+    assert [job["pid"] for job in alerts["completed"]] == ["111"]
+    assert alerts["completed"][0]["classification"] == "ERROR"
+    # aged against the wall clock, 12:12:00
+    assert [(job["pid"], job["classification"]) for job in alerts["running"]] == [
+        ("222", "ERROR")
+    ]
+    assert {job["pid"]: job["age"] for job in service.running()["running"]} == {
+        "222": 660,
+        "333": 0,
+    }
+
+    append(log_file, "12:14:00,Job C,END,333\n12:13:00,Job D,START,444\n")
+    assert service.poll() == 1
+    assert service.job("333")["completed"][0]["duration"] == 120
+    assert service.job("444")["running"][0]["description"] == "Job D"
+    assert service.job("999") == {"completed": [], "running": []}
+    counts = {
+        r["description"]: r["count"] for r in service.summary_records()["summary"]
+    }
+    assert counts == {"Job A": 1, "Job C": 1}
+    service.close()
+
+
+def test_bad_timestamp_is_malformed(log_file):
+    malformed = []
+    service = JobService({"jobs.log": str(log_file)}, on_malformed=malformed.append)
+    append(log_file, "noon,Job E,START,555\n12:15:00,Job C,END,333\n")
+    assert service.poll() == 2
+    assert malformed == [["noon", "Job E", "START", "555"]]
+    assert service.job("333")["completed"][0]["duration"] == 180
+    service.close()
+
+
+def test_quiet_log_still_ages_running_jobs(log_file):
+    now = [datetime(2024, 6, 3, 12, 12)]
+    service = JobService({"jobs.log": str(log_file)}, now=lambda: now[0])
+    service.poll()
+    assert [job["pid"] for job in service.alerts()["running"]] == ["222"]
+    # nothing more is written, but Job C hangs
+    now[0] = datetime(2024, 6, 3, 12, 30)
+    assert service.poll() == 0
+    assert [job["pid"] for job in service.alerts()["running"]] == ["222", "333"]
+    service.close()
+
+
+def test_recent_jobs_are_bounded(tmp_path):
+    path = tmp_path / "jobs.log"
+    path.write_text(
+        "".join(
+            f"12:00:00,Job,START,{pid}\n12:01:00,Job,END,{pid}\n" for pid in range(5)
+        )
+    )
+    service = JobService({"jobs.log": str(path)}, max_jobs=2)
+    service.poll()
+    assert [job["pid"] for job in service.jobs] == ["3", "4"]
+    assert sorted(service.by_pid) == ["3", "4"]
+    # the aggregates still cover every job
+    assert next(service.summary.records())["count"] == 5
+    service.close()
+
+
+def test_follows_rotation_keeping_open_jobs(log_file, tmp_path):
+    service = JobService({"jobs.log": str(log_file)})
+    service.poll()
+    log_file.rename(tmp_path / "jobs.log.1")
+    log_file.write_text("12:20:00,Job B,END,222\n")
+    assert service.poll() == 1
+    assert service.job("222")["completed"][0]["duration"] == 1140
+    service.close()
+
+
+def test_http_api(log_file):
+    service = JobService({"jobs.log": str(log_file)}, now=clock(12, 12))
+    service.poll()
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(base + "/jobs/111") as response:  # nosec B310
+            assert response.headers["Content-Type"] == "application/json"
+            answer = json.load(response)
+        assert answer["completed"][0]["duration"] == 660
+        with urllib.request.urlopen(base + "/alerts/") as response:  # nosec B310
+            assert len(json.load(response)["running"]) == 1
+        with pytest.raises(HTTPError) as error:
+            urllib.request.urlopen(base + "/unknown")  # nosec B310
+        assert error.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
@@ -0,0 +1,73 @@
+import gzip
+import os
+
+from logparser import parallel
+from logparser.session import SessionSource, order_session, rotation_stream
+
+
+def test_rotation_stream():
+    assert rotation_stream(os.path.join("h", "app.log")) == (("h", "app.log"), None)
+    assert rotation_stream("app.log.2.gz") == (("", "app.log"), 2)
+    assert rotation_stream("app.log-3") == (("", "app.log"), 3)
+    assert rotation_stream("other.txt") == (("", "other.txt"), None)
+
+
+def test_order_by_rotation():
+    paths = ["app.log", "app.log.1", "app.log.10.gz", "app.log.2", "db.log.1"]
+    assert order_session("", paths) == [
+        "app.log.10.gz",
+        "app.log.2",
+        "app.log.1",
+        "app.log",
+        "db.log.1",
+    ]
+
+
+def test_order_by_first_timestamp(tmp_path):
+    # the numbers do not give the order here, the timestamps do
+    (tmp_path / "app.log-20240101").write_text("bad\n13:00:00,Job,START,1\n")
+    (tmp_path / "app.log-20240102").write_text("12:00:00,Job,START,2\n")
+    (tmp_path / "app.log-20240103").write_text("")
+    assert order_session(
+        str(tmp_path),
+        ["app.log-20240101", "app.log-20240102", "app.log-20240103"],
+        order="timestamp",
+    ) == ["app.log-20240103", "app.log-20240102", "app.log-20240101"]
+
+
+def test_jobs_carry_across_rotated_files(tmp_path):
+    (tmp_path / "app.log.1.gz").write_bytes(
+        gzip.compress(b"12:00:00,Job A,START,111\n12:01:00,Job B,START,222\n")
+    )
+    (tmp_path / "app.log").write_text(
+        "12:11:00,Job A,END,111\n12:02:00,Job B,END,222\n"
+    )
+    # another log in the same folder does not see these open jobs
+    (tmp_path / "other.log").write_text("12:30:00,Job A,END,111\n")
+    source = SessionSource()
+    jobs = {
+        name: list(source(str(tmp_path / name)))
+        for name in order_session(
+            str(tmp_path), ["app.log", "app.log.1.gz", "other.log"]
+        )
+    }
+    assert jobs["app.log.1.gz"] == [] and jobs["other.log"] == []
+    assert [(job["pid"], str(job["duration"])) for job in jobs["app.log"]] == [
+        ("111", "0:11:00"),
+        ("222", "0:01:00"),
+    ]
+    assert source.open_jobs == {
+        (str(tmp_path), "app.log"): {},
+        (str(tmp_path), "other.log"): {},
+    }
+
+
+def test_report_folder_session(tmp_path, capsys):
+    (tmp_path / "app.log.1").write_text("12:00:00,Job A,START,111\n")
+    (tmp_path / "app.log").write_text("12:11:00,Job A,END,111\n")
+    parallel.report_folder(str(tmp_path), source=SessionSource(), arrange=order_session)
+    assert capsys.readouterr().out.splitlines() == [
+        "Parsing log file: app.log.1",
+        "Parsing log file: app.log",
+        "ERROR: Job A (PID 111) from 12:00:00 to 12:11:00 - Duration: 0:11:00",
+    ]
@@ -0,0 +1,89 @@
+import pytest
+from datetime import datetime
+from logparser.timestamp_parser import TimestampParser
+
+
+@pytest.mark.parametrize(
+    "time_format, value",
+    [
+        ("%H:%M:%S", "00:00:00"),
+        ("%H:%M:%S", "23:59:59"),
+        ("%H:%M:%S", "7:05:09"),  # not zero padded, handled by strptime
+        ("%Y-%m-%d %H:%M:%S", "2024-02-29 12:30:45"),
+        ("%Y-%m-%dT%H:%M:%S", "2024-12-31T01:02:03"),
+        ("%d/%m/%Y %H:%M", "31/12/2024 01:02"),  # no fast path
+    ],
+)
+def test_timestamp_parser_matches_strptime(time_format, value):
+    parse_timestamp = TimestampParser(time_format)
+    assert parse_timestamp(value) == datetime.strptime(value, time_format)
+
+
+@pytest.mark.parametrize(
+    "time_format, value",
+    [
+        ("%H:%M:%S", "notatime"),
+        ("%H:%M:%S", "24:00:00"),
+        ("%H:%M:%S", "12:00:60"),
+        ("%Y-%m-%d %H:%M:%S", "2023-02-29 12:00:00"),
+        ("%Y-%m-%dT%H:%M:%S", "2024-01-01 12:00:00"),
+    ],
+)
+def test_timestamp_parser_raises_like_strptime(time_format, value):
+    parse_timestamp = TimestampParser(time_format)
+    with pytest.raises(ValueError):
+        parse_timestamp(value)
+
+
+def test_timestamp_parser_caches_repeated_values(monkeypatch):
+    parse_timestamp = TimestampParser("%d/%m/%Y %H:%M")
+    first = parse_timestamp("01/01/2024 10:00")
+
+    # a cached value must not go through strptime again
+    monkeypatch.setattr("logparser.timestamp_parser.datetime", None)
+    assert parse_timestamp("01/01/2024 10:00") is first
+
+
+def test_timestamp_parser_cache_is_bounded():
+    parse_timestamp = TimestampParser(cache_size=2)
+    for value in ("10:00:00", "10:00:01", "10:00:02"):
+        parse_timestamp(value)
+    assert len(parse_timestamp._cache) <= 2
+
+
+@pytest.mark.parametrize(
+    "time_format, value",
+    [
+        ("%H:%M:%S", "00:00:00"),
+        ("%H:%M:%S", "23:59:59"),
+        ("%H:%M:%S", "7:05:09"),
+        ("%Y-%m-%d %H:%M:%S", "2024-02-29 12:30:45"),
+        ("%Y-%m-%d %H:%M:%S", "1969-12-31 23:59:59"),
+        ("%Y-%m-%dT%H:%M:%S", "2100-03-01T01:02:03"),
+        ("%d/%m/%Y %H:%M", "31/12/2024 01:02"),
+    ],
+)
+def test_seconds_matches_to_seconds(time_format, value):
+    parse_timestamp = TimestampParser(time_format)
+    seconds = parse_timestamp.seconds(value)
+    assert seconds == parse_timestamp.to_seconds(parse_timestamp(value))
+    assert parse_timestamp.from_seconds(seconds) == parse_timestamp(value)
+
+
+@pytest.mark.parametrize(
+    "time_format, value",
+    [
+        ("%H:%M:%S", "24:00:00"),
+        ("%Y-%m-%d %H:%M:%S", "2023-02-29 12:00:00"),
+        ("%Y-%m-%d %H:%M:%S", "2024-13-01 12:00:00"),
+    ],
+)
+def test_seconds_raises_like_strptime(time_format, value):
+    with pytest.raises(ValueError):
+        TimestampParser(time_format).seconds(value)
+
+
+def test_whole_seconds():
+    assert TimestampParser("%Y-%m-%d %H:%M:%S").whole_seconds
+    assert not TimestampParser("%H:%M:%S.%f").whole_seconds
+    assert not TimestampParser("%Y-%m-%d %H:%M:%S%z").whole_seconds
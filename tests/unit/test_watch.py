@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+from logparser.watch import JobWatcher
+
+
+class FakeClock:
+    def __init__(self, value):
+        self.value = datetime.strptime(value, "%H:%M:%S")
+
+    def __call__(self):
+        return self.value
+
+    def advance(self, **kwargs):
+        self.value += timedelta(**kwargs)
+
+
+def test_watcher_alerts_running_jobs_once_per_level(capsys):
+    clock = FakeClock("12:00:00")
+    watcher = JobWatcher(now=clock)
+    watcher.process_rows([["12:00:00", "Job A", "START", "111"]])
+
+    clock.advance(minutes=4)
+    watcher.tick()
+    assert capsys.readouterr().out == ""
+
+    clock.advance(minutes=2)
+    watcher.tick()
+    watcher.tick()
+    assert capsys.readouterr().out == (
+        "WARNING: Job A (PID 111) started at 12:00:00 - still running after 0:06:00\n"
+    )
+
+    clock.advance(minutes=5)
+    watcher.tick()
+    assert capsys.readouterr().out.startswith("ERROR: Job A (PID 111)")
+
+    # the END line does not repeat an alert that was already raised
+    watcher.process_rows([["12:12:00", "Job A", "END", "111"]])
+    assert capsys.readouterr().out == ""
+    assert watcher.open_jobs == {}
+
+
+def test_watcher_reports_completed_job_above_running_level(capsys):
+    clock = FakeClock("12:06:00")
+    watcher = JobWatcher(now=clock)
+    watcher.process_rows([["12:00:00", "Job A", "START", "111"]])
+    watcher.tick()
+    assert capsys.readouterr().out.startswith("WARNING: Job A")
+
+    watcher.process_rows([["12:11:00", "Job A", "END", "111"]])
+    assert capsys.readouterr().out == (
+        "ERROR: Job A (PID 111) from 12:00:00 to 12:11:00 - Duration: 0:11:00\n"
+    )
+
+
+def test_watcher_ignores_deadlines_of_ended_and_reused_pids(capsys):
+    clock = FakeClock("12:00:00")
+    watcher = JobWatcher(now=clock)
+    watcher.process_rows(
+        [
+            ["12:00:00", "Job A", "START", "111"],
+            ["12:01:00", "Job A", "END", "111"],
+            ["12:00:00", "Job B", "START", "222"],
+            ["12:04:00", "Job C", "START", "222"],  # PID reused
+        ]
+    )
+    clock.advance(minutes=7)
+    watcher.tick()
+    out = capsys.readouterr().out
+    assert out == ""
+    clock.advance(minutes=3)
+    watcher.tick()
+    out = capsys.readouterr().out
+    assert "Job C" in out and "Job B" not in out and "Job A" not in out
+
+
+def test_watcher_handles_many_open_jobs(capsys):
+    clock = FakeClock("12:00:00")
+    watcher = JobWatcher(now=clock)
+    watcher.process_rows(
+        [["12:00:00", f"Job {pid}", "START", str(pid)] for pid in range(5000)]
+    )
+    clock.advance(minutes=5, seconds=1)
+    watcher.tick()
+    assert capsys.readouterr().out.count("WARNING") == 5000
+
+
+def test_watcher_skips_warning_when_error_already_due(capsys):
+    clock = FakeClock("12:30:00")
+    watcher = JobWatcher(now=clock)
+    watcher.process_rows([["12:00:00", "Job A", "START", "111"]])
+    watcher.tick()
+    out = capsys.readouterr().out
+    assert out.startswith("ERROR: Job A")
+    assert "WARNING" not in out
+
+
+def test_watcher_times_jobs_across_midnight(capsys):
+    clock = FakeClock("23:58:00")
+    watcher = JobWatcher(now=clock)
+    watcher.process_rows([["23:58:00", "Job A", "START", "111"]])
+
+    clock.advance(minutes=8)
+    watcher.tick()
+    assert capsys.readouterr().out == (
+        "WARNING: Job A (PID 111) started at 23:58:00 - still running after 0:08:00\n"
+    )
+
+    watcher.process_rows([["00:10:00", "Job A", "END", "111"]])
+    assert capsys.readouterr().out.startswith("ERROR: Job A (PID 111)")
+    assert watcher.open_jobs == {}
+
+
+def test_watcher_reports_undecodable_timestamps_as_malformed(capsys):
+    malformed = []
+    clock = FakeClock("12:00:00")
+    watcher = JobWatcher(now=clock, on_malformed=malformed.append)
+    watcher.process_rows(
+        [
+            ["garbage", "Job B", "START", "2"],
+            ["12:00:00", "Job A", "START", "111"],
+        ]
+    )
+    assert malformed == [["garbage", "Job B", "START", "2"]]
+    assert list(watcher.open_jobs) == ["111"]